@@ -18,7 +18,12 @@ DATABASES = {
         'PASSWORD': '',
         'HOST': '',                      # Empty for localhost through domain sockets or '127.0.0.1' for localhost through TCP.
         'PORT': '',                      # Set to empty string for default.
-    }
+    },
+    # stands in for a read replica of 'default' in the tests
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': 'replica.sqlite3',
+    },
 }
 
 # Hosts/domain names that are valid for this site; required if DEBUG is False
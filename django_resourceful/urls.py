@@ -3,7 +3,8 @@ from django.conf.urls import patterns, include, url
 # Uncomment the next two lines to enable the admin:
 # from django.contrib import admin
 # admin.autodiscover()
-from testapp.views import DrawingView, WidgetView, AnotherWidgetView
+from resourceful.batch import BatchView
+from testapp.views import DrawingView, WidgetView, AnotherWidgetView, NoteView, AttachmentView
 
 
 urlpatterns = patterns('',
@@ -22,3 +23,6 @@ urlpatterns = patterns('',
 urlpatterns += WidgetView.patterns()
 urlpatterns += AnotherWidgetView.patterns()
 urlpatterns += DrawingView.patterns()
+urlpatterns += NoteView.patterns()
+urlpatterns += AttachmentView.patterns()
+urlpatterns += BatchView.patterns()
@@ -30,3 +30,7 @@ application = get_wsgi_application()
 # Apply WSGI middleware here.
 # from helloworld.wsgi import HelloWorldApplication
 # application = HelloWorldApplication(application)
+
+# resolve all resources now rather than on the first request
+from resourceful.registry import warm_up
+warm_up()
@@ -0,0 +1,170 @@
+import io
+import json
+from multiprocessing.pool import ThreadPool
+
+from django.conf.urls import patterns, url
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.urlresolvers import Resolver404, resolve
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import Http404, HttpResponse
+from django.utils import six
+from django.views.generic import View
+
+from resourceful import registry
+from resourceful.parsers import ParseError, RequestBody
+
+
+class BatchView(View):
+    """
+    Runs several resource requests in one round trip.
+
+    The body is a JSON list of sub-requests:
+
+        [{"method": "GET", "url": "/widget/3"},
+         {"method": "PATCH", "url": "/widget/4", "body": {"name": "renamed"}}]
+
+    Each one is dispatched straight to the registered ResourceView its URL
+    resolves to, skipping the middleware, and the responses come back as a
+    JSON list in the same order.  Sub-requests run one after the other on
+    the request's database connection, inside a single transaction, so an
+    exception in any of them rolls the whole batch back.
+    """
+    using = DEFAULT_DB_ALIAS  # Database the batch's transaction is opened on
+    max_requests = 20  # Most sub-requests accepted in one batch
+    max_workers = 1  # Threads running batches that only read; see concurrent_safe()
+    copy_attributes = ('user', 'session')  # Set by middleware, passed to sub-requests
+
+    def post(self, request, *args, **kwargs):
+        try:
+            specs = self.get_specs(RequestBody(request).data)
+        except ParseError as exc:
+            return HttpResponse(six.text_type(exc), content_type='text/plain', status=exc.status_code)
+
+        subrequests = [self.build_request(spec) for spec in specs]
+
+        if self.max_workers > 1 and self.concurrent_safe(subrequests):
+            pool = ThreadPool(min(self.max_workers, len(subrequests)))
+            try:
+                results = pool.map(self._run_in_thread, subrequests)
+            finally:
+                pool.close()
+        else:
+            with transaction.commit_on_success(using=self.using):
+                results = [self.run(subrequest) for subrequest in subrequests]
+
+        return HttpResponse(json.dumps(results), content_type='application/json')
+
+    def get_specs(self, data):
+        if not isinstance(data, list):
+            raise ParseError('Expected a JSON list of requests')
+
+        if len(data) > self.max_requests:
+            raise ParseError('At most {0} requests can be batched'.format(self.max_requests))
+
+        for spec in data:
+            if not isinstance(spec, dict) or not isinstance(spec.get('url'), six.string_types):
+                raise ParseError('Every request needs a url')
+
+        return data
+
+    def build_request(self, spec):
+        """
+        Returns a request for the spec, carrying over the batch request's
+        headers and the attributes middleware set on it
+        """
+        path, _, query = spec['url'].partition('?')
+
+        body = spec.get('body')
+        if body is None:
+            body = b''
+        else:
+            body = json.dumps(body).encode('utf-8')
+
+        environ = dict(self.request.META)
+        environ.update({
+            'REQUEST_METHOD': spec.get('method', 'GET').upper(),
+            'PATH_INFO': path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest',
+            'wsgi.input': io.BytesIO(body),
+        })
+
+        request = WSGIRequest(environ)
+        for name in self.copy_attributes:
+            if hasattr(self.request, name):
+                setattr(request, name, getattr(self.request, name))
+
+        return request
+
+    def concurrent_safe(self, subrequests):
+        """
+        Returns whether the sub-requests may run in parallel threads
+
+        Each thread has its own database connection, so reads running in
+        parallel do not share a transaction; only batches without writes
+        qualify.
+        """
+        return all(request.method in ('GET', 'HEAD') for request in subrequests)
+
+    def run(self, request):
+        """
+        Returns the result of a single sub-request
+        """
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.error(404, 'Not Found')
+
+        if match.url_name not in get_resource_url_names():
+            return self.error(404, 'Not a resource URL')
+
+        try:
+            response = match.func(request, *match.args, **match.kwargs)
+        except Http404:
+            return self.error(404, 'Not Found')
+
+        if response.streaming:
+            response.close()
+            return self.error(400, 'Streaming responses cannot be batched')
+
+        content = response.content.decode(response._charset)
+        if response.get('Content-Type', '').startswith('application/json') and content:
+            content = json.loads(content)
+
+        return {
+            'status': response.status_code,
+            'headers': dict(response.items()),
+            'body': content,
+        }
+
+    def _run_in_thread(self, request):
+        try:
+            return self.run(request)
+        finally:
+            for connection in connections.all():
+                connection.close()
+
+    def error(self, status, message):
+        return {
+            'status': status,
+            'headers': {'Content-Type': 'text/plain'},
+            'body': message,
+        }
+
+    @classmethod
+    def patterns(cls, url_prefix='batch', **kwargs):
+        return patterns('',
+            url(r'^{0}$'.format(url_prefix), cls.as_view(**kwargs), name=url_prefix),
+        )
+
+
+def get_resource_url_names():
+    names = set()
+    for resource in registry.get_resources():
+        names.update(resource.url_names.values())
+        names.update(resource.nested_url_names.values())
+
+    return names
@@ -0,0 +1,318 @@
+import hashlib
+import threading
+import uuid
+
+from collections import OrderedDict
+
+from django.core.cache import get_cache
+from django.db.models import signals
+from django.utils import six
+
+from resourceful.meta import get_model_info
+
+
+def _get_generations(cache, keys, timeout, found=None):
+    """
+    Returns the generations stored under the keys, starting the missing ones
+    """
+    if found is None:
+        found = cache.get_many(keys)
+
+    generations = dict((key, found[key]) for key in keys if key in found)
+
+    missing = dict((key, uuid.uuid4().hex) for key in keys if key not in generations)
+    if missing:
+        cache.set_many(missing, timeout)
+        generations.update(missing)
+
+    return generations
+
+
+class FragmentCache(object):
+    """
+    Caches the serialized JSON of model instances.
+
+    Fragments are keyed on the model, pk, field set and, when the view has
+    one, the instance's version (e.g. a version number or an updated_at
+    timestamp).  Each is stored along with the generations of its instance
+    and model, kept in the shared cache and looked up in the same round trip
+    as the fragments; it is only served while both are current.  Saving or
+    deleting an instance starts a new generation of that instance, so every
+    process stops using its fragments whatever field sets it has seen, and
+    `invalidate_model()` starts one of the whole model, for writes made
+    through querysets.
+
+    Versioned fragments are also kept in a bounded in-process LRU in front
+    of the shared cache.  Unversioned ones are not, they would crowd it
+    with fragments that are only ever replaced in place.
+    """
+    def __init__(self, cache_alias='default', max_entries=1000, timeout=None, key_prefix='resourceful'):
+        self.cache_alias = cache_alias
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+        self._cache = None
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._watched = set()
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = get_cache(self.cache_alias)
+
+        return self._cache
+
+    def make_key(self, obj, fields=None, version_field=None):
+        model = obj.__class__
+        fields = tuple(sorted(fields)) if fields else None
+
+        version = getattr(obj, version_field) if version_field else None
+
+        return ':'.join([
+            self.key_prefix,
+            'v' if version_field else 'u',
+            six.text_type(model._meta),
+            six.text_type(obj.pk),
+            hashlib.md5(repr((fields, version)).encode('utf-8')).hexdigest(),
+        ])
+
+    def get_many(self, objs, keys):
+        """
+        Returns the current fragments found under the instances' keys, and the
+        generations to store fresh fragments with, by key
+        """
+        generation_keys = dict(
+            (key, (self._generation_key(obj.__class__), self._generation_key(obj.__class__, obj.pk)))
+            for obj, key in zip(objs, keys))
+
+        entries = {}
+        with self._lock:
+            for key in keys:
+                if key in self._local:
+                    # move it to the most recently used end
+                    entries[key] = self._local[key] = self._local.pop(key)
+
+        wanted = set(key for pair in generation_keys.values() for key in pair)
+        shared = self.cache.get_many(list(wanted) + [key for key in keys if key not in entries])
+
+        current = _get_generations(self.cache, wanted, self.timeout, shared)
+        generations = dict(
+            (key, tuple(current[generation_key] for generation_key in pair))
+            for key, pair in generation_keys.items())
+
+        found, fresh = {}, {}
+        for key in keys:
+            entry = entries.get(key)
+            if entry is None and key in shared:
+                entry = fresh[key] = shared[key]
+
+            if entry is not None and tuple(entry[0]) == generations[key]:
+                found[key] = entry[1]
+
+        self._remember(dict((key, entry) for key, entry in fresh.items() if key in found))
+
+        return found, generations
+
+    def set_many(self, fragments, generations):
+        entries = dict((key, (generations[key], fragment)) for key, fragment in fragments.items())
+
+        self.cache.set_many(entries, self.timeout)
+        self._remember(entries)
+
+    def delete_many(self, keys):
+        self.cache.delete_many(keys)
+
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+
+    def invalidate(self, obj):
+        """
+        Starts a new generation of the instance
+        """
+        self.cache.delete(self._generation_key(obj.__class__, obj.pk))
+
+    def invalidate_model(self, model):
+        """
+        Starts a new generation of the model, e.g. after a QuerySet.update()
+        """
+        self.cache.delete(self._generation_key(model))
+
+    def watch(self, model):
+        """
+        Invalidates an instance's fragments whenever it is saved or deleted
+        """
+        if model in self._watched:
+            return
+
+        uid = 'resourceful.cache.{0}.{1}'.format(id(self), model._meta)
+        signals.post_save.connect(self._instance_changed, sender=model, weak=False, dispatch_uid=uid)
+        signals.post_delete.connect(self._instance_changed, sender=model, weak=False, dispatch_uid=uid)
+
+        self._watched.add(model)
+
+    def _instance_changed(self, sender, instance, **kwargs):
+        self.invalidate(instance)
+
+    def _generation_key(self, model, pk=None):
+        parts = [self.key_prefix, 'gen', six.text_type(model._meta)]
+        if pk is not None:
+            parts.append(six.text_type(pk))
+
+        return ':'.join(parts)
+
+    def _remember(self, entries):
+        with self._lock:
+            for key, entry in entries.items():
+                if key.split(':')[-4] != 'v':
+                    continue
+
+                self._local.pop(key, None)
+                self._local[key] = entry
+
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+
+class HTMLCache(object):
+    """
+    Caches rendered HTML: the unbound forms of `new` and, through the
+    cache_row template tag, the rows of listings.
+
+    Rows are keyed on the model, pk, fragment name, the values the fragment
+    varies on, the model's generation and, when the model has an auto_now
+    field, its value, so that saves made without signals also miss.  Each
+    is stored with the generation of its instance, fetched in the same round
+    trip, and saving or deleting an instance starts a new one of that
+    instance only, in every process.  `invalidate_model()` starts a new
+    generation of the whole model, for writes made through querysets.
+
+    Forms are keyed on form generations of the view's model and the models
+    its fields point to, which any save or delete of them starts over.
+    """
+    def __init__(self, cache_alias='default', timeout=None, key_prefix='resourceful.html'):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+        self._cache = None
+        self._watched = set()
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = get_cache(self.cache_alias)
+
+        return self._cache
+
+    def get_version(self, obj):
+        for field in get_model_info(obj.__class__).fields:
+            if getattr(field.field, 'auto_now', False):
+                return getattr(obj, field.attname)
+
+        return None
+
+    def make_row_key(self, obj, name, vary=(), generation=None):
+        """
+        Returns the key of the instance's row, pass the model's generation
+        when making several keys to look it up only once
+        """
+        if generation is None:
+            generation = self.get_generation(obj.__class__)
+
+        return ':'.join([
+            self.key_prefix,
+            'row',
+            six.text_type(obj._meta),
+            six.text_type(obj.pk),
+            hashlib.md5(repr((name, tuple(vary), generation, self.get_version(obj))).encode('utf-8')).hexdigest(),
+        ])
+
+    def make_form_key(self, name, models, variant):
+        keys = [self._form_generation_key(model) for model in models]
+        generations = _get_generations(self.cache, keys, self.timeout)
+
+        return ':'.join([
+            self.key_prefix,
+            'form',
+            name,
+            hashlib.md5(repr((variant, tuple(generations[key] for key in keys))).encode('utf-8')).hexdigest(),
+        ])
+
+    def get_generation(self, model):
+        key = self._generation_key(model)
+
+        return _get_generations(self.cache, [key], self.timeout)[key]
+
+    def get_row(self, key, obj):
+        """
+        Returns the row's HTML, None when missing or stale, and the instance's
+        generation to store a fresh one with
+        """
+        generation_key = self._generation_key(obj.__class__, obj.pk)
+
+        found = self.cache.get_many([key, generation_key])
+        generation = _get_generations(self.cache, [generation_key], self.timeout, found)[generation_key]
+
+        entry = found.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1], generation
+
+        return None, generation
+
+    def set_row(self, key, html, generation):
+        self.cache.set(key, (generation, html), self.timeout)
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, html):
+        self.cache.set(key, html, self.timeout)
+
+    def invalidate(self, obj):
+        """
+        Starts a new generation of the instance, for its rows, and of the
+        forms depending on its model
+        """
+        self.cache.delete_many([
+            self._generation_key(obj.__class__, obj.pk),
+            self._form_generation_key(obj.__class__),
+        ])
+
+    def invalidate_model(self, model):
+        """
+        Starts a new generation of the model, e.g. after a QuerySet.update()
+        """
+        self.cache.delete_many([self._generation_key(model), self._form_generation_key(model)])
+
+    def watch(self, model):
+        """
+        Invalidates whenever an instance of the model is saved or deleted
+        """
+        if model in self._watched:
+            return
+
+        uid = 'resourceful.html_cache.{0}.{1}'.format(id(self), model._meta)
+        signals.post_save.connect(self._instance_changed, sender=model, weak=False, dispatch_uid=uid)
+        signals.post_delete.connect(self._instance_changed, sender=model, weak=False, dispatch_uid=uid)
+
+        self._watched.add(model)
+
+    def _instance_changed(self, sender, instance, **kwargs):
+        self.invalidate(instance)
+
+    def _generation_key(self, model, pk=None):
+        parts = [self.key_prefix, 'gen', six.text_type(model._meta)]
+        if pk is not None:
+            parts.append(six.text_type(pk))
+
+        return ':'.join(parts)
+
+    def _form_generation_key(self, model):
+        return ':'.join([self.key_prefix, 'form-gen', six.text_type(model._meta)])
+
+
+default_html_cache = HTMLCache()
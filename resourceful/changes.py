@@ -0,0 +1,92 @@
+import base64
+import datetime
+import json
+import time
+
+from django.db.models import signals
+from django.utils import six, timezone
+from django.utils.dateparse import parse_datetime
+
+from resourceful.meta import get_model_info
+from resourceful.models import Tombstone
+from resourceful.parsers import InvalidQuery
+
+
+_watched = set()
+
+
+def get_label(model):
+    return six.text_type(model._meta)
+
+
+def watch(model):
+    """
+    Records a tombstone whenever an instance of the model is deleted
+    """
+    if model in _watched:
+        return
+
+    _watched.add(model)
+
+    signals.post_delete.connect(
+        _instance_deleted, sender=model, weak=False,
+        dispatch_uid='resourceful.changes.{0}'.format(model._meta))
+
+
+def _instance_deleted(sender, instance, using, **kwargs):
+    user_field = getattr(sender._default_manager, 'user_field', None)
+    owner_id = None
+    if user_field:
+        owner_id = getattr(instance, get_model_info(sender).get(user_field).attname)
+
+    Tombstone.objects.using(using).create(
+        model=get_label(sender),
+        object_id=six.text_type(instance.pk),
+        owner_id=owner_id,
+    )
+
+
+def encode_cursor(timestamp, pk, tombstone_id):
+    """
+    Returns an opaque cursor for the position in the change feed
+
+    The cursor tells when it was issued, so one older than the tombstones
+    kept can be told apart.
+    """
+    data = json.dumps([timestamp and timestamp.isoformat(), pk, tombstone_id, int(time.time())])
+
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Returns the (timestamp, pk, tombstone_id) position encoded in a cursor,
+    and when it was issued
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(str(cursor)).decode('utf-8'))
+        if len(values) == 3:
+            # issued before cursors told when
+            values.append(None)
+
+        timestamp, pk, tombstone_id, issued_at = values
+        if timestamp is not None:
+            timestamp = parse_datetime(timestamp)
+    except (TypeError, ValueError):
+        raise InvalidQuery('Invalid cursor')
+
+    return (timestamp, pk, tombstone_id), issued_at
+
+
+def prune(model, max_age, using='default'):
+    """
+    Deletes the model's tombstones older than `max_age` seconds, returns
+    how many there were
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=max_age)
+    tombstones = Tombstone.objects.using(using).filter(model=get_label(model), deleted_at__lt=cutoff)
+
+    count = tombstones.count()
+    tombstones.delete()
+
+    return count
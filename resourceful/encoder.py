@@ -1,32 +1,34 @@
-import json
-
-from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder as BaseJSONEncoder
 from django.db.models.query import QuerySet
 
+from resourceful.meta import serialize
+
+
 class DjangoEncoder(object):
-    def __init__(self, fields=None):
+    def __init__(self, fields=None, extra=()):
         self.fields = fields
+        self.extra = extra
 
     def __call__(self, *args, **kwargs):
         kwargs['_fields'] = self.fields
+        kwargs['_extra'] = self.extra
 
         return DjangoJSONEncoder(*args, **kwargs)
 
 
-class DjangoJSONEncoder(json.JSONEncoder):
+class DjangoJSONEncoder(BaseJSONEncoder):
     def __init__(self, *args, **kwargs):
         self.fields = kwargs.pop('_fields', None)
+        self.extra = kwargs.pop('_extra', ())
         super(DjangoJSONEncoder, self).__init__(*args, **kwargs)
 
     def default(self, obj):
-        # Django serializer returns a JSON string, but we need to return a
-        # serializable object, so load up the serialized string as soon as
-        # it's returned.
+        # the same structure Django's json serializer writes, built as Python
+        # data to save the round trip through a JSON string; the dates and
+        # decimals in it are left to the base class
         if isinstance(obj, QuerySet):
-            return json.loads(serializers.serialize('json', obj, fields=self.fields))
+            return serialize(obj, fields=self.fields, extra=self.extra)
         elif hasattr(obj, '_meta'):
-            # in this case, return just the first element since we had to
-            # throw the object into an iterable to serialize it.
-            return json.loads(serializers.serialize('json', [obj], fields=self.fields))[0]
+            return serialize([obj], fields=self.fields, extra=self.extra)[0]
 
         return super(DjangoJSONEncoder, self).default(obj)
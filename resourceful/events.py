@@ -0,0 +1,135 @@
+import itertools
+import threading
+
+from django.db.models import signals
+from django.utils.six.moves import queue
+
+from resourceful.changes import get_label
+from resourceful.transactions import on_commit
+
+
+class Event(object):
+    """
+    A change to an instance of a watched model
+    """
+    def __init__(self, kind, instance, pk):
+        self.kind = kind  # 'create', 'update' or 'delete'
+        self.instance = instance
+        self.pk = pk
+        self.id = None  # assigned by the broker
+
+
+class Subscription(object):
+    """
+    A bounded queue of events for one listener.
+
+    When the listener falls behind and the queue fills up, further events
+    are dropped and `overflowed` is set; the listener should then start
+    over, e.g. by resyncing through the changes action.
+    """
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self.overflowed = False
+
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Returns the next event, or None if none came within the timeout
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def get_ready(self):
+        """
+        Returns the events already queued, without waiting for more
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker(object):
+    """
+    Delivers events to the subscribers in this process.
+
+    Other brokers, e.g. one relaying events between processes, need to
+    provide the same publish(), subscribe() and unsubscribe() methods.
+    """
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def publish(self, channel, event):
+        with self._lock:
+            event.id = next(self._ids)
+            subscriptions = list(self._subscriptions.get(channel, ()))
+
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, channel, maxsize=100):
+        subscription = Subscription(self, channel, maxsize)
+
+        with self._lock:
+            self._subscriptions.setdefault(channel, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.get(subscription.channel, set()).discard(subscription)
+
+
+default_broker = LocalBroker()
+
+
+_watched = set()
+
+
+def watch(model, broker):
+    """
+    Publishes an event to the broker whenever an instance is saved or
+    deleted, once the change is committed
+    """
+    if (model, broker) in _watched:
+        return
+
+    _watched.add((model, broker))
+
+    def instance_saved(sender, instance, created, using, **kwargs):
+        kind = 'create' if created else 'update'
+        publish_on_commit(using, broker, get_label(sender), Event(kind, instance, instance.pk))
+
+    def instance_deleted(sender, instance, using, **kwargs):
+        # the pk is cleared once the delete completes, so take it now
+        publish_on_commit(using, broker, get_label(sender), Event('delete', instance, instance.pk))
+
+    uid = 'resourceful.events.{0}.{1}'.format(id(broker), model._meta)
+    signals.post_save.connect(instance_saved, sender=model, weak=False, dispatch_uid=uid)
+    signals.post_delete.connect(instance_deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+def publish_on_commit(using, broker, channel, event):
+    """
+    Publishes the event once the transaction on the database commits, or
+    right away outside of transaction management.  Events of a transaction
+    that is rolled back are dropped.
+    """
+    on_commit(using, lambda: broker.publish(channel, event))
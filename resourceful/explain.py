@@ -0,0 +1,250 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import connections
+from django.db.models.sql.constants import QUERY_TERMS
+from django.test.client import RequestFactory
+from django.utils import six
+
+from resourceful import registry
+from resourceful.meta import get_model_info
+
+
+SEQ_SCAN, MISSING_INDEX, FILESORT, ERROR = 'seq_scan', 'missing_index', 'filesort', 'error'
+
+# a value every filter accepts, as it would come in a query string
+SAMPLE_VALUE = '0'
+
+_sqlite_scan_re = re.compile(r'^SCAN (?:TABLE )?(\S+)')
+_postgresql_scan_re = re.compile(r'Seq Scan on (\S+)')
+_postgresql_sort_re = re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b')
+
+
+class QueryShape(object):
+    """
+    A query a resource runs, with the filters that select its rows
+
+    Listing every row scans the table whatever the indexes, so sequential
+    scans only count as a problem for shapes with filters.
+    """
+    def __init__(self, name, queryset, filters=None):
+        self.name = name
+        self.queryset = queryset
+        self.filters = filters or {}
+
+
+def get_view(resource):
+    """
+    Returns the resource's view as it would be for an anonymous GET
+    """
+    kwargs = dict(resource.initkwargs)
+    kwargs.update(
+        model_class=resource.model_class,
+        url_prefix=resource.url_prefix,
+        template_dir=resource.template_dir,
+        resource=resource,
+    )
+
+    view = resource.view_class(**kwargs)
+    view.request = RequestFactory().get('/')
+    view.action = 'index'
+    view.format = 'json'
+    view.args, view.kwargs = (), {}
+
+    return view
+
+
+def get_shapes(resource):
+    """
+    Returns the shapes of the queries the resource's actions run
+    """
+    view = get_view(resource)
+    model = resource.model_class
+
+    shapes = [
+        QueryShape('index', view._get_items()),
+        QueryShape('show', view.get_query_set().filter(pk=SAMPLE_VALUE), {'pk': SAMPLE_VALUE}),
+    ]
+
+    parent_field = resource.get_view_attr('parent_field')
+    if parent_field:
+        view.parent_id = SAMPLE_VALUE
+        shapes.append(QueryShape('nested index', view._get_items(), {parent_field: SAMPLE_VALUE}))
+        view.parent_id = None
+
+    # what _get_request_id_params() turns query parameters into
+    filters = set(resource.get_view_attr('query_map').values())
+    filters.update(field.name for field in get_model_info(model).fields if field.is_relation)
+
+    for name in sorted(filters):
+        shapes.append(QueryShape('filter {0}'.format(name), view._get_items(**{name: SAMPLE_VALUE}),
+                                 {name: SAMPLE_VALUE}))
+
+    manager = model._default_manager
+    if hasattr(manager, 'filter_for_user'):
+        user_filter = manager.user_filter(User(pk=int(SAMPLE_VALUE)))
+        if user_filter:
+            shapes.append(QueryShape('filter_for_user', view.get_query_set().filter(**user_filter), user_filter))
+
+    return shapes
+
+
+def get_lookup_field(model, lookup):
+    """
+    Returns the field a filter argument compares, following relations,
+    or None when the lookup cannot be followed
+    """
+    parts = lookup.split('__')
+    if len(parts) > 1 and parts[-1] in QUERY_TERMS:
+        parts.pop()
+
+    field = None
+    for part in parts:
+        if field is not None:
+            if field.rel is None:
+                return None
+            model = field.rel.to
+
+        if part == 'pk':
+            field = model._meta.pk
+            continue
+
+        try:
+            field = model._meta.get_field_by_name(part)[0]
+        except Exception:
+            return None
+
+        # a reverse relation, the column is on the other model
+        if not hasattr(field, 'column'):
+            return None
+
+    # a foreign key is compared on its own column
+    return field
+
+
+def get_tables(queryset):
+    """
+    Returns the aliases of the tables the queryset's SQL reads, once it was compiled
+    """
+    return [alias for alias, count in queryset.query.alias_refcount.items() if count]
+
+
+def explain(queryset):
+    """
+    Returns the SQL of the queryset, its parameters and its plan, a list of rows
+    """
+    connection = connections[queryset.db]
+    sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+
+    if connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN '
+
+    cursor = connection.cursor()
+    cursor.execute(prefix + sql, params)
+
+    columns = [column[0] for column in cursor.description]
+    plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    return sql, [six.text_type(param) for param in params], plan
+
+
+def find_problems(vendor, plan, shape):
+    """
+    Returns the problems the plan shows, as dicts with a `kind`
+    """
+    problems = []
+
+    for row in plan:
+        if vendor == 'sqlite':
+            detail = row.get('detail', '')
+            match = _sqlite_scan_re.match(detail)
+            if match and 'INDEX' not in detail and 'PRIMARY KEY' not in detail:
+                problems.append({'kind': SEQ_SCAN, 'table': match.group(1)})
+            elif 'TEMP B-TREE FOR ORDER BY' in detail:
+                problems.append({'kind': FILESORT, 'detail': detail})
+        elif vendor == 'postgresql':
+            line = row.get('QUERY PLAN', '')
+            match = _postgresql_scan_re.search(line)
+            if match:
+                problems.append({'kind': SEQ_SCAN, 'table': match.group(1)})
+            elif _postgresql_sort_re.match(line):
+                problems.append({'kind': FILESORT, 'detail': line.strip()})
+        elif vendor == 'mysql':
+            if row.get('type') == 'ALL':
+                problems.append({'kind': SEQ_SCAN, 'table': row.get('table')})
+            if 'filesort' in (row.get('Extra') or ''):
+                problems.append({'kind': FILESORT, 'detail': row.get('Extra')})
+
+    if not shape.filters:
+        problems = [problem for problem in problems if problem['kind'] != SEQ_SCAN]
+
+    for lookup in sorted(shape.filters):
+        field = get_lookup_field(shape.queryset.model, lookup)
+        if field is None:
+            continue
+
+        info = get_model_info(field.model).get(field.name)
+        if info is not None and not info.indexed:
+            problems.append({
+                'kind': MISSING_INDEX,
+                'table': field.model._meta.db_table,
+                'column': field.column,
+            })
+
+    return problems
+
+
+def report(resources=None, using=None):
+    """
+    Explains the query shapes of the resources, every registered one by
+    default, on `using` or the database each resource reads from
+
+    Returns a dict ready to be dumped as JSON; `problems` is the total
+    number of problems found.
+    """
+    if resources is None:
+        resources = registry.get_resources()
+
+    entries = []
+    total = 0
+
+    for resource in resources:
+        if resource.model_class is None:
+            continue
+
+        entry = {
+            'resource': resource.url_prefix,
+            'view': resource.view_class.__name__,
+            'model': get_model_info(resource.model_class).label,
+            'queries': [],
+        }
+
+        for shape in get_shapes(resource):
+            queryset = shape.queryset
+            if using is not None:
+                queryset = queryset.using(using)
+
+            query = {
+                'name': shape.name,
+                'database': queryset.db,
+            }
+
+            try:
+                query['sql'], query['params'], query['plan'] = explain(queryset)
+            except Exception as exc:
+                query['problems'] = [{'kind': ERROR, 'detail': six.text_type(exc)}]
+            else:
+                query['joins'] = len(get_tables(queryset)) - 1
+                query['problems'] = find_problems(connections[queryset.db].vendor, query['plan'], shape)
+
+            total += len(query['problems'])
+            entry['queries'].append(query)
+
+        entries.append(entry)
+
+    return {
+        'resources': entries,
+        'problems': total,
+    }
@@ -0,0 +1,395 @@
+import csv
+import datetime
+import glob
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import traceback
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router
+from django.db.models import Max, Min
+from django.db.models.loading import get_model
+from django.utils import six, timezone
+
+from resourceful import registry
+from resourceful.meta import get_model_info, serialize
+from resourceful.models import ExportJob
+from resourceful.transactions import on_commit
+
+
+CHUNK_SIZE = 1000  # rows read per query while exporting
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'json': 'json',
+    'jsonl': 'jsonl',
+}
+
+
+def default_export_dir():
+    return os.path.join(tempfile.gettempdir(), 'resourceful-exports')
+
+
+class InlineQueue(object):
+    """
+    Runs exports in the requesting process, for development and tests
+    """
+    def map(self, func, items, callback):
+        callback([func(item) for item in items])
+
+
+class ProcessPoolQueue(object):
+    """
+    Runs exports in a pool of worker processes started on first use.
+
+    The callback runs in a thread of the process that queued the export, so
+    that process has to stay up until the export is done.  Other queues
+    only need to provide the same map() method.
+    """
+    def __init__(self, processes=None):
+        self.processes = processes
+
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.processes, initializer=_forget_connections)
+
+        return self._pool
+
+    def map(self, func, items, callback):
+        def done(results):
+            try:
+                callback(results)
+            finally:
+                for connection in connections.all():
+                    connection.close()
+
+        self.pool.map_async(func, items, callback=done)
+
+
+def _forget_connections():
+    # the connections were inherited from the parent, closing them would
+    # close the parent's as well
+    for connection in connections.all():
+        connection.connection = None
+
+
+default_queue = ProcessPoolQueue()
+
+
+def start(queryset, resource, params, format, directory, queue, partition_size, owner_id=None):
+    """
+    Queues the export of the queryset and returns its ExportJob
+
+    The job records the resource and the request `params` the queryset
+    was built from, see get_params(), and the workers build it again from
+    them.  The items are split by pk range into partitions of about
+    `partition_size` rows, which the queue exports in parallel once the
+    job is committed.
+    """
+    db = router.db_for_write(ExportJob)
+
+    job = ExportJob.objects.using(db).create(
+        model=six.text_type(queryset.model._meta),
+        resource=resource,
+        params=json.dumps(params),
+        using=queryset.db,
+        format=format,
+        directory=directory,
+        owner_id=owner_id,
+    )
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    partitions = get_partitions(queryset, partition_size)
+    items = [(job.id, db, lower, upper, index) for index, (lower, upper) in enumerate(partitions)]
+
+    # workers read the job through their own connections, so it is only
+    # queued once the transaction creating it commits
+    on_commit(db, lambda: queue.map(export_partition, items, lambda results: finish(job.id, db, results)))
+
+    return job
+
+
+def get_partitions(queryset, partition_size):
+    """
+    Returns (lower, upper) pk bounds splitting the queryset, None for no bound
+    """
+    bounds = queryset.aggregate(lower=Min('pk'), upper=Max('pk'))
+    lower, upper = bounds['lower'], bounds['upper']
+
+    if not isinstance(lower, six.integer_types) or upper - lower < partition_size:
+        return [(None, None)]
+
+    count = queryset.count()
+    partitions = max(1, -(-count // partition_size))
+    step = -(-(upper - lower + 1) // partitions)
+
+    return [(start, start + step - 1) for start in range(lower, upper + 1, step)]
+
+
+def get_params(view):
+    """
+    Returns what get_queryset() needs of the view's request, as JSON data
+    """
+    request = view.request
+
+    return {
+        'path': request.path_info,
+        'query': request.GET.urlencode(),
+        'parent_id': view.parent_id,
+        'has_user': hasattr(request, 'user'),
+    }
+
+
+def get_queryset(job):
+    """
+    Returns the job's items, built by the resource's view from the request
+    that started the export
+    """
+    try:
+        resource = registry.get_resource(job.resource)
+    except KeyError:
+        # e.g. a task queue worker, which has not loaded the URLconf
+        registry.warm_up()
+        resource = registry.get_resource(job.resource)
+
+    params = json.loads(job.params)
+
+    request = WSGIRequest({
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': params['path'],
+        'SCRIPT_NAME': '',
+        'QUERY_STRING': params['query'],
+        'CONTENT_LENGTH': '0',
+        'wsgi.input': io.BytesIO(),
+    })
+    if params['has_user']:
+        request.user = get_owner(job.owner_id)
+
+    view = resource.view_class(
+        model_class=resource.model_class, url_prefix=resource.url_prefix,
+        template_dir=resource.template_dir, resource=resource, **resource.initkwargs)
+    view.request, view.args, view.kwargs = request, (), {'action': 'export'}
+    view.action = 'export'
+    view.parent_id = params['parent_id']
+
+    return view.get_export_query_set().using(job.using)
+
+
+def get_owner(owner_id):
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import AnonymousUser
+
+    if owner_id is None:
+        return AnonymousUser()
+
+    return get_user_model()._default_manager.get(pk=owner_id)
+
+
+def export_partition(item):
+    """
+    Writes the rows of one pk range to a compressed part file
+
+    Returns (part path, rows written) or (None, error message).
+    """
+    job_id, using, lower, upper, index = item  # using is the job's database, not the items'
+
+    try:
+        job = ExportJob.objects.using(using).get(pk=job_id)
+        if job.status == ExportJob.PENDING:
+            ExportJob.objects.using(using).filter(pk=job_id).update(status=ExportJob.RUNNING)
+
+        queryset = get_queryset(job).order_by('pk')
+        if lower is not None:
+            queryset = queryset.filter(pk__gte=lower, pk__lte=upper)
+
+        path = os.path.join(job.directory, '{0}.{1}.part'.format(job.id, index))
+        rows = 0
+
+        with open(path, 'wb') as raw:
+            out = gzip.GzipFile(fileobj=raw, mode='wb')
+            try:
+                last = None
+                while True:
+                    chunk = queryset
+                    if last is not None:
+                        chunk = chunk.filter(pk__gt=last)
+
+                    chunk = list(chunk[:CHUNK_SIZE])
+                    if not chunk:
+                        break
+
+                    out.write(write_rows(job.format, chunk, first=not rows))
+                    rows += len(chunk)
+                    last = chunk[-1].pk
+            finally:
+                out.close()
+
+        return path, rows
+    except Exception:
+        return None, traceback.format_exc()
+
+
+def write_rows(format, items, first):
+    """
+    Returns the encoded rows for the items in the format
+
+    JSON rows are separated by commas, with none before the part's first
+    row; finish() adds the brackets and the commas between parts.
+    """
+    data = serialize(items)
+
+    if format == 'csv':
+        fields = [field.name for field in get_model_info(items[0].__class__).serialized if not field.is_m2m]
+
+        buf = six.StringIO()
+        writer = csv.writer(buf)
+        for row in data:
+            writer.writerow([_csv_value(row['pk'])] + [_csv_value(row['fields'][name]) for name in fields])
+
+        content = buf.getvalue()
+    elif format == 'json':
+        content = ', '.join(json.dumps(row, cls=DjangoJSONEncoder) for row in data)
+        if not first:
+            content = ', ' + content
+    else:
+        content = ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in data)
+
+    if isinstance(content, six.text_type):
+        content = content.encode('utf-8')
+
+    return content
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+
+    value = six.text_type(value)
+    if six.PY2:
+        value = value.encode('utf-8')
+
+    return value
+
+
+def finish(job_id, using, results):
+    """
+    Joins the part files into the export file
+
+    The parts are gzip members already, which concatenate into a valid gzip
+    file without recompressing them.
+    """
+    job = ExportJob.objects.using(using).get(pk=job_id)
+    paths = [path for path, rows in results if path]
+
+    try:
+        errors = [error for path, error in results if path is None]
+        if errors:
+            raise RuntimeError(errors[0])
+
+        model = get_model(*job.model.split('.', 1))
+
+        with open(get_path(job), 'wb') as out:
+            if job.format == 'csv':
+                fields = [field.name for field in get_model_info(model).serialized if not field.is_m2m]
+                write_member(out, write_header(fields))
+            elif job.format == 'json':
+                write_member(out, b'[')
+
+            written = False
+            for path, rows in results:
+                if not rows:
+                    continue
+
+                if job.format == 'json' and written:
+                    write_member(out, b', ')
+
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, out)
+                written = True
+
+            if job.format == 'json':
+                write_member(out, b']')
+
+        job.status = ExportJob.DONE
+        job.rows = sum(rows for path, rows in results)
+    except Exception as exc:
+        job.status = ExportJob.FAILED
+        job.error = six.text_type(exc)
+    finally:
+        for path in paths:
+            os.remove(path)
+
+    job.finished_at = timezone.now()
+    job.save(using=using)
+
+
+def write_header(fields):
+    buf = six.StringIO()
+    csv.writer(buf).writerow([_csv_value(name) for name in ['pk'] + fields])
+
+    content = buf.getvalue()
+    if isinstance(content, six.text_type):
+        content = content.encode('utf-8')
+
+    return content
+
+
+def write_member(out, content):
+    member = gzip.GzipFile(fileobj=out, mode='wb')
+    member.write(content)
+    member.close()
+
+
+def get_path(job):
+    return os.path.join(job.directory, '{0}.{1}.gz'.format(job.id, EXTENSIONS[job.format]))
+
+
+def prune(model, max_age, timeout):
+    """
+    Deletes the model's exports finished more than `max_age` seconds ago,
+    files included, and fails those left unfinished after `timeout`
+    seconds, whose workers are gone.  Returns how many were deleted.
+    """
+    now = timezone.now()
+    jobs = ExportJob.objects.using(router.db_for_write(ExportJob)).filter(model=six.text_type(model._meta))
+
+    stale = jobs.filter(
+        status__in=(ExportJob.PENDING, ExportJob.RUNNING),
+        created_at__lt=now - datetime.timedelta(seconds=timeout))
+    for job in stale:
+        for path in glob.glob(os.path.join(job.directory, '{0}.*.part'.format(job.id))):
+            os.remove(path)
+
+        job.status = ExportJob.FAILED
+        job.error = 'Not finished after {0} seconds'.format(timeout)
+        job.finished_at = now
+        job.save()
+
+    expired = list(jobs.filter(
+        status__in=(ExportJob.DONE, ExportJob.FAILED),
+        finished_at__lt=now - datetime.timedelta(seconds=max_age)))
+    for job in expired:
+        path = get_path(job)
+        if os.path.exists(path):
+            os.remove(path)
+
+        job.delete()
+
+    return len(expired)
@@ -0,0 +1,13 @@
+from django.core.urlresolvers import get_resolver
+from django.db.models import signals
+
+from resourceful import models as resourceful_app, search
+
+
+def create_search_tables(sender, db, **kwargs):
+    # importing the URLconf declares the resources and their search fields
+    get_resolver(None).reverse_dict
+
+    search.setup(db)
+
+signals.post_syncdb.connect(create_search_tables, sender=resourceful_app)
@@ -0,0 +1,108 @@
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError, NoArgsCommand
+from django.db import router
+
+from resourceful import changes, exports, uploads
+from resourceful.models import Tombstone
+from resourceful.registry import warm_up
+
+
+class Command(NoArgsCommand):
+    help = "Removes what the registered resources leave behind: abandoned chunked uploads, old tombstones and exports."
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--upload-expiry', dest='upload_expiry', type='int', default=None,
+                    help='Seconds unfinished uploads are kept for, instead of the views\' upload_expiry.'),
+        make_option('--tombstone-age', dest='tombstone_age', type='int', default=None,
+                    help='Seconds tombstones are kept for, instead of the views\' changes_retention.'),
+        make_option('--database', dest='database', default=None,
+                    help='Database to prune tombstones in, defaults to the one they are written to.'),
+        make_option('--export-expiry', dest='export_expiry', type='int', default=None,
+                    help='Seconds finished exports are kept for, instead of the views\' export_expiry.'),
+    )
+
+    def handle_noargs(self, **options):
+        try:
+            resources = warm_up()
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+
+        verbosity = int(options.get('verbosity', 1))
+
+        removed = self.prune_uploads(resources, options.get('upload_expiry'))
+        if verbosity:
+            self.stdout.write('{0} abandoned uploads removed'.format(removed))
+
+        using = options.get('database') or router.db_for_write(Tombstone)
+        removed = self.prune_tombstones(resources, options.get('tombstone_age'), using)
+        if verbosity:
+            self.stdout.write('{0} tombstones removed'.format(removed))
+
+        removed = self.prune_exports(resources, options.get('export_expiry'))
+        if verbosity:
+            self.stdout.write('{0} exports removed'.format(removed))
+
+    def prune_uploads(self, resources, upload_expiry):
+        pruned = {}
+        for resource in resources:
+            if not resource.get_view_attr('chunked_uploads'):
+                continue
+
+            directory = resource.get_view_attr('upload_dir') or uploads.default_upload_dir()
+            max_age = upload_expiry
+            if max_age is None:
+                max_age = resource.get_view_attr('upload_expiry')
+
+            # resources sharing a directory keep their uploads for the shortest expiry
+            pruned[directory] = min(max_age, pruned.get(directory, max_age))
+
+        removed = 0
+        for directory, max_age in pruned.items():
+            removed += uploads.ChunkedUpload.prune(directory, max_age)
+
+        return removed
+
+    def prune_tombstones(self, resources, tombstone_age, using):
+        pruned = {}
+        for resource in resources:
+            if not resource.get_view_attr('changes_field'):
+                continue
+
+            max_age = tombstone_age
+            if max_age is None:
+                max_age = resource.get_view_attr('changes_retention')
+
+            # models behind several resources keep tombstones for the longest retention
+            model = resource.model_class
+            pruned[model] = max(max_age, pruned.get(model, max_age))
+
+        removed = 0
+        for model, max_age in pruned.items():
+            # only where tombstones are written, replicas follow on their own
+            removed += changes.prune(model, max_age, using)
+
+        return removed
+
+    def prune_exports(self, resources, export_expiry):
+        pruned = {}
+        for resource in resources:
+            if not resource.get_view_attr('export_formats'):
+                continue
+
+            max_age = export_expiry
+            if max_age is None:
+                max_age = resource.get_view_attr('export_expiry')
+            timeout = resource.get_view_attr('export_timeout')
+
+            model = resource.model_class
+            if model in pruned:
+                max_age, timeout = max(max_age, pruned[model][0]), max(timeout, pruned[model][1])
+            pruned[model] = (max_age, timeout)
+
+        removed = 0
+        for model, (max_age, timeout) in pruned.items():
+            removed += exports.prune(model, max_age, timeout)
+
+        return removed
@@ -0,0 +1,43 @@
+import json
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError, NoArgsCommand
+
+from resourceful import explain
+from resourceful.registry import warm_up
+
+
+class Command(NoArgsCommand):
+    help = ("EXPLAINs the queries of every resource registered with ResourceView.patterns() "
+            "and reports sequential scans, missing indexes and sorts as JSON.")
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--database', dest='database', default=None,
+                    help='Database to explain on, defaults to the one each resource reads from.'),
+        make_option('--fail', action='store_true', dest='fail', default=False,
+                    help='Exit with an error when any problem is found, e.g. to gate a deploy.'),
+        make_option('--ignore', action='append', dest='ignore', default=[],
+                    help='A kind of problem not to report, e.g. filesort. Can be repeated.'),
+    )
+
+    def handle_noargs(self, **options):
+        try:
+            warm_up()
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+
+        result = explain.report(using=options.get('database'))
+
+        ignore = set(options.get('ignore') or ())
+        if ignore:
+            result['problems'] = 0
+            for entry in result['resources']:
+                for query in entry['queries']:
+                    query['problems'] = [x for x in query['problems'] if x['kind'] not in ignore]
+                    result['problems'] += len(query['problems'])
+
+        self.stdout.write(json.dumps(result, indent=2, sort_keys=True))
+
+        if options.get('fail') and result['problems']:
+            raise CommandError('{0} query problems found'.format(result['problems']))
@@ -0,0 +1,29 @@
+from optparse import make_option
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError, NoArgsCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from resourceful import search
+from resourceful.registry import warm_up
+
+
+class Command(NoArgsCommand):
+    help = ("Creates the search tables and indexes of the resources with search_fields, "
+            "as syncdb does for the resources declared when it runs.")
+
+    option_list = NoArgsCommand.option_list + (
+        make_option('--database', dest='database', default=DEFAULT_DB_ALIAS,
+                    help='Database to create them in, defaults to "default".'),
+    )
+
+    def handle_noargs(self, **options):
+        try:
+            warm_up()
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+
+        search.setup(options.get('database'))
+
+        if int(options.get('verbosity', 1)):
+            self.stdout.write('search set up for {0} resources'.format(len(search.get_watched())))
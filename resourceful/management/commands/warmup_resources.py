@@ -0,0 +1,28 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError, NoArgsCommand
+
+from resourceful.registry import warm_up
+
+
+class Command(NoArgsCommand):
+    help = "Resolves and validates every resource registered with ResourceView.patterns()."
+
+    def handle_noargs(self, **options):
+        try:
+            resources = warm_up()
+        except ImproperlyConfigured as exc:
+            raise CommandError(exc)
+
+        verbosity = int(options.get('verbosity', 1))
+
+        for resource in resources:
+            if verbosity > 1:
+                self.stdout.write('{0}: {1}, form {2}'.format(
+                    resource.url_prefix, resource.view_class.__name__,
+                    getattr(resource.form_class, '__name__', None)))
+
+            for warning in resource.warnings:
+                self.stdout.write('{0}: {1}'.format(resource.url_prefix, warning))
+
+        if verbosity:
+            self.stdout.write('{0} resources ok'.format(len(resources)))
@@ -0,0 +1,151 @@
+from django.contrib.auth.models import User
+from django.db.models import FileField, get_models
+from django.utils.encoding import is_protected_type, smart_text
+
+
+_models = {}
+
+
+class FieldInfo(object):
+    """
+    What the hot paths need to know about a model field
+    """
+    __slots__ = (
+        'field', 'name', 'attname', 'column', 'select_name',
+        'is_relation', 'is_m2m', 'is_file', 'primary_key', 'indexed', 'unique',
+        'name_transform', 'class_transform',
+    )
+
+    def __init__(self, model, field, is_m2m=False):
+        self.field = field
+        self.name = field.name
+        self.attname = field.attname
+        self.column = field.column
+        self.is_relation = field.rel is not None
+        self.is_m2m = is_m2m
+        self.is_file = isinstance(field, FileField)
+        self.primary_key = field.primary_key
+        self.indexed = field.db_index or field.unique or field.primary_key
+        self.unique = field.unique
+
+        # the name the serializer's `fields` option knows the field by
+        if self.is_relation and not is_m2m:
+            self.select_name = field.attname[:-3]
+        else:
+            self.select_name = field.attname
+
+        # JSONMixin transforms that depend on the field alone
+        self.name_transform = self._get_transform(model, field.name)
+        self.class_transform = self._get_transform(model, field.__class__.__name__)
+
+    def __repr__(self):
+        return '<FieldInfo {0}>'.format(self.name)
+
+    @staticmethod
+    def _get_transform(model, name):
+        name = 'transform_{0}'.format(name).lower()
+        if hasattr(model, name):
+            return name
+
+        return None
+
+
+class ModelInfo(object):
+    """
+    The fields of a model, looked at once per process
+    """
+    __slots__ = ('model', 'label', 'fields', 'local_fields', 'many_to_many', 'serialized', 'user_field', '_by_name')
+
+    def __init__(self, model):
+        opts = model._meta
+        concrete_opts = opts.concrete_model._meta
+
+        infos = {}
+
+        def get_info(field, is_m2m=False):
+            if field not in infos:
+                infos[field] = FieldInfo(model, field, is_m2m)
+            return infos[field]
+
+        self.model = model
+        self.label = smart_text(opts)
+        self.fields = tuple(get_info(field) for field in opts.fields)
+        self.local_fields = tuple(get_info(field) for field in opts.local_fields)
+        self.many_to_many = tuple(get_info(field, True) for field in opts.many_to_many)
+
+        # what the serializers write, see django.core.serializers.base.Serializer
+        self.serialized = tuple(
+            [get_info(field) for field in concrete_opts.local_fields if field.serialize] +
+            [get_info(field, True) for field in concrete_opts.many_to_many if field.serialize]
+        )
+
+        self.user_field = None
+        for info in self.fields:
+            if info.is_relation and info.field.rel.to == User:
+                self.user_field = info.name
+
+        self._by_name = dict((info.name, info) for info in self.fields + self.many_to_many)
+
+    def __repr__(self):
+        return '<ModelInfo {0}>'.format(self.label)
+
+    def get(self, name, default=None):
+        return self._by_name.get(name, default)
+
+
+def get_model_info(model):
+    try:
+        return _models[model]
+    except KeyError:
+        info = _models[model] = ModelInfo(model)
+        return info
+
+
+def load_all():
+    """
+    Builds the info of every installed model, for warm_up()
+    """
+    return [get_model_info(model) for model in get_models()]
+
+
+def serialize(objects, fields=None, extra=()):
+    """
+    Returns the objects as Python data, the same as the "python" serializer
+    does but from the model info.  Natural keys are not supported.
+
+    The `extra` attributes, e.g. annotations, are added to the fields.
+    """
+    result = []
+
+    for obj in objects:
+        info = get_model_info(obj.__class__)
+
+        data = {}
+        for field in info.serialized:
+            if fields is not None and field.select_name not in fields:
+                continue
+
+            if field.is_m2m:
+                if field.field.rel.through._meta.auto_created:
+                    data[field.name] = [
+                        smart_text(related._get_pk_val(), strings_only=True)
+                        for related in getattr(obj, field.name).iterator()
+                    ]
+            elif field.is_relation:
+                data[field.name] = getattr(obj, field.attname)
+            else:
+                value = getattr(obj, field.attname)
+                if not is_protected_type(value):
+                    value = field.field.value_to_string(obj)
+                data[field.name] = value
+
+        for name in extra:
+            data[name] = getattr(obj, name, None)
+
+        result.append({
+            'pk': smart_text(obj._get_pk_val(), strings_only=True),
+            'model': info.label,
+            'fields': data,
+        })
+
+    return result
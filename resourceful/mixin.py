@@ -1,34 +1,46 @@
+from resourceful.meta import get_model_info
+
+
+_value_transforms = {}  # value class -> transform method name
+
+
 class JSONMixin(object):
     json_fields = None
 
     def get_json(self):
         json_data = {}
+        info = get_model_info(self.__class__)
 
-        fields = self._meta.fields
+        fields = info.fields
         if self.json_fields:
-            fields = filter(lambda field: field.name in self.json_fields, self._meta.fields)
+            fields = [field for field in fields if field.name in self.json_fields]
 
         for field in fields:
             name = field.name
             value = getattr(self, name)
 
             if value is not None:
-                value = self.transform(field, value)
+                value = self.transform(field.field, value)
 
             json_data[name] = value
 
-        for field in self._meta.many_to_many:
+        for field in info.many_to_many:
             name = field.name
-            value = self.transform(field, getattr(self, name))
+            value = self.transform(field.field, getattr(self, name))
 
             json_data[name] = value
 
         return json_data
 
     def transform(self, field, value):
-        for name in (field.name, value.__class__.__name__, field.__class__.__name__):
-            transform_name = 'transform_{}'.format(name).lower()
-            transform = getattr(self, transform_name, None)
+        info = get_model_info(self.__class__).get(field.name)
+
+        value_class = value.__class__
+        if value_class not in _value_transforms:
+            _value_transforms[value_class] = 'transform_{0}'.format(value_class.__name__).lower()
+
+        for transform_name in (info.name_transform, _value_transforms[value_class], info.class_transform):
+            transform = transform_name and getattr(self, transform_name, None)
 
             if transform:
                 value = transform(value)
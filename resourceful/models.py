@@ -1,7 +1,10 @@
 import sys
+import uuid
 
 from django.db import models
-from django.contrib.auth.models import User
+from django.utils import timezone
+
+from resourceful.meta import get_model_info
 
 
 class ResourceManager(models.Manager):
@@ -14,12 +17,20 @@ class ResourceManager(models.Manager):
         return self.filter_for_user(user)
 
     def filter_for_user(self, user, *args, **kwargs):
+        kwargs.update(self.user_filter(user))
+
+        return self.filter(*args, **kwargs)
+
+    def user_filter(self, user):
+        """
+        Returns the filter arguments limiting a query to the user's items
+        """
         if self.user_field:
-            kwargs.update({
+            return {
                 self.user_field: user.id, # use id because this is for FK
-            })
+            }
 
-        return self.filter(*args, **kwargs)
+        return {}
 
     def get_for_user(self, user, *args, **kwargs):
         return self.filter_for_user(user).get(*args, **kwargs)
@@ -29,9 +40,7 @@ class ResourceManager(models.Manager):
         if self._user_field is not None:
             return self._user_field
 
-        for field in self.model._meta.fields:
-            if field.rel and field.rel.to == User:
-                self._user_field = field.name
+        self._user_field = get_model_info(self.model).user_field
 
         return self._user_field
 
@@ -85,3 +94,41 @@ class ModelWrapper(object):
             return dict['objects']
 
         return getattr(dict['model'], item)
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of an item, for the changes action
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=64)
+    owner_id = models.IntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        index_together = [('model', 'id')]
+
+
+def make_job_id():
+    return uuid.uuid4().hex
+
+
+class ExportJob(models.Model):
+    """
+    An export of a resource's items, written to a file in the background
+    """
+    PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'
+
+    id = models.CharField(max_length=32, primary_key=True, default=make_job_id)
+    model = models.CharField(max_length=100)
+    resource = models.CharField(max_length=100)  # url_prefix of the resource exported
+    params = models.TextField()  # JSON of the request the export is rebuilt from
+    using = models.CharField(max_length=100)
+    format = models.CharField(max_length=10)
+    directory = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, default=PENDING)
+    rows = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    owner_id = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,148 @@
+import cgi
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, QueryDict
+from django.http.multipartparser import MultiPartParserError
+from django.utils import six
+from django.utils.datastructures import MultiValueDict
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+
+class ParseError(Exception):
+    """
+    Raised when a request body cannot be parsed
+    """
+    status_code = 400
+
+
+class RequestBodyTooLarge(ParseError):
+    """
+    Raised when a request body is larger than allowed
+    """
+    status_code = 413
+
+
+class RequestBody(object):
+    """
+    Parses a request body once, on first access, based on its Content-Type.
+
+    Django only parses form encoded and multipart bodies, and only for POST
+    requests.  This handles those for any method, as well as JSON bodies.
+
+    When max_size is given, the declared Content-Length is checked up front,
+    before anything is read from the request.
+    """
+    def __init__(self, request, max_size=None):
+        self.request = request
+        self.max_size = max_size
+
+        content_type, params = cgi.parse_header(request.META.get('CONTENT_TYPE', ''))
+        self.content_type = content_type.lower()
+        self.charset = params.get('charset') or request.encoding or settings.DEFAULT_CHARSET
+
+        if max_size is not None and self.content_length > max_size:
+            raise RequestBodyTooLarge(
+                'Request body of {0} bytes exceeds the {1} byte limit'.format(
+                    self.content_length, max_size))
+
+        self._parsed = None
+
+    @property
+    def content_length(self):
+        try:
+            return int(self.request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return 0
+
+    @property
+    def data(self):
+        return self._parse()[0]
+
+    @property
+    def files(self):
+        return self._parse()[1]
+
+    @property
+    def parsed(self):
+        """
+        Tells whether the body was parsed already
+        """
+        return self._parsed is not None
+
+    @property
+    def is_json(self):
+        return self.content_type == 'application/json'
+
+    def _parse(self):
+        if self._parsed is None:
+            self._parsed = self.parse()
+
+        return self._parsed
+
+    def parse(self):
+        """
+        Returns a (data, files) tuple for the request body
+        """
+        request = self.request
+
+        # REQUEST_METHOD is the method the client actually used, request.method
+        # may have been overridden by a _method parameter.
+        method = request.META.get('REQUEST_METHOD', request.method).upper()
+        is_multipart = self.content_type == 'multipart/form-data'
+
+        if method == 'POST' and (is_multipart or self.content_type == 'application/x-www-form-urlencoded'):
+            return request.POST, request.FILES
+
+        if self.is_json:
+            return self.parse_json(), MultiValueDict()
+
+        if is_multipart:
+            try:
+                return request.parse_file_upload(request.META, request)
+            except MultiPartParserError as exc:
+                raise ParseError('Invalid multipart body: {0}'.format(exc))
+
+        # anything else is treated as form encoded, which is what AJAX
+        # libraries send when no content type is given
+        return QueryDict(request.body, encoding=self.charset), MultiValueDict()
+
+    def parse_json(self):
+        body = self.request.body
+        if not body:
+            return {}
+
+        try:
+            return json.loads(body.decode(self.charset))
+        except (ValueError, LookupError) as exc:
+            raise ParseError('Invalid JSON body: {0}'.format(exc))
+
+
+def with_body_limit(view, max_size):
+    """
+    Wraps the view so that oversized bodies are refused before anything
+    reads them
+
+    CsrfViewMiddleware reads the body of POST requests before the view runs,
+    so the middleware is told to skip the view and the CSRF check runs here,
+    once the size is checked.  Views exempt from CSRF checks stay exempt.
+    """
+    protected = view if getattr(view, 'csrf_exempt', False) else csrf_protect(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            RequestBody(request, max_size=max_size)
+        except ParseError as exc:
+            return HttpResponse(six.text_type(exc), content_type='text/plain', status=exc.status_code)
+
+        return protected(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
+
+
+class InvalidQuery(ParseError):
+    """
+    Raised when query parameters are not valid for the resource
+    """
@@ -0,0 +1,174 @@
+import cProfile
+import collections
+import datetime
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from resourceful.queries import QueryLog
+
+
+def default_profile_dir():
+    return os.path.join(tempfile.gettempdir(), 'resourceful-profiles')
+
+
+class StackSampler(object):
+    """
+    Samples the stacks of the threads it watches from one daemon thread
+
+    Every `interval` seconds, while any thread is watched, the sampler
+    takes sys._current_frames() and walks the stack of each watched
+    thread, holding the GIL meanwhile.  That costs more with more requests
+    in flight and deeper stacks, so the default interval is coarse; the
+    samples of requests that turn out fast are thrown away.
+    """
+    def __init__(self, interval=0.05):
+        self.interval = interval
+
+        self._watched = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, thread_id):
+        """
+        Starts sampling the thread
+        """
+        with self._lock:
+            self._watched[thread_id] = collections.Counter()
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='resourceful-sampler')
+                self._thread.daemon = True
+                self._thread.start()
+
+    def stop(self, thread_id):
+        """
+        Stops sampling the thread, returns a Counter of its stacks that the
+        sampler no longer writes to
+        """
+        with self._lock:
+            samples = self._watched.pop(thread_id, None)
+
+            return collections.Counter(samples)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+
+            with self._lock:
+                watched = list(self._watched.items())
+
+                # ends when idle, start() brings up another
+                if not watched:
+                    self._thread = None
+                    return
+
+            frames = sys._current_frames()
+            stacks = [
+                (thread_id, samples, get_stack(frames[thread_id]))
+                for thread_id, samples in watched if thread_id in frames
+            ]
+
+            # counted under the lock, and only for threads still watched, so
+            # nothing is written once stop() has taken the samples
+            with self._lock:
+                for thread_id, samples, stack in stacks:
+                    if self._watched.get(thread_id) is samples:
+                        samples[stack] += 1
+
+
+def get_stack(frame):
+    """
+    Returns the frame's stack, outermost call first
+    """
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append('{0}:{1}'.format(code.co_filename, code.co_name))
+        frame = frame.f_back
+
+    return tuple(reversed(stack))
+
+
+class Profiler(object):
+    """
+    Profiles ResourceView requests, set as a view's `profiler`
+
+    A `sample_rate` fraction of requests is profiled with cProfile and
+    always written.  With `slow_seconds`, the others are watched by a
+    StackSampler and written when they take at least that long.  Each
+    profile comes with a JSON file telling the resource, action, duration
+    and the queries that were run.
+    """
+    def __init__(self, directory=None, sample_rate=0.0, slow_seconds=None, interval=0.05):
+        self.directory = directory or default_profile_dir()
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.sampler = StackSampler(interval)
+
+    def run(self, view, func, *args, **kwargs):
+        """
+        Returns func(*args, **kwargs), profiling it when it is due
+        """
+        sampled = self.sample_rate and random.random() < self.sample_rate
+        if not sampled and self.slow_seconds is None:
+            return func(*args, **kwargs)
+
+        thread_id = threading.current_thread().ident
+        profile = samples = queries = None
+        start = time.time()
+
+        try:
+            with QueryLog() as queries:
+                if sampled:
+                    profile = cProfile.Profile()
+                    return profile.runcall(func, *args, **kwargs)
+
+                self.sampler.start(thread_id)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    samples = self.sampler.stop(thread_id)
+        finally:
+            duration = time.time() - start
+            if queries is not None and (sampled or duration >= self.slow_seconds):
+                self.save(view, duration, queries, profile, samples)
+
+    def save(self, view, duration, queries, profile=None, samples=None):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        resource = view.url_prefix or view.model_class._meta.module_name
+        name = '{0:%Y%m%dT%H%M%S}-{1}-{2}-{3}'.format(
+            datetime.datetime.now(), resource, view.action, uuid.uuid4().hex[:8])
+        path = os.path.join(self.directory, name)
+
+        if profile is not None:
+            profile.dump_stats(path + '.prof')
+        else:
+            # the collapsed format flame graph tools read
+            with open(path + '.stacks', 'w') as fp:
+                for stack, count in samples.most_common():
+                    fp.write('{0} {1}\n'.format(';'.join(stack), count))
+
+        with open(path + '.json', 'w') as fp:
+            json.dump({
+                'resource': resource,
+                'view': view.__class__.__name__,
+                'action': view.action,
+                'method': view.request.method,
+                'path': view.request.get_full_path(),
+                'duration': round(duration, 6),
+                'profiler': 'cprofile' if profile is not None else 'sampler',
+                'samples': sum(samples.values()) if samples is not None else None,
+                'queries': queries.count,
+                'query_time': round(queries.time, 6),
+                'sql': queries.summary(),
+            }, fp, indent=2)
+
+        return path
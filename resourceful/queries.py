@@ -0,0 +1,129 @@
+import collections
+import logging
+import time
+
+from django.db import connections
+from django.db.backends.util import CursorWrapper
+from django.dispatch import Signal
+
+
+logger = logging.getLogger('resourceful.queries')
+logger.addHandler(logging.NullHandler())
+
+# sent when an action runs more queries than its budget, e.g. to count it in metrics
+query_budget_exceeded = Signal(providing_args=['view', 'action', 'budget', 'queries'])
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when an action runs more queries than its budget allows
+    """
+
+
+class RecordingCursor(CursorWrapper):
+    """
+    Tells the open QueryLogs about each statement the cursor runs
+
+    The statements are recorded as they are sent, with placeholders, so
+    queries differing in their parameters only are grouped together.
+    """
+    def __init__(self, cursor, db, logs):
+        super(RecordingCursor, self).__init__(cursor, db)
+
+        self.logs = logs
+
+    def execute(self, sql, params=()):
+        start = time.time()
+        try:
+            return self.cursor.execute(sql, params)
+        finally:
+            self._record(sql, time.time() - start)
+
+    def executemany(self, sql, param_list):
+        start = time.time()
+        try:
+            return self.cursor.executemany(sql, param_list)
+        finally:
+            self._record(sql, time.time() - start)
+
+    def _record(self, sql, duration):
+        query = {'alias': self.db.alias, 'sql': sql, 'time': duration}
+
+        for log in list(self.logs):
+            log.record(query)
+
+
+class QueryLog(object):
+    """
+    Records the statements run on the thread's connections while it is open
+
+    Unlike connection.queries this does not need DEBUG, and logs can be
+    nested.  Connections are patched on the instance, which is local to
+    the thread, so other threads are not affected.
+    """
+    def __init__(self):
+        self.queries = []
+
+    def __enter__(self):
+        for connection in connections.all():
+            _attach(connection, self)
+
+        return self
+
+    def __exit__(self, *exc_info):
+        for connection in connections.all():
+            _detach(connection, self)
+
+    def record(self, query):
+        self.queries.append(query)
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time(self):
+        return sum(query['time'] for query in self.queries)
+
+    def summary(self, limit=20):
+        """
+        Returns the statements run, most time consuming first, with how
+        many times each ran
+        """
+        statements = collections.OrderedDict()
+
+        for query in self.queries:
+            count, duration = statements.get(query['sql'], (0, 0.0))
+            statements[query['sql']] = (count + 1, duration + query['time'])
+
+        summary = [
+            {'sql': sql, 'count': count, 'time': round(duration, 6)}
+            for sql, (count, duration) in statements.items()
+        ]
+        summary.sort(key=lambda x: x['time'], reverse=True)
+
+        return summary[:limit]
+
+
+def _attach(connection, log):
+    logs = connection.__dict__.get('_resourceful_logs')
+
+    if logs is None:
+        logs = connection._resourceful_logs = []
+        cursor = connection.cursor
+
+        connection.cursor = lambda: RecordingCursor(cursor(), connection, logs)
+
+    logs.append(log)
+
+
+def _detach(connection, log):
+    logs = connection.__dict__.get('_resourceful_logs')
+    if logs is None or log not in logs:
+        return
+
+    logs.remove(log)
+
+    if not logs:
+        del connection._resourceful_logs
+        del connection.cursor
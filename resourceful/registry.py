@@ -0,0 +1,260 @@
+import os
+
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.urlresolvers import get_resolver, resolve, reverse, NoReverseMatch
+from django.template import loader, TemplateDoesNotExist
+from django.utils.importlib import import_module
+from django.utils.module_loading import module_has_submodule
+
+from resourceful import meta
+
+
+_resources = OrderedDict()
+
+ALL_METHODS = ('DELETE', 'GET', 'HEAD', 'OPTIONS', 'PATCH', 'POST', 'PUT')
+
+# (has id, action) of the URLs whose methods are known from the routes
+ROUTED_URLS = ((False, None), (True, None), (False, 'new'), (True, 'edit'))
+
+
+class Resource(object):
+    """
+    Everything ResourceView.patterns() knows about a resource.
+
+    The URL names are formatted up front; the form class and templates are
+    resolved by compile(), which warm_up() calls for every registered
+    resource so that the first request does not pay for them.
+    """
+    url_actions = ('index', 'new', 'show', 'edit', 'action')
+
+    def __init__(self, view_class, model_class=None, url_prefix=None,
+                 template_dir=None, parent_prefix=None, initkwargs=None):
+        self.view_class = view_class
+        self.model_class = model_class
+        self.url_prefix = url_prefix
+        self.template_dir = template_dir
+        self.parent_prefix = parent_prefix
+        self.initkwargs = initkwargs or {}
+
+        self.url_names = dict(
+            (action, '{0}.{1}'.format(url_prefix, action)) for action in self.url_actions
+        )
+        self.nested_url_names = {}
+        if parent_prefix:
+            self.nested_url_names = dict(
+                (action, '{0}.{1}.{2}'.format(parent_prefix, url_prefix, action))
+                for action in self.url_actions
+            )
+        self.url_context = {
+            'index_url': self.url_names['index'],
+            'show_url': self.url_names['show'],
+            'new_url': self.url_names['new'],
+            'edit_url': self.url_names['edit'],
+            'action_url': self.url_names['edit'],
+        }
+
+        routes, action_routes = self.get_view_attr('routes'), self.get_view_attr('action_routes')
+        self.allowed_methods = dict(
+            (key, get_allowed_methods(routes, action_routes, *key)) for key in ROUTED_URLS
+        )
+
+        self.form_class = None
+        self.templates = {}
+        self.warnings = []
+        self.compiled = False
+
+    def __repr__(self):
+        return '<Resource {0} {1}>'.format(self.url_prefix, self.view_class.__name__)
+
+    @property
+    def actions(self):
+        """
+        Returns the names of all the actions requests can be routed to
+        """
+        actions = set(['new', 'edit'])
+        actions.update(self.get_view_attr('routes').values())
+        actions.update(self.get_view_attr('action_routes').values())
+
+        return sorted(actions)
+
+    def get_view_attr(self, name):
+        """
+        Returns the view attribute, taking patterns() keyword arguments into account
+        """
+        if name in self.initkwargs:
+            return self.initkwargs[name]
+
+        return getattr(self.view_class, name)
+
+    def url_name(self, action):
+        try:
+            return self.url_names[action]
+        except KeyError:
+            return '{0}.{1}'.format(self.url_prefix, action)
+
+    def nested_url_name(self, action):
+        """
+        Returns the URL name of the action under the parent resource
+        """
+        try:
+            return self.nested_url_names[action]
+        except KeyError:
+            return '{0}.{1}.{2}'.format(self.parent_prefix, self.url_prefix, action)
+
+    def compile(self):
+        """
+        Resolves the resource's form and templates
+
+        Raises ImproperlyConfigured for problems that would otherwise only
+        surface when a request comes in; things that may be intentional, like
+        a read-only resource without a form, are listed in `warnings`.
+        """
+        self.warnings = []
+
+        for action in self.actions:
+            if not callable(getattr(self.view_class, action, None)):
+                raise ImproperlyConfigured('{0} routes to {1}.{2}(), which does not exist'.format(
+                    self.url_prefix, self.view_class.__name__, action))
+
+        self.form_class = self.resolve_form_class()
+        self.templates = self.resolve_templates()
+        self.check_urls()
+
+        self.compiled = True
+
+        return self
+
+    def resolve_form_class(self):
+        from resourceful.views import ResourceView
+
+        form_class = self.get_view_attr('form_class')
+        if not isinstance(form_class, property):
+            return form_class
+
+        # a subclass computing its own form class cannot be resolved ahead of time
+        if form_class is not ResourceView.form_class or self.model_class is None:
+            return None
+
+        meta = self.model_class._meta
+        app_module = import_module(meta.app_label)
+        form_name = '{0}Form'.format(meta.object_name)
+
+        if not module_has_submodule(app_module, 'forms'):
+            self.warnings.append('{0}.forms does not exist'.format(meta.app_label))
+            return None
+
+        try:
+            forms = import_module('{0}.forms'.format(meta.app_label))
+        except ImportError as exc:
+            raise ImproperlyConfigured('Unable to import {0}.forms: {1}'.format(meta.app_label, exc))
+
+        form_class = getattr(forms, form_name, None)
+        if form_class is None:
+            self.warnings.append('{0}.forms.{1} does not exist'.format(meta.app_label, form_name))
+
+        return form_class
+
+    def resolve_templates(self):
+        """
+        Returns the first existing template for each action
+
+        Loading the template also compiles it, which primes the cached
+        template loader when one is configured.
+        """
+        templates = {}
+
+        for action in self.actions:
+            candidates = [
+                os.path.join(self.template_dir, '{0}_{1}.html'.format(self.url_prefix, action)),
+                'resourceful/{0}.html'.format(action),
+            ]
+
+            for name in candidates:
+                try:
+                    loader.get_template(name)
+                except TemplateDoesNotExist:
+                    continue
+
+                templates[action] = [name]
+                break
+
+        return templates
+
+    def check_urls(self):
+        for action, kwargs in (('index', None), ('show', {'id': '0'})):
+            try:
+                reverse(self.url_names[action], kwargs=kwargs)
+            except NoReverseMatch:
+                self.warnings.append('{0} is not in the URLconf'.format(self.url_names[action]))
+
+        if not self.parent_prefix:
+            return
+
+        # the parent's action route matches /<parent>/<id>/<url_prefix> as well
+        name = self.nested_url_names['index']
+        try:
+            path = reverse(name, kwargs={'parent_id': '0'})
+        except NoReverseMatch:
+            return
+
+        if resolve(path).url_name != name:
+            raise ImproperlyConfigured(
+                '{0} is routed to {1}, include {2}.patterns() before its parent\'s in the URLconf'.format(
+                    path, resolve(path).url_name, self.view_class.__name__))
+
+
+def get_allowed_methods(routes, action_routes, has_id, action=None):
+    """
+    Returns the methods a resource URL answers
+
+    The collection and item URLs answer the methods they have routes for,
+    new and edit answer GET and their action routes, and other actions
+    take any method.
+    """
+    if action is None:
+        methods = set(method for with_id, method in routes if with_id == has_id)
+    elif action in ('new', 'edit'):
+        methods = set(['GET'])
+        methods.update(method for name, method in action_routes if name == action)
+    else:
+        return ALL_METHODS
+
+    methods.add('OPTIONS')
+    if 'GET' in methods:
+        methods.add('HEAD')
+
+    return tuple(sorted(methods))
+
+
+def register(resource):
+    """
+    Adds the resource to the registry, replacing any with the same URL prefix
+    """
+    _resources[resource.url_prefix] = resource
+
+    return resource
+
+
+def get_resource(url_prefix):
+    return _resources[url_prefix]
+
+
+def get_resources():
+    return list(_resources.values())
+
+
+def warm_up(urlconf=None):
+    """
+    Loads the URLconf, which registers every resource, and compiles them
+    along with the field info of every model
+
+    Call this when the process starts, e.g. from wsgi.py, so that
+    misconfigured resources fail the deploy instead of the first request.
+    """
+    # accessing reverse_dict imports the URLconf and builds the lookup tables
+    get_resolver(urlconf).reverse_dict
+    meta.load_all()
+
+    return [resource.compile() for resource in get_resources()]
@@ -0,0 +1,285 @@
+import re
+import sqlite3
+
+from django.db import connections, transaction
+from django.db.backends.util import truncate_name
+from django.db.models import Q, signals
+from django.utils import six
+
+from resourceful.meta import get_model_info
+
+
+def get_terms(query):
+    return re.findall(r'\w+', query, re.UNICODE)
+
+
+class PrefixSearch(object):
+    """
+    Matches items where every term starts one of the search fields.
+
+    Works on any database.  istartswith compiles to UPPER(column) LIKE
+    UPPER(%s) on PostgreSQL, which a plain varchar_pattern_ops index does not
+    serve; an expression index on UPPER(column) varchar_pattern_ops does.
+    """
+    lookup = 'istartswith'
+
+    def search(self, queryset, fields, query):
+        for term in get_terms(query):
+            q = Q()
+            for field in fields:
+                q |= Q(**{'{0}__{1}'.format(field, self.lookup): term})
+
+            queryset = queryset.filter(q)
+
+        return queryset
+
+    def setup(self, model, fields, using):
+        pass
+
+    def index(self, instance, fields, using):
+        pass
+
+    def remove(self, instance, fields, using):
+        pass
+
+
+class SQLiteFTSSearch(PrefixSearch):
+    """
+    Searches an FTS5 table kept next to the model's table.
+
+    The table is created and filled from the model's table by syncdb or
+    the setup_search command, never from a request, and is then kept up to
+    date by model signals.  Until it exists, searches fall back to prefix
+    matches and saves leave it alone.
+    """
+    _tables = set()  # (alias, table) known to exist
+
+    def get_table(self, model, fields, using):
+        """
+        Returns the name of the FTS5 table for the fields, resources of the
+        same model with other fields have their own
+        """
+        name = '_'.join([model._meta.db_table] + self.get_columns(model, fields) + ['fts'])
+
+        return truncate_name(name, connections[using].ops.max_name_length())
+
+    def get_columns(self, model, fields):
+        info = get_model_info(model)
+
+        return [info.get(name).column for name in fields]
+
+    def has_table(self, model, fields, using):
+        table = self.get_table(model, fields, using)
+        if (using, table) in self._tables:
+            return True
+
+        cursor = connections[using].cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [table])
+        if cursor.fetchone() is None:
+            return False
+
+        self._tables.add((using, table))
+
+        return True
+
+    def setup(self, model, fields, using):
+        if self.has_table(model, fields, using):
+            return
+
+        connection = connections[using]
+        qn = connection.ops.quote_name
+        cursor = connection.cursor()
+
+        table = self.get_table(model, fields, using)
+        columns = ', '.join(qn(column) for column in self.get_columns(model, fields))
+
+        cursor.execute('CREATE VIRTUAL TABLE {0} USING fts5({1})'.format(qn(table), columns))
+        cursor.execute('INSERT INTO {0} (rowid, {1}) SELECT {2}, {1} FROM {3}'.format(
+            qn(table), columns, qn(model._meta.pk.column), qn(model._meta.db_table)))
+        transaction.commit_unless_managed(using=using)
+
+        self._tables.add((using, table))
+
+    def search(self, queryset, fields, query):
+        model = queryset.model
+        if not self.has_table(model, fields, queryset.db):
+            return super(SQLiteFTSSearch, self).search(queryset, fields, query)
+
+        terms = get_terms(query)
+        if not terms:
+            return queryset
+
+        qn = connections[queryset.db].ops.quote_name
+        table = self.get_table(model, fields, queryset.db)
+
+        # every term as a quoted prefix, so user input is never FTS syntax
+        match = ' '.join('"{0}"*'.format(term) for term in terms)
+
+        return queryset.extra(
+            where=['{0}.{1} IN (SELECT rowid FROM {2} WHERE {2} MATCH %s)'.format(
+                qn(model._meta.db_table), qn(model._meta.pk.column), qn(table))],
+            params=[match],
+        )
+
+    def index(self, instance, fields, using):
+        model = instance.__class__
+        if not self.has_table(model, fields, using):
+            return
+
+        qn = connections[using].ops.quote_name
+        table = self.get_table(model, fields, using)
+
+        columns = self.get_columns(model, fields)
+        info = get_model_info(model)
+        values = [getattr(instance, info.get(name).attname) for name in fields]
+
+        connections[using].cursor().execute(
+            'INSERT OR REPLACE INTO {0} (rowid, {1}) VALUES (%s, {2})'.format(
+                qn(table), ', '.join(qn(column) for column in columns),
+                ', '.join(['%s'] * len(columns))),
+            [instance.pk] + values)
+        transaction.commit_unless_managed(using=using)
+
+    def remove(self, instance, fields, using):
+        model = instance.__class__
+        if not self.has_table(model, fields, using):
+            return
+
+        qn = connections[using].ops.quote_name
+        table = self.get_table(model, fields, using)
+
+        connections[using].cursor().execute(
+            'DELETE FROM {0} WHERE rowid = %s'.format(qn(table)), [instance.pk])
+        transaction.commit_unless_managed(using=using)
+
+
+class PostgresSearch(PrefixSearch):
+    """
+    Matches the fields' tsvector against the query.
+
+    syncdb creates a matching GIN index, which PostgreSQL maintains.
+    """
+    config = 'simple'
+
+    def get_vector(self, model, fields, qn):
+        columns = [
+            "coalesce({0}.{1}::text, '')".format(
+                qn(model._meta.db_table), qn(get_model_info(model).get(name).column))
+            for name in fields
+        ]
+
+        return "to_tsvector('{0}', {1})".format(self.config, " || ' ' || ".join(columns))
+
+    def search(self, queryset, fields, query):
+        terms = get_terms(query)
+        if not terms:
+            return queryset
+
+        qn = connections[queryset.db].ops.quote_name
+        match = ' & '.join('{0}:*'.format(term) for term in terms)
+
+        return queryset.extra(
+            where=["{0} @@ to_tsquery('{1}', %s)".format(
+                self.get_vector(queryset.model, fields, qn), self.config)],
+            params=[match],
+        )
+
+    def setup(self, model, fields, using):
+        connection = connections[using]
+        qn = connection.ops.quote_name
+
+        info = get_model_info(model)
+        name = '_'.join([model._meta.db_table] + [info.get(field).column for field in fields] + ['search'])
+
+        connection.cursor().execute('CREATE INDEX IF NOT EXISTS {0} ON {1} USING gin ({2})'.format(
+            qn(truncate_name(name, connection.ops.max_name_length())), qn(model._meta.db_table),
+            self.get_vector(model, fields, qn)))
+        transaction.commit_unless_managed(using=using)
+
+
+prefix_search = PrefixSearch()
+sqlite_fts_search = SQLiteFTSSearch()
+postgres_search = PostgresSearch()
+
+_fts5 = None
+
+
+def has_fts5():
+    global _fts5
+
+    if _fts5 is None:
+        try:
+            sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(a)')
+            _fts5 = True
+        except sqlite3.OperationalError:
+            _fts5 = False
+
+    return _fts5
+
+
+def get_backend(model, fields, using):
+    """
+    Returns the best search backend for the database and fields
+    """
+    vendor = connections[using].vendor
+    local = all('__' not in field for field in fields)
+
+    if vendor == 'sqlite' and local and has_fts5():
+        return sqlite_fts_search
+    elif vendor == 'postgresql' and local:
+        return postgres_search
+
+    return prefix_search
+
+
+_watched = {}  # {resource: (model, fields)}
+
+
+def setup(using):
+    """
+    Creates the search tables or indexes of every watched resource
+    """
+    for model, fields in set(_watched.values()):
+        get_backend(model, fields, using).setup(model, fields, using)
+
+
+def get_watched():
+    """
+    Returns {resource: (model, search fields)} of the resources whose index
+    is kept up to date
+    """
+    return dict(_watched)
+
+
+def watch(model, fields, resource=None):
+    """
+    Keeps the resource's search index up to date as instances of its model
+    are saved and deleted
+
+    Resources are told apart by name, e.g. their url_prefix, so that views
+    of the same model with other search fields each have their index.
+    """
+    resource = resource or six.text_type(model._meta)
+    fields = tuple(fields)
+    if _watched.get(resource) == (model, fields):
+        return
+
+    _watched[resource] = (model, fields)
+
+    uid = 'resourceful.search.{0}'.format(model._meta)
+    signals.post_save.connect(_instance_saved, sender=model, weak=False, dispatch_uid=uid)
+    signals.post_delete.connect(_instance_deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+def _get_field_sets(model):
+    return set(fields for watched, fields in _watched.values() if watched is model)
+
+
+def _instance_saved(sender, instance, using, **kwargs):
+    for fields in _get_field_sets(sender):
+        get_backend(sender, fields, using).index(instance, fields, using)
+
+
+def _instance_deleted(sender, instance, using, **kwargs):
+    for fields in _get_field_sets(sender):
+        get_backend(sender, fields, using).remove(instance, fields, using)
@@ -0,0 +1,63 @@
+from django import template
+
+from resourceful.cache import default_html_cache
+
+
+register = template.Library()
+
+
+class CacheRowNode(template.Node):
+    def __init__(self, nodelist, item, name, vary):
+        self.nodelist = nodelist
+        self.item = item
+        self.name = name
+        self.vary = vary
+
+    def render(self, context):
+        item = self.item.resolve(context)
+        name = self.name.resolve(context)
+        vary = [value.resolve(context) for value in self.vary]
+
+        model = item.__class__
+        default_html_cache.watch(model)
+
+        # the model's generation is looked up once per rendering of the listing
+        if self not in context.render_context:
+            context.render_context[self] = {}
+
+        generations = context.render_context[self]
+        if model not in generations:
+            generations[model] = default_html_cache.get_generation(model)
+
+        key = default_html_cache.make_row_key(item, name, vary, generations[model])
+
+        html, generation = default_html_cache.get_row(key, item)
+        if html is None:
+            html = self.nodelist.render(context)
+            default_html_cache.set_row(key, html, generation)
+
+        return html
+
+
+@register.tag
+def cache_row(parser, token):
+    """
+    Caches the markup for a model instance until it is saved or deleted
+
+        {% cache_row item "widget-row" request.user.is_staff %}
+            ...
+        {% endcache_row %}
+
+    The name tells fragments for the same item apart; any further values
+    are ones the markup varies on.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError('{0} takes an item and a fragment name'.format(bits[0]))
+
+    nodelist = parser.parse(('endcache_row',))
+    parser.delete_first_token()
+
+    return CacheRowNode(
+        nodelist, parser.compile_filter(bits[1]), parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]])
@@ -0,0 +1,122 @@
+from django.core.urlresolvers import reverse
+
+from resourceful import registry
+from resourceful.meta import get_model_info
+from resourceful.queries import QueryLog
+
+
+class QueryCountMixin(object):
+    """
+    A TestCase mixin checking that the queries resources run do not grow
+    with the number of rows
+
+    Every registered resource's index and show are requested as JSON with
+    `query_count_sizes` rows in the table, and each must run the same
+    number of queries at every size, within the view's `query_budgets`.
+    Nested resources are requested under the parent make_rows() returns.
+
+    Only the queries run until the view returns are counted, as for the
+    budgets themselves: not those run while a streaming response is
+    consumed, nor those of sub-requests BatchView runs in its thread pool.
+    """
+    query_count_sizes = (1, 10, 50)
+    query_count_params = {'_format': 'json'}
+
+    def make_rows(self, resource, count):
+        """
+        Makes sure the resource's index lists at least `count` items
+
+        Returns False to skip the resource and, for resources with a
+        `parent_field`, the parent the items were made under.  By default
+        the latest row is copied, so setUp() has to make one; resources
+        without any, or whose model has unique fields, are skipped and
+        need an override.
+        """
+        model = resource.model_class
+        info = get_model_info(model)
+
+        if any(field.unique and not field.primary_key for field in info.local_fields):
+            return False
+
+        rows = list(model._default_manager.order_by('-pk')[:1])
+        if not rows:
+            return False
+
+        for i in range(model._default_manager.count(), count):
+            row = model._default_manager.get(pk=rows[0].pk)
+            row.pk = row.id = None
+            row.save(force_insert=True)
+
+        parent_field = resource.get_view_attr('parent_field')
+        if parent_field:
+            return getattr(rows[0], parent_field)
+
+    def get_query_counts(self, resource):
+        """
+        Returns {action: [queries at each size]} for the resource
+        """
+        counts = {'index': [], 'show': []}
+
+        for size in self.query_count_sizes:
+            parent = self.make_rows(resource, size)
+            if parent is False:
+                return None
+
+            items = resource.model_class._default_manager.order_by('-pk')
+            url_name, kwargs = resource.url_name, {}
+
+            parent_field = resource.get_view_attr('parent_field')
+            if parent_field and parent is not None:
+                items = items.filter(**{parent_field: parent})
+                url_name, kwargs = resource.nested_url_name, {'parent_id': parent.pk}
+
+            counts['index'].append(self._count_queries(reverse(url_name('index'), kwargs=kwargs)))
+
+            kwargs['id'] = items[0].pk
+            counts['show'].append(self._count_queries(reverse(url_name('show'), kwargs=kwargs)))
+
+        return counts
+
+    def _count_queries(self, path):
+        with QueryLog() as queries:
+            response = self.client.get(path, self.query_count_params)
+
+        self.assertEqual(200, response.status_code, '{0} responded {1}'.format(path, response.status_code))
+
+        return queries.count
+
+    def assertQueryCountsConstant(self, resources=None):
+        """
+        Fails for resources whose query counts grow with the rows or go
+        over their budget, returns the counts of the others
+        """
+        if resources is None:
+            registry.warm_up()
+            resources = registry.get_resources()
+
+        report = {}
+        failures = []
+
+        for resource in resources:
+            counts = self.get_query_counts(resource)
+            if counts is None:
+                continue
+
+            report[resource.url_prefix] = counts
+            budgets = resource.get_view_attr('query_budgets')
+
+            for action, values in sorted(counts.items()):
+                name = '{0}.{1}'.format(resource.url_prefix, action)
+
+                if len(set(values)) > 1:
+                    failures.append('{0} ran {1} queries with {2} rows'.format(
+                        name, values, list(self.query_count_sizes)))
+
+                if action in budgets and max(values) > budgets[action]:
+                    failures.append('{0} ran {1} queries, its budget is {2}'.format(
+                        name, max(values), budgets[action]))
+
+        if failures:
+            self.fail('\n'.join(failures))
+
+        return report
@@ -0,0 +1,92 @@
+import json
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from testapp.models import Drawing, Widget
+from testapp.views import WidgetView
+
+
+class AggregateTestCase(TestCase):
+    def get(self, data, status_code=200):
+        response = self.client.get('/widget/aggregate', data)
+        self.assertEqual(status_code, response.status_code)
+
+        if status_code == 200:
+            return json.loads(response.content)
+
+    def setUp(self):
+        self.d1 = Drawing.objects.create(name='model1')
+        self.d2 = Drawing.objects.create(name='model2')
+
+        Widget.objects.create(name='item1', drawing=self.d1, quantity=10)
+        Widget.objects.create(name='item2', drawing=self.d1, quantity=20)
+        Widget.objects.create(name='item3', drawing=self.d2, quantity=5)
+
+    def test_group_by(self):
+        with self.assertNumQueries(1):
+            data = self.get({'_group_by': 'drawing', '_agg': 'sum:quantity,count:id'})
+
+        self.assertEqual(['drawing', 'sum_quantity', 'count_id'], data['columns'])
+        self.assertEqual([[self.d1.id, 30, 2], [self.d2.id, 5, 1]], data['rows'])
+
+    def test_without_grouping(self):
+        data = self.get({'_agg': ['max:quantity', 'avg:quantity']})
+
+        self.assertEqual(['max_quantity', 'avg_quantity'], data['columns'])
+        self.assertEqual([[20, 35 / 3.0]], data['rows'])
+
+    def test_filters_like_index(self):
+        data = self.get({'drawing': 'model1', '_group_by': 'drawing__name', '_agg': 'min:quantity'})
+
+        self.assertEqual([['model1', 10]], data['rows'])
+
+    def test_validation(self):
+        self.get({'_agg': 'sum:name'}, status_code=400)
+        self.get({'_agg': 'median:quantity'}, status_code=400)
+        self.get({'_agg': 'sum:quantity', '_group_by': 'name'}, status_code=400)
+        self.get({}, status_code=400)
+
+    def test_cached(self):
+        cache.clear()
+
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', aggregate_cache_timeout=60)
+        request = RequestFactory().get('/widget/aggregate', {'_agg': 'count:id'})
+
+        response = view(request, action='aggregate')
+        self.assertEqual('max-age=60', response['Cache-Control'])
+
+        Widget.objects.all().delete()
+
+        with self.assertNumQueries(0):
+            response = view(request, action='aggregate')
+
+        self.assertEqual([[3]], json.loads(response.content)['rows'])
+
+    def test_cached_per_scope(self):
+        cache.clear()
+
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', aggregate_cache_timeout=60)
+
+        def get(user, **kwargs):
+            request = RequestFactory().get('/widget/aggregate', {'_agg': 'count:id'})
+            request.user = user
+
+            return json.loads(view(request, action='aggregate', **kwargs).content)['rows']
+
+        user = User.objects.create(username='user1')
+        self.assertEqual([[3]], get(AnonymousUser()))
+        self.assertEqual([[2]], get(AnonymousUser(), parent_id=str(self.d1.pk)))
+
+        Widget.objects.filter(drawing=self.d2).delete()
+
+        # another user, or parent, is not served what was cached for the first
+        self.assertEqual([[2]], get(user))
+        self.assertEqual([[3]], get(AnonymousUser()))
+
+    def test_unsafe_method(self):
+        response = self.client.post('/widget/aggregate?_agg=count:id')
+
+        self.assertEqual(405, response.status_code)
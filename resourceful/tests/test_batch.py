@@ -0,0 +1,86 @@
+import json
+
+from django.test import TestCase, TransactionTestCase
+
+from resourceful.views import RoutingError
+
+from testapp.models import Drawing, Note, Widget
+
+
+class BatchTestCase(TestCase):
+    def batch(self, requests, status_code=200):
+        response = self.client.post('/batch', json.dumps(requests), content_type='application/json')
+        self.assertEqual(status_code, response.status_code)
+
+        if status_code == 200:
+            return json.loads(response.content)
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.widget = Widget.objects.create(name='widget1', drawing=self.drawing, quantity=1)
+
+    def test_reads(self):
+        results = self.batch([
+            {'url': '/drawing/{0}'.format(self.drawing.pk)},
+            {'url': '/widget?drawing_id={0}'.format(self.drawing.pk)},
+            {'url': '/drawing/{0}/widget'.format(self.drawing.pk)},
+        ])
+
+        self.assertEqual([200, 200, 200], [result['status'] for result in results])
+        self.assertEqual('drawing1', results[0]['body']['item']['fields']['name'])
+        self.assertEqual(['widget1'], [x['fields']['name'] for x in results[1]['body']['items']])
+        self.assertEqual(results[1]['body'], results[2]['body'])
+
+    def test_write_then_read(self):
+        url = '/widget/{0}'.format(self.widget.pk)
+
+        results = self.batch([
+            {'method': 'PATCH', 'url': url, 'body': {'name': 'renamed'}},
+            {'url': url},
+        ])
+
+        self.assertEqual(200, results[0]['status'])
+        self.assertEqual('renamed', results[1]['body']['item']['fields']['name'])
+
+    def test_not_found(self):
+        results = self.batch([
+            {'url': '/drawing/0'},
+            {'url': '/nowhere'},
+        ])
+
+        self.assertEqual([404, 404], [result['status'] for result in results])
+
+    def test_invalid(self):
+        self.batch({'url': '/drawing'}, status_code=400)
+        self.batch([{'method': 'GET'}], status_code=400)
+        self.batch([{'url': '/drawing'}] * 21, status_code=400)
+
+
+# rollbacks need real transactions, which TestCase turns into no-ops
+class BatchTransactionTestCase(TransactionTestCase):
+    def batch(self, requests):
+        return self.client.post('/batch', json.dumps(requests), content_type='application/json')
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.widget = Widget.objects.create(name='widget1', drawing=self.drawing, quantity=1)
+
+    def test_failure_rolls_back_partial_update(self):
+        url = '/widget/{0}'.format(self.widget.pk)
+
+        with self.assertRaises(RoutingError):
+            self.batch([
+                {'method': 'PATCH', 'url': url, 'body': {'name': 'renamed'}},
+                {'method': 'POST', 'url': url},
+            ])
+
+        self.assertEqual('widget1', Widget.objects.get(pk=self.widget.pk).name)
+
+    def test_failure_rolls_back_upsert(self):
+        with self.assertRaises(RoutingError):
+            self.batch([
+                {'method': 'POST', 'url': '/note/upsert', 'body': {'title': 'note1'}},
+                {'method': 'POST', 'url': '/widget/{0}'.format(self.widget.pk)},
+            ])
+
+        self.assertFalse(Note.objects.exists())
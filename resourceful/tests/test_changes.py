@@ -0,0 +1,138 @@
+import base64
+import datetime
+import json
+import time
+import urllib
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import timezone
+from flexmock import flexmock
+
+from resourceful import changes
+from resourceful.models import Tombstone
+
+from testapp.models import Drawing
+from testapp.views import DrawingView
+
+
+class ChangesTestCase(TestCase):
+    def get(self, cursor=None, status_code=200, **kwargs):
+        data = {}
+        if cursor:
+            data['_cursor'] = cursor
+
+        view = DrawingView.as_view(url_prefix='drawing', template_dir='testapp', **kwargs)
+        response = view(RequestFactory().get('/drawing/changes', data), action='changes')
+        self.assertEqual(status_code, response.status_code)
+
+        if status_code == 200:
+            return json.loads(response.content)
+
+    def get_names(self, data):
+        return [item['fields']['name'] for item in data['items']]
+
+    def setUp(self):
+        self.d1 = Drawing.objects.create(name='drawing1')
+        self.d2 = Drawing.objects.create(name='drawing2')
+
+    def test_full_then_incremental(self):
+        data = self.get()
+        self.assertEqual(['drawing1', 'drawing2'], self.get_names(data))
+        self.assertEqual([], data['deleted'])
+        self.assertFalse(data['more'])
+
+        data = self.get(data['cursor'])
+        self.assertEqual([], data['items'])
+
+        self.d1.name = 'renamed'
+        self.d1.save()
+        Drawing.objects.create(name='drawing3')
+        deleted_pk = self.d2.pk
+        self.d2.delete()
+
+        data = self.get(data['cursor'])
+        self.assertEqual(['renamed', 'drawing3'], self.get_names(data))
+        self.assertEqual([str(deleted_pk)], data['deleted'])
+
+    def test_tombstones(self):
+        pk = self.d1.pk
+        self.d1.delete()
+
+        tombstone = Tombstone.objects.get()
+        self.assertEqual(('testapp.drawing', str(pk)), (tombstone.model, tombstone.object_id))
+
+    def test_paging(self):
+        Drawing.objects.create(name='drawing3')
+
+        data = self.get(changes_limit=2)
+        self.assertEqual(['drawing1', 'drawing2'], self.get_names(data))
+        self.assertTrue(data['more'])
+
+        data = self.get(data['cursor'], changes_limit=2)
+        self.assertEqual(['drawing3'], self.get_names(data))
+        self.assertFalse(data['more'])
+
+    def test_same_timestamp(self):
+        # rows sharing a timestamp are told apart by pk
+        Drawing.objects.update(updated_at=self.d1.updated_at)
+
+        data = self.get(changes_limit=1)
+        data = self.get(data['cursor'], changes_limit=1)
+
+        self.assertEqual(['drawing2'], self.get_names(data))
+
+    def test_partial_update(self):
+        cursor = self.get()['cursor']
+
+        response = self.client.generic(
+            'PATCH', '/drawing/{0}'.format(self.d1.pk), urllib.urlencode({'name': 'patched'}),
+            content_type='application/x-www-form-urlencoded', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(200, response.status_code)
+
+        self.assertEqual(['patched'], self.get_names(self.get(cursor)))
+
+    def test_prune(self):
+        old_pk, new_pk = self.d1.pk, self.d2.pk
+        self.d1.delete()
+        self.d2.delete()
+        Tombstone.objects.filter(object_id=str(old_pk)).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=2))
+
+        self.assertEqual(1, changes.prune(Drawing, 24 * 60 * 60))
+        self.assertEqual([str(new_pk)], list(Tombstone.objects.values_list('object_id', flat=True)))
+
+        stdout = StringIO()
+        call_command('cleanup_resources', tombstone_age=0, stdout=stdout)
+        self.assertFalse(Tombstone.objects.exists())
+        self.assertIn('1 tombstones removed', stdout.getvalue())
+
+    def test_prune_leaves_replicas_alone(self):
+        aliases = set()
+        flexmock(changes).should_receive('prune').replace_with(
+            lambda model, max_age, using: aliases.add(using) or 0)
+
+        call_command('cleanup_resources', tombstone_age=0, stdout=StringIO())
+        self.assertEqual(set(['default']), aliases)
+
+        call_command('cleanup_resources', tombstone_age=0, database='replica', stdout=StringIO())
+        self.assertEqual(set(['default', 'replica']), aliases)
+
+    def test_expired_cursor(self):
+        data = json.loads(base64.urlsafe_b64decode(str(self.get()['cursor'])))
+        data[3] = int(time.time()) - 2 * 24 * 60 * 60
+        cursor = base64.urlsafe_b64encode(json.dumps(data))
+
+        self.get(cursor, status_code=200)
+        self.get(cursor, status_code=410, changes_retention=24 * 60 * 60)
+
+    def test_invalid_cursor(self):
+        self.get('nope', status_code=400)
+
+    def test_not_enabled(self):
+        view = DrawingView.as_view(url_prefix='drawing', template_dir='testapp', changes_field=None)
+
+        self.assertRaises(Http404, view, RequestFactory().get('/drawing/changes'), action='changes')
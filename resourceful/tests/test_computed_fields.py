@@ -0,0 +1,47 @@
+import json
+
+from django.test import TestCase
+
+from testapp.models import Drawing, Widget
+
+
+class ComputedFieldsTestCase(TestCase):
+    def setUp(self):
+        self.d1 = Drawing.objects.create(name='drawing1')
+        self.d2 = Drawing.objects.create(name='drawing2')
+
+        Widget.objects.create(name='item1', drawing=self.d1, quantity=10)
+        Widget.objects.create(name='item2', drawing=self.d1, quantity=20)
+
+    def get(self, url, computed=None, status_code=200):
+        params = {'_format': 'json'}
+        if computed is not None:
+            params['_computed'] = computed
+
+        response = self.client.get(url, params)
+        self.assertEqual(status_code, response.status_code)
+
+        if status_code == 200:
+            return json.loads(response.content)
+
+    def test_index(self):
+        with self.assertNumQueries(1):
+            data = self.get('/drawing', 'widget_count,total_quantity')
+
+        fields = dict((item['pk'], item['fields']) for item in data['items'])
+        self.assertEqual((2, 30), (fields[self.d1.pk]['widget_count'], fields[self.d1.pk]['total_quantity']))
+        self.assertEqual((0, None), (fields[self.d2.pk]['widget_count'], fields[self.d2.pk]['total_quantity']))
+
+    def test_show(self):
+        data = self.get('/drawing/{0}'.format(self.d1.pk), 'widget_count')
+
+        self.assertEqual(2, data['item']['fields']['widget_count'])
+        self.assertNotIn('total_quantity', data['item']['fields'])
+
+    def test_only_when_requested(self):
+        data = self.get('/drawing')
+
+        self.assertNotIn('widget_count', data['items'][0]['fields'])
+
+    def test_unknown(self):
+        self.get('/drawing', 'name', status_code=400)
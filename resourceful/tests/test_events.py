@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.http import Http404
+from django.test import TransactionTestCase
+from django.test.client import RequestFactory
+
+from resourceful.events import LocalBroker
+
+from testapp.models import Drawing, Widget
+from testapp.views import WidgetView
+
+
+broker = LocalBroker()
+
+
+# events are published on commit, which TestCase turns into a no-op
+class EventsTestCase(TransactionTestCase):
+    def stream(self, data=None, **kwargs):
+        kwargs.setdefault('events_enabled', True)
+        kwargs.setdefault('event_broker', broker)
+        kwargs.setdefault('event_heartbeat', 0.01)
+
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', **kwargs)
+        response = view(RequestFactory().get('/widget/events', data or {}), action='events')
+
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertEqual('no-cache', response['Cache-Control'])
+
+        content = iter(response.streaming_content)
+        self.assertTrue(next(content).startswith('retry: '))
+
+        return content
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+
+    def create(self, name):
+        return Widget.objects.create(name=name, drawing=self.drawing, quantity=1)
+
+    def next_event(self, content):
+        for message in content:
+            if not message.startswith(':'):
+                return message
+
+    def test_disabled(self):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp')
+        request = RequestFactory().get('/widget/events')
+
+        self.assertRaises(Http404, view, request, action='events')
+
+    def test_heartbeat(self):
+        content = self.stream()
+
+        self.assertEqual(': heartbeat\n\n', next(content))
+
+    def test_create_update_delete(self):
+        content = self.stream()
+
+        widget = self.create('widget1')
+        message = self.next_event(content)
+        self.assertTrue(message.startswith('event: create\nid: '))
+        self.assertIn('"widget1"', message)
+
+        widget.name = 'renamed'
+        widget.save()
+        message = self.next_event(content)
+        self.assertTrue(message.startswith('event: update\n'))
+        self.assertIn('"renamed"', message)
+
+        pk = widget.pk
+        widget.delete()
+        message = self.next_event(content)
+        self.assertTrue(message.startswith('event: delete\n'))
+        self.assertIn('{{"pk": {0}}}'.format(pk), message)
+
+    def test_filtered(self):
+        content = self.stream({'name': 'wanted'})
+
+        other = self.create('other')
+        self.create('wanted')
+        other.delete()
+
+        message = self.next_event(content)
+        self.assertTrue(message.startswith('event: create\n'))
+        self.assertIn('"wanted"', message)
+
+        self.assertEqual(': heartbeat\n\n', next(content))
+
+    def test_overflow(self):
+        content = self.stream(event_queue_size=1)
+
+        self.create('widget1')
+        self.create('widget2')
+
+        self.assertTrue(next(content).startswith('event: overflow\n'))
+        self.assertRaises(StopIteration, next, content)
+
+    def test_published_on_commit(self):
+        content = self.stream()
+
+        with transaction.commit_on_success():
+            self.create('widget1')
+            self.create('widget2')
+            self.assertEqual(': heartbeat\n\n', next(content))
+
+        # both in one visibility query
+        with self.assertNumQueries(1):
+            self.assertIn('"widget1"', self.next_event(content))
+            self.assertIn('"widget2"', self.next_event(content))
+
+    def test_rolled_back(self):
+        content = self.stream()
+
+        try:
+            with transaction.commit_on_success():
+                self.create('widget1')
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertEqual(': heartbeat\n\n', next(content))
+        self.assertFalse(Widget.objects.exists())
@@ -0,0 +1,90 @@
+import json
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from resourceful import explain, registry
+
+from testapp.models import Drawing, Widget
+
+
+class ExplainTestCase(TestCase):
+    def get_queries(self, url_prefix):
+        registry.warm_up()
+        result = explain.report([registry.get_resource(url_prefix)])
+
+        return dict((query['name'], query) for query in result['resources'][0]['queries'])
+
+    def get_kinds(self, query):
+        return sorted(problem['kind'] for problem in query['problems'])
+
+    def test_shapes(self):
+        queries = self.get_queries('widget')
+
+        self.assertEqual(
+            ['filter drawing', 'filter drawing__name', 'index', 'nested index', 'show'],
+            sorted(queries))
+
+    def test_indexed_filters(self):
+        queries = self.get_queries('widget')
+
+        self.assertEqual([], queries['index']['problems'])
+        self.assertEqual([], queries['show']['problems'])
+        self.assertEqual([], queries['filter drawing']['problems'])
+        self.assertEqual([], queries['nested index']['problems'])
+
+    def test_join_without_index(self):
+        query = self.get_queries('widget')['filter drawing__name']
+
+        self.assertEqual(1, query['joins'])
+        self.assertIn({
+            'kind': explain.MISSING_INDEX,
+            'table': Drawing._meta.db_table,
+            'column': 'name',
+        }, query['problems'])
+        self.assertIn({'kind': explain.SEQ_SCAN, 'table': Drawing._meta.db_table}, query['problems'])
+
+    def test_lookup_field(self):
+        self.assertEqual(Drawing._meta.get_field('name'), explain.get_lookup_field(Widget, 'drawing__name__icontains'))
+        self.assertEqual(Widget._meta.get_field('drawing'), explain.get_lookup_field(Widget, 'drawing'))
+        self.assertEqual(Widget._meta.pk, explain.get_lookup_field(Widget, 'pk'))
+        self.assertIsNone(explain.get_lookup_field(Widget, 'nope'))
+
+    def test_sqlite_plans(self):
+        shape = explain.QueryShape('filter', Widget.objects.all(), {'quantity': '0'})
+
+        problems = explain.find_problems('sqlite', [
+            {'detail': 'SCAN TABLE testapp_widget'},
+            {'detail': 'SCAN testapp_drawing USING COVERING INDEX x'},
+            {'detail': 'USE TEMP B-TREE FOR ORDER BY'},
+        ], shape)
+
+        self.assertEqual(
+            [explain.FILESORT, explain.MISSING_INDEX, explain.SEQ_SCAN],
+            self.get_kinds({'problems': problems}))
+
+    def test_postgresql_plans(self):
+        shape = explain.QueryShape('filter', Widget.objects.all(), {'drawing': '0'})
+
+        problems = explain.find_problems('postgresql', [
+            {'QUERY PLAN': 'Sort  (cost=1.02..1.03 rows=1 width=4)'},
+            {'QUERY PLAN': '  ->  Seq Scan on testapp_widget  (cost=0.00..1.01 rows=1 width=4)'},
+        ], shape)
+
+        self.assertEqual([explain.FILESORT, explain.SEQ_SCAN], self.get_kinds({'problems': problems}))
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('explain_resources', stdout=stdout)
+
+        result = json.loads(stdout.getvalue())
+        self.assertIn('widget', [entry['resource'] for entry in result['resources']])
+        self.assertTrue(result['problems'])
+
+        self.assertRaises(CommandError, call_command, 'explain_resources', fail=True, stdout=StringIO())
+
+        stdout = StringIO()
+        call_command('explain_resources', ignore=['seq_scan', 'missing_index'], fail=True, stdout=stdout)
+        self.assertEqual(0, json.loads(stdout.getvalue())['problems'])
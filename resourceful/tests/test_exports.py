@@ -0,0 +1,176 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.db import transaction
+from django.http import Http404
+from django.test import TestCase, TransactionTestCase
+from django.test.client import RequestFactory
+from django.utils import timezone
+
+from resourceful import exports
+from resourceful.models import ExportJob
+
+from testapp.models import Drawing, Widget
+from testapp.views import WidgetView
+
+
+class ExportTestCase(TransactionTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.directory = tempfile.mkdtemp()
+
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.other = Drawing.objects.create(name='drawing2')
+
+        self.widgets = [
+            Widget.objects.create(name='item{0}'.format(i), drawing=self.drawing, quantity=i)
+            for i in range(5)
+        ]
+        self.widgets.append(Widget.objects.create(name='other', drawing=self.other, quantity=99))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def call(self, request, **kwargs):
+        view = WidgetView.as_view(
+            url_prefix='widget', template_dir='testapp',
+            export_formats=('jsonl', 'json', 'csv'), export_queue=exports.InlineQueue(),
+            export_dir=self.directory, export_partition_size=2)
+
+        return view(request, action='export', **kwargs)
+
+    def start(self, params, **kwargs):
+        response = self.call(self.factory.post('/widget/export?' + params), **kwargs)
+        self.assertEqual(202, response.status_code)
+
+        return json.loads(response.content)['job']
+
+    def download(self, job_id):
+        response = self.call(self.factory.get('/widget/export', {'_job': job_id, '_download': '1'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('application/gzip', response['Content-Type'])
+
+        content = b''.join(response.streaming_content)
+        return gzip.GzipFile(fileobj=io.BytesIO(content)).read().decode('utf-8')
+
+    def test_jsonl_in_partitions(self):
+        job_id = self.start('_export=jsonl&drawing=drawing1')
+
+        job = ExportJob.objects.get(pk=job_id)
+        self.assertEqual(ExportJob.DONE, job.status)
+        self.assertEqual(5, job.rows)
+
+        rows = [json.loads(line) for line in self.download(job_id).splitlines()]
+        self.assertEqual(['item{0}'.format(i) for i in range(5)], [row['fields']['name'] for row in rows])
+
+        # only the finished file is left behind
+        self.assertEqual(['{0}.jsonl.gz'.format(job_id)], os.listdir(self.directory))
+
+    def test_queued_once_committed(self):
+        with transaction.commit_on_success():
+            job_id = self.start('_export=jsonl')
+
+            # workers could not see the job yet
+            self.assertEqual(ExportJob.PENDING, ExportJob.objects.get(pk=job_id).status)
+            self.assertEqual([], os.listdir(self.directory))
+
+        self.assertEqual(ExportJob.DONE, ExportJob.objects.get(pk=job_id).status)
+
+    def test_dropped_on_rollback(self):
+        try:
+            with transaction.commit_on_success():
+                self.start('_export=jsonl')
+                raise ValueError
+        except ValueError:
+            pass
+
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_rebuilt_from_request(self):
+        job = ExportJob.objects.get(pk=self.start('_export=jsonl', parent_id=str(self.other.pk)))
+
+        self.assertEqual('widget', job.resource)
+        self.assertEqual(str(self.other.pk), json.loads(job.params)['parent_id'])
+        self.assertEqual(1, job.rows)
+
+    def test_prune(self):
+        done = ExportJob.objects.get(pk=self.start('_export=jsonl'))
+        path = exports.get_path(done)
+        running = ExportJob.objects.create(
+            model='testapp.widget', resource='widget', params='{}', using='default', format='jsonl',
+            directory=self.directory, status=ExportJob.RUNNING)
+        open(os.path.join(self.directory, '{0}.0.part'.format(running.id)), 'w').close()
+
+        ExportJob.objects.update(created_at=timezone.now() - datetime.timedelta(days=2))
+        self.assertEqual(0, exports.prune(Widget, 24 * 60 * 60, 60 * 60))
+
+        running = ExportJob.objects.get(pk=running.pk)
+        self.assertEqual(ExportJob.FAILED, running.status)
+        self.assertEqual([os.path.basename(path)], os.listdir(self.directory))
+
+        ExportJob.objects.update(finished_at=timezone.now() - datetime.timedelta(days=2))
+        self.assertEqual(2, exports.prune(Widget, 24 * 60 * 60, 60 * 60))
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_json(self):
+        data = json.loads(self.download(self.start('_export=json')))
+
+        self.assertEqual([w.pk for w in self.widgets], [row['pk'] for row in data])
+
+    def test_json_empty(self):
+        self.assertEqual([], json.loads(self.download(self.start('_export=json&drawing=none'))))
+
+    def test_csv(self):
+        rows = list(csv.reader(self.download(self.start('_export=csv&drawing=drawing2')).splitlines()))
+
+        self.assertEqual(['pk', 'name', 'drawing', 'quantity', 'version'], rows[0])
+        self.assertEqual([str(self.widgets[-1].pk), 'other', str(self.other.pk), '99', '1'], rows[1])
+
+    def test_status(self):
+        job_id = self.start('_export=jsonl')
+
+        data = json.loads(self.call(self.factory.get('/widget/export', {'_job': job_id})).content)
+        self.assertEqual({'job': job_id, 'status': 'done', 'rows': 6, 'error': ''}, data)
+
+        with self.assertRaises(Http404):
+            self.call(self.factory.get('/widget/export', {'_job': 'missing'}))
+
+    def test_unknown_format(self):
+        response = self.call(self.factory.post('/widget/export?_export=xml'))
+
+        self.assertEqual(400, response.status_code)
+
+    def test_disabled(self):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp')
+
+        with self.assertRaises(Http404):
+            view(self.factory.post('/widget/export'), action='export')
+
+    def test_partitions(self):
+        queryset = Widget.objects.order_by('pk')
+        lower = self.widgets[0].pk
+
+        partitions = exports.get_partitions(queryset, 2)
+        self.assertEqual((lower, lower + 1), partitions[0])
+        self.assertEqual(3, len(partitions))
+        self.assertEqual([(None, None)], exports.get_partitions(queryset, 100))
+
+
+class ProcessPoolQueueTestCase(TestCase):
+    def test_map(self):
+        results = []
+        queue = exports.ProcessPoolQueue(processes=2)
+
+        queue.map(abs, [-1, -2, 3], results.append)
+        queue.pool.close()
+        queue.pool.join()
+
+        self.assertEqual([[1, 2, 3]], results)
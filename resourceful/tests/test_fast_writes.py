@@ -0,0 +1,71 @@
+from django.db.models import signals
+from django.test import TestCase
+
+from testapp.models import Drawing, Note, Widget
+from testapp.views import DrawingView
+
+
+class FastWritesTestCase(TestCase):
+    def setUp(self):
+        self.note = Note.objects.create(title='note1', body='text')
+
+    def test_destroy_is_one_statement(self):
+        with self.assertNumQueries(1):
+            response = self.client.delete('/note/{0}'.format(self.note.id))
+
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_destroy_missing_is_404(self):
+        with self.assertNumQueries(1):
+            response = self.client.delete('/note/{0}'.format(self.note.id + 1))
+
+        self.assertEqual(404, response.status_code)
+
+    def test_update_is_one_statement(self):
+        url = '/note/{0}'.format(self.note.id)
+
+        # one query for the unique check on title, one for the UPDATE
+        with self.assertNumQueries(2):
+            response = self.client.post(url, {'_method': 'put', 'title': 'renamed', 'body': 'new'})
+
+        self.assertEqual(302, response.status_code)
+
+        note = Note.objects.get(pk=self.note.pk)
+        self.assertEqual('renamed', note.title)
+        self.assertTrue(note.updated_at > self.note.updated_at)
+
+    def test_update_missing_is_404(self):
+        url = '/note/{0}'.format(self.note.id + 1)
+
+        response = self.client.post(url, {'_method': 'put', 'title': 'renamed'})
+        self.assertEqual(404, response.status_code)
+
+    def test_update_keeps_unique_checks(self):
+        Note.objects.create(title='taken')
+
+        url = '/note/{0}'.format(self.note.id)
+        response = self.client.post(url, {'_method': 'put', 'title': 'taken'})
+
+        self.assertIn('already exists', response.content)
+        self.assertEqual('note1', Note.objects.get(pk=self.note.pk).title)
+
+    def test_signal_receivers_fall_back(self):
+        def receiver(sender, **kwargs):
+            pass
+
+        signals.post_delete.connect(receiver, sender=Note)
+        self.addCleanup(signals.post_delete.disconnect, receiver, sender=Note)
+
+        with self.assertNumQueries(2):  # SELECT, DELETE
+            self.client.delete('/note/{0}'.format(self.note.id))
+
+    def test_cascades_fall_back(self):
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='item1', drawing=drawing, quantity=1)
+
+        view = DrawingView(fast_writes=True, model_class=Drawing)
+        queryset = Drawing.objects.filter(pk=drawing.pk)
+
+        self.assertFalse(view._can_fast_write('delete', queryset))
+        self.assertTrue(view._can_fast_write('save', queryset))
@@ -0,0 +1,107 @@
+import json
+
+from django.core.cache import get_cache
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from resourceful.cache import FragmentCache
+
+from testapp.models import Drawing, Widget
+from testapp.views import DrawingView, WidgetView
+
+
+class FragmentCacheTestCase(TestCase):
+    def setUp(self):
+        get_cache('default').clear()
+
+        self.factory = RequestFactory()
+        self.cache = FragmentCache()
+
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.w1 = Widget.objects.create(name='item1', drawing=self.drawing, quantity=10)
+        self.w2 = Widget.objects.create(name='item2', drawing=self.drawing, quantity=20)
+
+    def get(self, view_class, path, **kwargs):
+        view = view_class.as_view(
+            url_prefix=view_class.model_class._meta.module_name, template_dir='testapp',
+            fragment_cache=self.cache)
+
+        return json.loads(view(self.factory.get(path, {'_format': 'json'}), **kwargs).content)
+
+    def test_same_output_as_uncached(self):
+        expected = json.loads(self.client.get('/widget', {'_format': 'json'}).content)
+
+        self.assertEqual(expected, self.get(WidgetView, '/widget'))
+        self.assertEqual(expected, self.get(WidgetView, '/widget'))
+
+        path = '/widget/{0}'.format(self.w1.id)
+        expected = json.loads(self.client.get(path, {'_format': 'json'}).content)
+        self.assertEqual(expected, self.get(WidgetView, path, id=str(self.w1.id)))
+
+    def test_unversioned_fragments_invalidated_by_signals(self):
+        self.get(DrawingView, '/drawing')
+
+        # update() sends no signals, so the cached fragment is served
+        Drawing.objects.filter(pk=self.drawing.pk).update(name='updated')
+        data = self.get(DrawingView, '/drawing')
+        self.assertEqual('drawing1', data['items'][0]['fields']['name'])
+
+        drawing = Drawing.objects.get(pk=self.drawing.pk)
+        drawing.save()
+
+        data = self.get(DrawingView, '/drawing')
+        self.assertEqual('updated', data['items'][0]['fields']['name'])
+
+    def test_invalidated_in_other_processes(self):
+        self.get(DrawingView, '/drawing')
+        Drawing.objects.filter(pk=self.drawing.pk).update(name='updated')
+
+        # another process, which has never served drawings, saves one
+        other = FragmentCache()
+        other.invalidate(Drawing.objects.get(pk=self.drawing.pk))
+
+        data = self.get(DrawingView, '/drawing')
+        self.assertEqual('updated', data['items'][0]['fields']['name'])
+
+    def test_save_keeps_other_instances_fragments(self):
+        self.get(WidgetView, '/widget')
+        Widget.objects.filter(pk__in=[self.w1.pk, self.w2.pk]).update(name='stale')
+
+        self.w1.name = 'renamed'
+        self.w1.save()
+
+        data = self.get(WidgetView, '/widget')
+        self.assertEqual(['renamed', 'item2'], [x['fields']['name'] for x in data['items']])
+
+    def test_invalidate_model(self):
+        self.get(DrawingView, '/drawing')
+        Drawing.objects.update(name='updated')
+
+        FragmentCache().invalidate_model(Drawing)
+
+        data = self.get(DrawingView, '/drawing')
+        self.assertEqual('updated', data['items'][0]['fields']['name'])
+
+    def test_versioned_fragments(self):
+        self.get(WidgetView, '/widget')
+
+        Widget.objects.filter(pk=self.w1.pk).update(name='renamed', version=2)
+        data = self.get(WidgetView, '/widget')
+
+        self.assertEqual(['renamed', 'item2'], [x['fields']['name'] for x in data['items']])
+
+    def test_lru_is_bounded(self):
+        cache = FragmentCache(max_entries=1)
+
+        keys = [cache.make_key(widget, version_field='version') for widget in (self.w1, self.w2)]
+        for key in keys:
+            cache.set_many({key: '{}'}, {key: ('model', 'instance')})
+
+        self.assertEqual([keys[1]], list(cache._local))
+
+    def test_unversioned_fragments_stay_out_of_lru(self):
+        cache = FragmentCache()
+        key = cache.make_key(self.drawing)
+        cache.set_many({key: '{}'}, {key: ('model', 'instance')})
+
+        self.assertEqual(0, len(cache._local))
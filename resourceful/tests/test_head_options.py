@@ -0,0 +1,90 @@
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from testapp.models import Drawing, Widget
+from testapp.views import DrawingView, WidgetView
+
+
+class HeadTestCase(TestCase):
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.w1 = Widget.objects.create(name='item1', drawing=self.drawing, quantity=10)
+        self.w2 = Widget.objects.create(name='item2', drawing=self.drawing, quantity=20)
+
+    def test_index_counts(self):
+        with self.assertNumQueries(1):
+            response = self.client.head('/widget', {'name': 'item1'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('1', response['X-Total-Count'])
+        self.assertEqual(b'', response.content)
+
+    def test_show_etag(self):
+        response = self.client.get('/widget/{0}'.format(self.w1.pk))
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.head('/widget/{0}'.format(self.w1.pk))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+        response = self.client.head('/widget/{0}'.format(self.w1.pk), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+
+    def test_show_without_version(self):
+        response = self.client.head('/drawing/{0}'.format(self.drawing.pk))
+
+        self.assertEqual(200, response.status_code)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_show_missing(self):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp')
+
+        with self.assertRaises(Http404):
+            view(RequestFactory().head('/widget/0'), id='0')
+
+
+class OptionsTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_allow(self):
+        with self.assertNumQueries(0):
+            response = self.client.options('/widget')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('GET, HEAD, OPTIONS, POST', response['Allow'])
+
+        response = self.client.options('/widget/1')
+        self.assertEqual('DELETE, GET, HEAD, OPTIONS, PATCH, PUT', response['Allow'])
+
+        response = self.client.options('/widget/1/edit')
+        self.assertEqual('GET, HEAD, OPTIONS, PATCH, PUT', response['Allow'])
+
+    def test_preflight(self):
+        view = DrawingView.as_view(
+            url_prefix='drawing', template_dir='testapp', cors_origins=('https://app.example.com',))
+
+        request = self.factory.options(
+            '/drawing', HTTP_ORIGIN='https://app.example.com', HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST')
+        response = view(request)
+
+        self.assertEqual('https://app.example.com', response['Access-Control-Allow-Origin'])
+        self.assertEqual('GET, HEAD, OPTIONS, POST', response['Access-Control-Allow-Methods'])
+        self.assertEqual('86400', response['Access-Control-Max-Age'])
+        self.assertEqual('Origin', response['Vary'])
+
+        response = view(self.factory.get('/drawing', HTTP_ORIGIN='https://app.example.com'))
+        self.assertEqual('https://app.example.com', response['Access-Control-Allow-Origin'])
+
+    def test_other_origin(self):
+        view = DrawingView.as_view(
+            url_prefix='drawing', template_dir='testapp', cors_origins=('https://app.example.com',))
+
+        request = self.factory.options(
+            '/drawing', HTTP_ORIGIN='https://evil.example.com', HTTP_ACCESS_CONTROL_REQUEST_METHOD='POST')
+        response = view(request)
+
+        self.assertFalse(response.has_header('Access-Control-Allow-Origin'))
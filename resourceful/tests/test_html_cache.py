@@ -0,0 +1,98 @@
+import uuid
+
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.client import RequestFactory
+from flexmock import flexmock
+
+from resourceful.cache import HTMLCache, default_html_cache
+
+from testapp.forms import AttachmentForm
+from testapp.models import Attachment, Drawing, Note, Widget
+from testapp.views import AttachmentView
+
+
+class FormHTMLCacheTestCase(TestCase):
+    def get(self, cache, **params):
+        view = AttachmentView.as_view(url_prefix='attachment', template_dir='testapp', form_html_cache=cache)
+
+        return view(RequestFactory().get('/attachment/new', params), action='new')
+
+    def test_cached_until_model_changes(self):
+        cache = HTMLCache(key_prefix=uuid.uuid4().hex)
+        flexmock(AttachmentForm).should_receive('as_table').and_return('<tr><td>form</td></tr>').times(3)
+
+        self.assertContains(self.get(cache), '<td>form</td>')
+        self.assertContains(self.get(cache), '<td>form</td>')
+
+        # initial values from the query string make another variant
+        self.get(cache, title='preset')
+
+        Attachment.objects.create(title='attachment1', file='attachments/a.txt')
+        self.assertContains(self.get(cache), '<td>form</td>')
+
+
+class RowHTMLCacheTestCase(TestCase):
+    template = Template(
+        '{% load resourceful_tags %}'
+        '{% for item in items %}{% cache_row item "row" %}{{ item.name }};{% endcache_row %}{% endfor %}'
+    )
+
+    def render(self):
+        return self.template.render(Context({'items': Widget.objects.order_by('pk')}))
+
+    def setUp(self):
+        default_html_cache.cache.clear()
+
+        drawing = Drawing.objects.create(name='drawing1')
+        self.w1 = Widget.objects.create(name='item1', drawing=drawing, quantity=1)
+        self.w2 = Widget.objects.create(name='item2', drawing=drawing, quantity=2)
+
+    def test_invalidated_on_save(self):
+        self.assertEqual('item1;item2;', self.render())
+
+        # an update() sends no signals, so the cached row stays
+        Widget.objects.filter(pk=self.w1.pk).update(name='stale')
+        self.assertEqual('item1;item2;', self.render())
+
+        self.w1.name = 'renamed'
+        self.w1.save()
+        self.assertEqual('renamed;item2;', self.render())
+
+    def test_save_keeps_other_rows(self):
+        self.assertEqual('item1;item2;', self.render())
+        Widget.objects.update(name='stale')
+
+        self.w1.name = 'renamed'
+        self.w1.save()
+        self.assertEqual('renamed;item2;', self.render())
+
+    def test_invalidate_model(self):
+        self.assertEqual('item1;item2;', self.render())
+        Widget.objects.update(name='renamed')
+
+        HTMLCache().invalidate_model(Widget)
+        self.assertEqual('renamed;renamed;', self.render())
+
+    def test_one_round_trip_per_row(self):
+        self.render()
+
+        # the model's generation once, then the row along with its instance's generation
+        flexmock(default_html_cache.cache).should_call('get_many').times(3)
+
+        self.assertEqual('item1;item2;', self.render())
+
+    def test_invalidated_in_other_processes(self):
+        self.assertEqual('item1;item2;', self.render())
+        Widget.objects.filter(pk=self.w1.pk).update(name='renamed')
+
+        # another process, which has never rendered the rows, saves one
+        HTMLCache().invalidate(self.w1)
+
+        self.assertEqual('renamed;item2;', self.render())
+
+    def test_version(self):
+        note = Note.objects.create(title='note1')
+
+        self.assertEqual(note.updated_at, HTMLCache().get_version(note))
+        self.assertIsNone(HTMLCache().get_version(self.w1))
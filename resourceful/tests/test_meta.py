@@ -0,0 +1,45 @@
+import json
+
+from django.core import serializers
+from django.test import TestCase
+
+from resourceful.meta import get_model_info, serialize
+from resourceful.models import ResourceManager
+
+from testapp.models import Attachment, Drawing, Widget
+
+
+class ModelInfoTestCase(TestCase):
+    def test_fields(self):
+        info = get_model_info(Widget)
+
+        self.assertIs(info, get_model_info(Widget))
+        self.assertEqual(['id', 'name', 'drawing', 'quantity', 'version'], [x.name for x in info.fields])
+
+        drawing = info.get('drawing')
+        self.assertEqual('drawing_id', drawing.attname)
+        self.assertEqual('drawing', drawing.select_name)
+        self.assertTrue(drawing.is_relation)
+        self.assertTrue(drawing.indexed)
+        self.assertFalse(drawing.unique)
+
+        self.assertTrue(get_model_info(Attachment).get('file').is_file)
+        self.assertIsNone(info.get('missing'))
+        self.assertFalse(hasattr(drawing, '__dict__'))
+
+    def test_user_field(self):
+        self.assertIsNone(get_model_info(Widget).user_field)
+        manager = ResourceManager()
+        manager.model = Widget
+        self.assertIsNone(manager.user_field)
+
+    def test_serialize_matches_django(self):
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='widget1', drawing=drawing, quantity=3)
+
+        for model, fields in ((Drawing, None), (Widget, None), (Widget, ('name', 'drawing'))):
+            items = model.objects.all()
+            expected = json.loads(serializers.serialize('json', items, fields=fields))
+
+            self.assertEqual(expected, json.loads(json.dumps(
+                serialize(items, fields=fields), cls=serializers.json.DjangoJSONEncoder)))
@@ -0,0 +1,44 @@
+import json
+
+from django.test import TestCase
+
+from testapp.models import Drawing, Widget
+
+
+class MultiTestCase(TestCase):
+    def get(self, url, ids, status_code=200):
+        response = self.client.get(url, {'ids': ids}, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(status_code, response.status_code)
+
+        if status_code == 200:
+            return json.loads(response.content)
+
+    def get_names(self, data):
+        return [item['fields']['name'] for item in data['items']]
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.other = Drawing.objects.create(name='drawing2')
+
+        self.w1 = Widget.objects.create(name='item1', drawing=self.drawing, quantity=10)
+        self.w2 = Widget.objects.create(name='item2', drawing=self.drawing, quantity=20)
+        self.w3 = Widget.objects.create(name='item3', drawing=self.other, quantity=30)
+
+    def test_in_requested_order(self):
+        ids = '{0},{1},0,abc'.format(self.w2.pk, self.w1.pk)
+
+        with self.assertNumQueries(1):
+            data = self.get('/widget/multi', ids)
+
+        self.assertEqual(['item2', 'item1'], self.get_names(data))
+        self.assertEqual(['0', 'abc'], data['missing'])
+
+    def test_scoped_to_parent(self):
+        data = self.get('/drawing/{0}/widget/multi'.format(self.drawing.pk), '{0},{1}'.format(self.w1.pk, self.w3.pk))
+
+        self.assertEqual(['item1'], self.get_names(data))
+        self.assertEqual([str(self.w3.pk)], data['missing'])
+
+    def test_limits(self):
+        self.get('/widget/multi', '', status_code=400)
+        self.get('/widget/multi', ','.join(['1'] * 101), status_code=400)
@@ -0,0 +1,75 @@
+import json
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+
+from resourceful import registry
+
+from testapp.models import Drawing, Widget
+from testapp.views import WidgetView
+
+
+class NestedResourceTestCase(TestCase):
+    def get_json(self, *args, **kwargs):
+        kwargs['HTTP_X_REQUESTED_WITH'] = 'XMLHttpRequest'
+
+        return json.loads(self.client.get(*args, **kwargs).content)
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.other = Drawing.objects.create(name='drawing2')
+
+        self.w1 = Widget.objects.create(name='item1', drawing=self.drawing, quantity=10)
+        self.w2 = Widget.objects.create(name='item2', drawing=self.other, quantity=20)
+
+    def test_url_names(self):
+        self.assertEqual('/drawing/3/widget', reverse('drawing.widget.index', kwargs={'parent_id': 3}))
+        self.assertEqual('drawing.widget.show', registry.get_resource('widget').nested_url_name('show'))
+
+    @override_settings(DEBUG=True)
+    def test_index_is_one_query_without_join(self):
+        url = reverse('drawing.widget.index', kwargs={'parent_id': self.drawing.id})
+
+        with self.assertNumQueries(1):
+            data = self.get_json(url)
+
+        self.assertEqual([self.w1.id], [item['pk'] for item in data['items']])
+
+        sql = connection.queries[-1]['sql']
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('"drawing_id" =', sql)
+
+    def test_show_under_other_parent(self):
+        url = reverse('drawing.widget.show', kwargs={'parent_id': self.other.id, 'id': self.w1.id})
+
+        self.assertEqual(404, self.client.get(url).status_code)
+
+    def test_missing_parent_is_empty(self):
+        data = self.get_json(reverse('drawing.widget.index', kwargs={'parent_id': 999}))
+
+        self.assertEqual([], data['items'])
+
+    def test_check_parent(self):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', check_parent=True)
+
+        self.assertRaises(Http404, view, RequestFactory().get('/drawing/999/widget'), parent_id='999')
+
+        response = view(RequestFactory().get('/drawing/1/widget'), parent_id=str(self.drawing.id))
+        self.assertEqual(200, response.status_code)
+
+    def test_create_belongs_to_parent(self):
+        url = reverse('drawing.widget.index', kwargs={'parent_id': self.drawing.id})
+
+        response = self.client.post(url, {'name': 'item3', 'drawing': self.other.id, 'quantity': 1})
+        self.assertEqual(302, response.status_code)
+
+        self.assertEqual(self.drawing, Widget.objects.get(name='item3').drawing)
+
+    def test_flat_routes_remain(self):
+        data = self.get_json(reverse('widget.index'))
+
+        self.assertEqual(2, len(data['items']))
@@ -0,0 +1,104 @@
+import json
+import urllib
+
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from resourceful.parsers import ParseError, RequestBody, RequestBodyTooLarge, with_body_limit
+from resourceful.views import ResourceView
+
+from testapp.models import Drawing, Note
+
+
+class RequestBodyTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_json(self):
+        request = self.factory.put('/', json.dumps({'name': 'x'}), content_type='application/json')
+
+        body = RequestBody(request)
+        self.assertEqual({'name': 'x'}, body.data)
+        self.assertIs(body.data, body.data)  # parsed only once
+
+    def test_form_encoded_put(self):
+        request = self.factory.put(
+            '/', urllib.urlencode({'name': 'x'}), content_type='application/x-www-form-urlencoded')
+
+        self.assertEqual('x', RequestBody(request).data['name'])
+
+    def test_multipart_put(self):
+        post = self.factory.post('/', {'name': 'x'})
+        request = self.factory.put('/', post.body, content_type=post.META['CONTENT_TYPE'])
+
+        self.assertEqual('x', RequestBody(request).data['name'])
+
+    def test_invalid_json(self):
+        request = self.factory.put('/', '{nope', content_type='application/json')
+
+        self.assertRaises(ParseError, lambda: RequestBody(request).data)
+
+    def test_size_checked_before_reading(self):
+        request = self.factory.put('/', 'x' * 100, content_type='application/json')
+
+        self.assertRaises(RequestBodyTooLarge, RequestBody, request, max_size=10)
+        self.assertFalse(request._read_started)
+
+
+class BodyParsingViewTestCase(TestCase):
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+
+    def test_create_from_json(self):
+        response = self.client.post(
+            '/drawing?_format=json', json.dumps({'name': 'posted'}), content_type='application/json')
+
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(Drawing.objects.filter(name='posted').exists())
+
+    def test_update_from_json(self):
+        response = self.client.put(
+            '/drawing/{0}'.format(self.drawing.id), json.dumps({'name': 'renamed'}),
+            content_type='application/json')
+
+        self.assertEqual(302, response.status_code)
+        self.assertEqual('renamed', Drawing.objects.get(pk=self.drawing.pk).name)
+
+    def test_non_ajax_put_keeps_body(self):
+        response = self.client.put(
+            '/drawing/{0}'.format(self.drawing.id), urllib.urlencode({'name': 'renamed'}),
+            content_type='application/x-www-form-urlencoded')
+
+        self.assertEqual(302, response.status_code)
+        self.assertEqual('renamed', Drawing.objects.get(pk=self.drawing.pk).name)
+
+    def test_json_list_is_refused(self):
+        response = self.client.put(
+            '/drawing/{0}'.format(self.drawing.id), json.dumps([1, 2]),
+            content_type='application/json')
+
+        self.assertEqual(400, response.status_code)
+
+    def test_body_too_large(self):
+        request = RequestFactory().post('/note', {'title': 'x' * 100})
+
+        view = ResourceView.as_view(model_class=Note, max_body_size=10)
+        response = view(request)
+
+        self.assertEqual(413, response.status_code)
+        self.assertFalse(Note.objects.exists())
+
+    def test_body_limit_checked_before_csrf(self):
+        view = with_body_limit(ResourceView.as_view(model_class=Note), 1000)
+
+        # the middleware leaves the body alone, so it is never read
+        request = RequestFactory().post('/note', {'title': 'x' * 2000})
+        self.assertIsNone(CsrfViewMiddleware().process_view(request, view, (), {}))
+        self.assertEqual(413, view(request).status_code)
+        self.assertFalse(hasattr(request, '_post'))
+
+        # and the CSRF check still runs for bodies within the limit
+        request = RequestFactory().post('/note', {'title': 'x'})
+        self.assertIsNone(CsrfViewMiddleware().process_view(request, view, (), {}))
+        self.assertEqual(403, view(request).status_code)
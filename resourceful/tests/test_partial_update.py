@@ -0,0 +1,77 @@
+import json
+import urllib
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from testapp.models import Drawing, Widget
+
+
+class PartialUpdateTestCase(TestCase):
+    def patch(self, url, data, **extra):
+        extra.setdefault('HTTP_X_REQUESTED_WITH', 'XMLHttpRequest')
+
+        return self.client.generic(
+            'PATCH', url, urllib.urlencode(data),
+            content_type='application/x-www-form-urlencoded', **extra)
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.widget = Widget.objects.create(name='item1', drawing=self.drawing, quantity=10)
+
+    @override_settings(DEBUG=True)
+    def test_only_changed_columns_are_written(self):
+        response = self.patch('/widget/{0}'.format(self.widget.id), {'name': 'renamed'})
+        self.assertEqual(200, response.status_code)
+
+        data = json.loads(response.content)
+        self.assertEqual(['name'], data['changed'])
+
+        updates = [q['sql'] for q in connection.queries if q['sql'].startswith('UPDATE')]
+        self.assertEqual(2, len(updates))
+        self.assertIn('SET "version"', updates[0])
+        self.assertIn('SET "name"', updates[1])
+        self.assertNotIn('"quantity"', updates[1])
+
+        widget = Widget.objects.get(pk=self.widget.pk)
+        self.assertEqual('renamed', widget.name)
+        self.assertEqual(10, widget.quantity)
+        self.assertEqual(2, widget.version)
+
+    def test_validates_submitted_fields_only(self):
+        response = self.patch('/widget/{0}'.format(self.widget.id), {'quantity': 'many'})
+        self.assertEqual(400, response.status_code)
+
+        errors = dict(json.loads(response.content)['errors'])
+        self.assertEqual(['quantity'], errors.keys())
+
+    def test_unchanged_values_skip_the_write(self):
+        response = self.patch('/widget/{0}'.format(self.widget.id), {'name': 'item1'})
+        self.assertEqual([], json.loads(response.content)['changed'])
+        self.assertEqual(1, Widget.objects.get(pk=self.widget.pk).version)
+
+    def test_stale_version_is_refused(self):
+        Widget.objects.filter(pk=self.widget.pk).update(version=5)
+
+        response = self.patch('/widget/{0}'.format(self.widget.id), {'name': 'renamed', 'version': '1'})
+        self.assertEqual(412, response.status_code)
+        self.assertEqual('"5"', response['ETag'])
+        self.assertEqual('item1', Widget.objects.get(pk=self.widget.pk).name)
+
+    def test_if_match(self):
+        url = '/drawing/{0}'.format(self.drawing.id)
+
+        response = self.patch(url, {'name': 'renamed'}, HTTP_IF_MATCH='"nope"')
+        self.assertEqual(412, response.status_code)
+
+        response = self.patch(url, {'name': 'renamed'}, HTTP_IF_MATCH=response['ETag'])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('renamed', Drawing.objects.get(pk=self.drawing.pk).name)
+
+    def test_patch_through_method_parameter(self):
+        url = '/widget/{0}'.format(self.widget.id)
+
+        response = self.client.post(url, {'_method': 'patch', 'quantity': '3'})
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(3, Widget.objects.get(pk=self.widget.pk).quantity)
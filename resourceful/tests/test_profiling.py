@@ -0,0 +1,114 @@
+import json
+import os
+import pstats
+import shutil
+import tempfile
+import threading
+import time
+
+from django.test import TestCase
+from django.test.client import RequestFactory
+from flexmock import flexmock
+
+from resourceful.profiling import Profiler, StackSampler
+from resourceful.queries import QueryLog
+
+from testapp.models import Drawing, Widget
+from testapp.views import WidgetView
+
+
+class ProfilerTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='item1', drawing=drawing, quantity=10)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def get(self, profiler):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', profiler=profiler)
+
+        response = view(RequestFactory().get('/widget', {'_format': 'json'}))
+        self.assertEqual(200, response.status_code)
+
+    def get_files(self, extension):
+        return sorted(x for x in os.listdir(self.directory) if x.endswith(extension))
+
+    def get_meta(self):
+        names = self.get_files('.json')
+        self.assertEqual(1, len(names))
+
+        with open(os.path.join(self.directory, names[0])) as fp:
+            return json.load(fp)
+
+    def test_sampled(self):
+        self.get(Profiler(self.directory, sample_rate=1))
+
+        meta = self.get_meta()
+        self.assertEqual('widget', meta['resource'])
+        self.assertEqual('index', meta['action'])
+        self.assertEqual('cprofile', meta['profiler'])
+        self.assertEqual(1, meta['queries'])
+        self.assertIn('FROM "testapp_widget"', meta['sql'][0]['sql'])
+
+        prof = self.get_files('.prof')
+        self.assertEqual(1, len(prof))
+        pstats.Stats(os.path.join(self.directory, prof[0]))
+
+    def test_slow(self):
+        self.get(Profiler(self.directory, slow_seconds=0))
+
+        meta = self.get_meta()
+        self.assertEqual('sampler', meta['profiler'])
+        self.assertEqual(1, len(self.get_files('.stacks')))
+
+    def test_fast_requests_not_written(self):
+        self.get(Profiler(self.directory, slow_seconds=60))
+        self.get(Profiler(self.directory, sample_rate=0))
+
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_query_log_failure(self):
+        flexmock(QueryLog).should_receive('__enter__').and_raise(RuntimeError('no log'))
+
+        self.assertRaisesRegexp(RuntimeError, 'no log', self.get, Profiler(self.directory, slow_seconds=0))
+        self.assertEqual([], os.listdir(self.directory))
+
+    def test_query_summary(self):
+        with QueryLog() as queries:
+            Widget.objects.filter(name='a').count()
+            Widget.objects.filter(name='b').count()
+
+        self.assertEqual(2, queries.count)
+
+        summary = queries.summary()
+        self.assertEqual(1, len(summary))
+        self.assertEqual(2, summary[0]['count'])
+
+    def test_nested_query_logs(self):
+        with QueryLog() as outer:
+            Widget.objects.count()
+
+            with QueryLog() as inner:
+                with self.assertNumQueries(1):
+                    Widget.objects.count()
+
+        self.assertEqual(2, outer.count)
+        self.assertEqual(1, inner.count)
+
+    def test_sampler_stop_returns_its_samples(self):
+        sampler = StackSampler(interval=0.001)
+        thread_id = threading.current_thread().ident
+
+        sampler.start(thread_id)
+        time.sleep(0.05)
+        samples = sampler.stop(thread_id)
+        self.assertTrue(samples)
+
+        # the sampler no longer writes to them
+        counted = sum(samples.values())
+        time.sleep(0.01)
+        self.assertEqual(counted, sum(samples.values()))
+        self.assertEqual({}, sampler._watched)
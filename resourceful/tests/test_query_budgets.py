@@ -0,0 +1,93 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from resourceful import registry
+from resourceful.queries import QueryBudgetExceeded, query_budget_exceeded
+from resourceful.testing import QueryCountMixin
+
+from testapp.models import AnotherWidget, Attachment, Drawing, Note, Widget
+from testapp.views import WidgetView
+
+
+class QueryBudgetTestCase(TestCase):
+    def setUp(self):
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='item1', drawing=drawing, quantity=10)
+
+    def get(self, **kwargs):
+        view = WidgetView.as_view(url_prefix='widget', template_dir='testapp', **kwargs)
+
+        return view(RequestFactory().get('/widget', {'_format': 'json'}))
+
+    def test_within_budget(self):
+        self.assertEqual(200, self.get(query_budgets={'index': 1}, query_budget_strict=True).status_code)
+
+    def test_strict(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.get(query_budgets={'index': 0}, query_budget_strict=True)
+
+    def test_signal(self):
+        sent = []
+
+        def receiver(sender, **kwargs):
+            sent.append((kwargs['action'], kwargs['budget'], kwargs['queries'].count))
+
+        query_budget_exceeded.connect(receiver)
+        try:
+            response = self.get(query_budgets={'index': 0}, query_budget_strict=False)
+        finally:
+            query_budget_exceeded.disconnect(receiver)
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([('index', 0, 1)], sent)
+
+
+class QueryCountTestCase(QueryCountMixin, TestCase):
+    query_count_sizes = (1, 5, 20)
+
+    def make_rows(self, resource, count):
+        model = resource.model_class
+        drawings = list(Drawing.objects.all()[:1]) or [Drawing.objects.create(name='drawing')]
+        drawing = drawings[0]
+
+        for i in range(model.objects.count(), count):
+            name = '{0}{1}'.format(model._meta.module_name, i)
+
+            if model is Drawing:
+                Drawing.objects.create(name=name)
+            elif model is AnotherWidget:
+                AnotherWidget.objects.create(name=name, drawing=drawing, quantity=i, another=name)
+            elif model is Widget:
+                Widget.objects.create(name=name, drawing=drawing, quantity=i)
+            elif model is Note:
+                Note.objects.create(title=name)
+            elif model is Attachment:
+                Attachment.objects.create(title=name, file='attachments/{0}.txt'.format(name))
+            else:
+                return False
+
+        # nested widgets are requested under it
+        return drawing
+
+    def test_registered_resources(self):
+        report = self.assertQueryCountsConstant()
+
+        self.assertEqual([1, 1, 1], report['widget']['index'])
+
+
+class DefaultRowsTestCase(QueryCountMixin, TestCase):
+    query_count_sizes = (1, 5)
+
+    def setUp(self):
+        Drawing.objects.create(name='other')
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='item1', drawing=drawing, quantity=10)
+        Note.objects.create(title='note1')
+
+    def test_copies_rows(self):
+        registry.warm_up()
+        report = self.assertQueryCountsConstant([registry.get_resource('widget'), registry.get_resource('note')])
+
+        # widgets nested under the drawing of the copied row, notes have a unique title
+        self.assertEqual({'widget'}, set(report))
+        self.assertEqual(5, Widget.objects.filter(drawing__name='drawing1').count())
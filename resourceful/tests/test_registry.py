@@ -0,0 +1,75 @@
+from StringIO import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.urlresolvers import set_urlconf
+from django.test import TestCase
+
+from resourceful import registry
+from resourceful.registry import Resource
+from resourceful.views import ResourceView, RoutingError
+
+from testapp.forms import DrawingForm
+from testapp.models import Drawing
+from testapp.views import DrawingView
+
+
+class RegistryTestCase(TestCase):
+    def test_patterns_registers_resources(self):
+        registry.warm_up()
+
+        resource = registry.get_resource('drawing')
+        self.assertIs(DrawingView, resource.view_class)
+        self.assertIs(Drawing, resource.model_class)
+        self.assertEqual('drawing.show', resource.url_name('show'))
+
+    def test_compile(self):
+        registry.warm_up()
+        resource = registry.get_resource('drawing')
+
+        self.assertTrue(resource.compiled)
+        self.assertIs(DrawingForm, resource.form_class)
+        self.assertEqual(['resourceful/show.html'], resource.templates['show'])
+        self.assertNotIn('destroy', resource.templates)
+
+    def test_missing_form_is_a_warning(self):
+        resource = Resource(ResourceView, model_class=Drawing, url_prefix='unrouted',
+                            template_dir='testapp', initkwargs={'form_class': None}).compile()
+
+        self.assertIsNone(resource.form_class)
+        self.assertEqual(['unrouted.index is not in the URLconf', 'unrouted.show is not in the URLconf'],
+                         resource.warnings)
+
+    def test_missing_handler_fails(self):
+        routes = dict(ResourceView.routes)
+        routes[(False, 'DELETE')] = 'destroy_all'
+
+        resource = Resource(ResourceView, model_class=Drawing, url_prefix='drawing',
+                            template_dir='testapp', initkwargs={'routes': routes})
+
+        self.assertRaises(ImproperlyConfigured, resource.compile)
+
+    def test_nested_after_parent_fails(self):
+        set_urlconf('testapp.misordered_urls')
+        try:
+            self.assertRaises(ImproperlyConfigured, registry.warm_up, 'testapp.misordered_urls')
+        finally:
+            set_urlconf(None)
+
+        # the misordered patterns() registered the resources again
+        registry.warm_up()
+
+    def test_unknown_model_fails(self):
+        self.assertRaises(RoutingError, ResourceView.patterns, model_class='testapp.Nope')
+
+    def test_compiled_resource_is_used(self):
+        registry.warm_up()
+
+        response = self.client.get('/drawing/new')
+        self.assertEqual(200, response.status_code)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('warmup_resources', stdout=stdout)
+
+        self.assertIn('resources ok', stdout.getvalue())
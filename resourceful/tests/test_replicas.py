@@ -0,0 +1,73 @@
+import json
+
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from testapp.models import Drawing
+from testapp.views import DrawingView
+
+
+class ReplicaTestCase(TestCase):
+    multi_db = True
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        # the two databases are not replicated, so rows tell where a read went
+        self.primary = Drawing.objects.using('default').create(name='primary')
+        self.replica = Drawing.objects.using('replica').create(name='replica')
+
+    def get_view(self, **kwargs):
+        return DrawingView.as_view(
+            url_prefix='drawing', template_dir='testapp', read_db='replica', **kwargs)
+
+    def get_names(self, response):
+        return [item['fields']['name'] for item in json.loads(response.content)['items']]
+
+    def test_reads_go_to_replica(self):
+        response = self.get_view()(self.factory.get('/drawing', {'_format': 'json'}))
+
+        self.assertEqual(['replica'], self.get_names(response))
+
+    def test_writes_go_to_primary(self):
+        request = self.factory.post('/drawing', {'name': 'created'})
+        request.session = {}
+
+        response = self.get_view()(request)
+
+        self.assertEqual(302, response.status_code)
+        self.assertTrue(Drawing.objects.using('default').filter(name='created').exists())
+        self.assertFalse(Drawing.objects.using('replica').filter(name='created').exists())
+
+    def test_updates_go_to_primary(self):
+        request = self.factory.post('/drawing/1', {'_method': 'put', 'name': 'renamed'})
+        request.session = {}
+
+        self.get_view()(request, id=str(self.primary.pk))
+
+        self.assertEqual('renamed', Drawing.objects.using('default').get(pk=self.primary.pk).name)
+        self.assertEqual('replica', Drawing.objects.using('replica').get(pk=self.replica.pk).name)
+
+    def test_sticky_reads_after_write(self):
+        view = self.get_view(sticky_seconds=5)
+
+        request = self.factory.post('/drawing', {'name': 'created'})
+        request.session = {}
+        response = view(request)
+
+        cookie = response.cookies['resourceful_write']
+        self.assertEqual(5, cookie['max-age'])
+
+        request = self.factory.get('/drawing', {'_format': 'json'})
+        request.COOKIES['resourceful_write'] = cookie.value
+        response = view(request)
+
+        self.assertEqual(['primary', 'created'], self.get_names(response))
+
+    def test_stale_write_cookie_is_ignored(self):
+        request = self.factory.get('/drawing', {'_format': 'json'})
+        request.COOKIES['resourceful_write'] = '0'
+
+        response = self.get_view(sticky_seconds=5)(request)
+
+        self.assertEqual(['replica'], self.get_names(response))
@@ -0,0 +1,89 @@
+import json
+from StringIO import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import override_settings
+
+from resourceful import search
+from resourceful.search import PrefixSearch, SQLiteFTSSearch
+
+from testapp.models import Drawing, Widget
+
+
+class MissingTableSearch(SQLiteFTSSearch):
+    def get_table(self, model, fields, using):
+        return 'missing_fts'
+
+
+class SearchTestCase(TestCase):
+    def get_names(self, query):
+        response = self.client.get('/widget', {'_q': query, '_format': 'json'})
+
+        return sorted(item['fields']['name'] for item in json.loads(response.content)['items'])
+
+    def setUp(self):
+        self.drawing = Drawing.objects.create(name='drawing1')
+        self.w1 = Widget.objects.create(name='blue sprocket', drawing=self.drawing, quantity=1)
+        self.w2 = Widget.objects.create(name='red sprocket', drawing=self.drawing, quantity=1)
+        self.w3 = Widget.objects.create(name='blue gear', drawing=self.drawing, quantity=1)
+
+    def test_backend_selection(self):
+        self.assertIsInstance(search.get_backend(Widget, ('name',), 'default'), SQLiteFTSSearch)
+        self.assertIs(search.prefix_search, search.get_backend(Widget, ('drawing__name',), 'default'))
+
+    @override_settings(DEBUG=True)
+    def test_full_text(self):
+        self.assertEqual(['blue gear', 'blue sprocket'], self.get_names('blue'))
+        self.assertEqual(['blue sprocket'], self.get_names('sprock blu'))
+        self.assertIn('MATCH', connection.queries[-1]['sql'])
+
+    def test_user_input_is_not_fts_syntax(self):
+        self.assertEqual([], self.get_names('"blue" OR NEAR('))
+
+    def test_index_follows_signals(self):
+        self.w2.name = 'blue wheel'
+        self.w2.save()
+        self.w3.delete()
+
+        self.assertEqual(['blue sprocket', 'blue wheel'], self.get_names('blue'))
+
+    @override_settings(DEBUG=True)
+    def test_no_table_at_request_time(self):
+        backend = MissingTableSearch()
+
+        # no DDL, saves leave the index alone and searches match prefixes instead
+        backend.index(self.w2, ('name',), 'default')
+        backend.remove(self.w3, ('name',), 'default')
+        items = backend.search(Widget.objects.all(), ('name',), 'blue')
+
+        self.assertEqual(['blue gear', 'blue sprocket'], sorted(item.name for item in items))
+        self.assertFalse([q for q in connection.queries if 'CREATE' in q['sql'] or 'MATCH' in q['sql']])
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('setup_search', stdout=stdout)
+
+        self.assertTrue(search.sqlite_fts_search.has_table(Widget, ('name',), 'default'))
+        self.assertIn('search set up', stdout.getvalue())
+
+    def test_resources_of_one_model(self):
+        watched = search.get_watched()
+        self.addCleanup(lambda: (search._watched.clear(), search._watched.update(watched)))
+
+        # another resource of the model, searching other fields, has its own index
+        search.watch(Widget, ('name', 'drawing__name'), 'widget-by-drawing')
+        self.assertEqual((Widget, ('name',)), search.get_watched()['widget'])
+
+        self.w2.name = 'blue wheel'
+        self.w2.save()
+        self.assertEqual(['blue gear', 'blue sprocket', 'blue wheel'], self.get_names('blue'))
+
+    def test_prefix_search(self):
+        items = PrefixSearch().search(Widget.objects.all(), ('name', 'drawing__name'), 'draw')
+
+        self.assertEqual(3, items.count())
+
+        items = PrefixSearch().search(Widget.objects.all(), ('name',), 'blue sprocket')
+        self.assertEqual([], list(items))
@@ -0,0 +1,59 @@
+from django.core import signing
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from testapp.models import Drawing
+from testapp.views import DrawingView
+
+
+class UntouchableSession(object):
+    def __getattr__(self, name):
+        raise AssertionError('The session was used')
+
+    def __getitem__(self, key):
+        raise AssertionError('The session was used')
+
+    __setitem__ = __getitem__
+
+
+class SignedNextTestCase(TestCase):
+    def call(self, request, action=None, **kwargs):
+        request.session = UntouchableSession()
+
+        view = DrawingView.as_view(
+            url_prefix='drawing', template_dir='testapp', signed_next=True,
+            next_allowed_hosts=('trusted.example.com',), **kwargs)
+
+        return view(request, action=action)
+
+    def sign(self, url):
+        return signing.Signer(salt='resourceful.next').sign(url)
+
+    def test_new_signs_next(self):
+        response = self.call(RequestFactory().get('/drawing/new', {'next': '/elsewhere'}), action='new')
+
+        self.assertContains(response, 'name="_next" value="{0}"'.format(self.sign('/elsewhere')))
+
+    def test_new_ignores_other_hosts(self):
+        response = self.call(RequestFactory().get('/drawing/new', {'next': 'http://evil.example.com/'}), action='new')
+
+        self.assertNotContains(response, 'name="_next"')
+
+    def test_create_redirects_to_signed_next(self):
+        request = RequestFactory().post('/drawing', {
+            'name': 'drawing1',
+            '_next': self.sign('http://trusted.example.com/done'),
+        })
+
+        response = self.call(request)
+        self.assertEqual('http://trusted.example.com/done', response['Location'])
+
+    def test_unsigned_next_ignored(self):
+        request = RequestFactory().post('/drawing', {
+            'name': 'drawing1',
+            'next': '/elsewhere',
+            '_next': '/elsewhere',
+        })
+
+        response = self.call(request)
+        self.assertEqual('/drawing/{0}'.format(Drawing.objects.get().pk), response['Location'])
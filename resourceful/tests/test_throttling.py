@@ -0,0 +1,150 @@
+import os
+import sys
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import get_cache
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import unittest
+
+from resourceful.throttling import CacheBackend, LocalBackend, Throttle, parse_rate
+
+from testapp.views import DrawingView
+
+
+class StreamingView(DrawingView):
+    def stream(self, *args, **kwargs):
+        return StreamingHttpResponse(iter(['a', 'b']))
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ThrottlingTestCase(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.factory = RequestFactory()
+
+    def get_view(self, *throttles):
+        return DrawingView.as_view(url_prefix='drawing', template_dir='testapp', throttles=throttles)
+
+    def get(self, view, ip='10.0.0.1', **kwargs):
+        request = self.factory.get('/drawing', {'_format': 'json'}, REMOTE_ADDR=ip)
+        request.user = AnonymousUser()
+
+        return view(request, **kwargs)
+
+    def test_parse_rate(self):
+        self.assertEqual(2, parse_rate('120/m'))
+        self.assertEqual(5, parse_rate(5))
+
+    def test_token_bucket(self):
+        view = self.get_view(Throttle(rate='1/s', burst=2, backend=LocalBackend(clock=self.clock)))
+
+        self.assertEqual(200, self.get(view).status_code)
+        self.assertEqual(200, self.get(view).status_code)
+
+        response = self.get(view)
+        self.assertEqual(429, response.status_code)
+        self.assertEqual('1', response['Retry-After'])
+
+        # other clients have their own bucket
+        self.assertEqual(200, self.get(view, ip='10.0.0.2').status_code)
+
+        self.clock.now += 1
+        self.assertEqual(200, self.get(view).status_code)
+
+    def test_prune(self):
+        backend = LocalBackend(clock=self.clock)
+        backend.max_buckets = backend.prune_every = 2
+
+        backend.consume('slow', 1 / 3600.0, 1)
+        backend.consume('fast1', 1, 1)
+        self.clock.now += 10
+
+        # each bucket is pruned once idle for its own throttle's refill time
+        backend.consume('fast2', 1, 1)
+        self.assertEqual(set(['slow', 'fast2']), set(backend._buckets))
+
+        # pruning waits for prune_every more buckets
+        self.clock.now += 10
+        backend.consume('fast3', 1, 1)
+        self.assertEqual(set(['slow', 'fast2', 'fast3']), set(backend._buckets))
+
+    def test_actions(self):
+        view = self.get_view(Throttle(rate='1/m', actions=['show'], backend=LocalBackend(clock=self.clock)))
+
+        for i in range(3):
+            self.assertEqual(200, self.get(view).status_code)
+
+    def test_concurrency(self):
+        backend = LocalBackend()
+        throttle = Throttle(concurrency=1, backend=backend)
+        view = self.get_view(throttle)
+
+        holder = DrawingView(url_prefix='drawing')
+        holder.action = 'index'
+
+        self.assertTrue(throttle.acquire(holder))
+        self.assertEqual(429, self.get(view).status_code)
+
+        throttle.release(holder)
+        self.assertEqual(200, self.get(view).status_code)
+        self.assertEqual({}, backend._counters)
+
+    def test_streaming_holds_slot_until_closed(self):
+        view = StreamingView.as_view(
+            url_prefix='drawing', template_dir='testapp', throttles=[Throttle(concurrency=1, backend=LocalBackend())])
+
+        response = self.get(view, action='stream')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(429, self.get(view, action='stream').status_code)
+
+        self.assertEqual(b'ab', b''.join(response.streaming_content))
+        response.close()
+        self.assertEqual(200, self.get(view, action='stream').status_code)
+
+    def test_cache_backend(self):
+        get_cache('default').clear()
+
+        backend = CacheBackend(clock=self.clock)
+        self.assertEqual(0, backend.consume('bucket', 1, 1))
+        self.assertEqual(1, backend.consume('bucket', 1, 1))
+
+        self.assertTrue(backend.acquire('slots', 1))
+        self.assertFalse(backend.acquire('slots', 1))
+        backend.release('slots')
+        self.assertTrue(backend.acquire('slots', 1))
+
+    @unittest.skipUnless(os.environ.get('RESOURCEFUL_BENCHMARKS'), 'set RESOURCEFUL_BENCHMARKS=1 to run')
+    def test_decision_overhead(self):
+        """
+        Prints what a consume/acquire/release cycle costs on each backend,
+        nothing is asserted as timings depend on the machine
+        """
+        get_cache('default').clear()
+
+        view = DrawingView(url_prefix='drawing')
+        view.action = 'index'
+        view.request = self.factory.get('/drawing')
+        view.request.user = AnonymousUser()
+
+        runs = 10000
+        for backend in (LocalBackend(), CacheBackend()):
+            throttle = Throttle(rate='1000000/s', concurrency=100, backend=backend)
+
+            start = time.time()
+            for i in range(runs):
+                throttle.consume(view)
+                throttle.acquire(view)
+                throttle.release(view)
+
+            sys.stderr.write('\n{0}: {1:.1f}us per decision'.format(
+                backend.__class__.__name__, (time.time() - start) / runs * 1e6))
@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from StringIO import StringIO
+
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.client import Client
+from django.test.utils import override_settings
+from flexmock import flexmock
+
+from resourceful.uploads import ChunkedUpload
+
+from testapp.models import Attachment
+
+
+class UploadsTestBase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+        field = Attachment._meta.get_field('file')
+        self.addCleanup(setattr, field, 'storage', field.storage)
+        field.storage = self.storage = FileSystemStorage(location=self.media_root)
+
+        settings = override_settings(FILE_UPLOAD_TEMP_DIR=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def stored_files(self):
+        directory = os.path.join(self.media_root, 'attachments')
+        if not os.path.exists(directory):
+            return []
+
+        return sorted(os.listdir(directory))
+
+
+class UploadsTestCase(UploadsTestBase):
+    def post_file(self, name, content, content_type='text/plain', title='title'):
+        data = {'file': SimpleUploadedFile(name, content, content_type)}
+        if title:
+            data['title'] = title
+
+        return self.client.post('/attachment?_format=json', data)
+
+    def test_streamed_to_storage(self):
+        flexmock(self.storage).should_receive('save').never()
+
+        response = self.post_file('hello.txt', b'hello')
+        self.assertEqual(200, response.status_code)
+
+        attachment = Attachment.objects.get()
+        self.assertEqual('attachments/hello.txt', attachment.file.name)
+        self.assertEqual(b'hello', attachment.file.read())
+
+    def test_rejected_content_type(self):
+        response = self.post_file('image.png', b'png', content_type='image/png')
+
+        self.assertEqual(415, response.status_code)
+        self.assertEqual([], self.stored_files())
+
+    def test_too_large(self):
+        response = self.post_file('big.txt', b'x' * 2000)
+
+        self.assertEqual(413, response.status_code)
+        self.assertEqual([], self.stored_files())
+
+    def test_csrf_failure_discards_file(self):
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post('/attachment?_format=json', {
+            'title': 'title',
+            'file': SimpleUploadedFile('hello.txt', b'hello', 'text/plain'),
+        })
+
+        self.assertEqual(403, response.status_code)
+        self.assertEqual([], self.stored_files())
+
+    def test_invalid_form_discards_file(self):
+        response = self.post_file('hello.txt', b'hello', title=None)
+
+        self.assertEqual(400, response.status_code)
+        self.assertFalse(Attachment.objects.exists())
+        self.assertEqual([], self.stored_files())
+
+
+class ChunkedUploadsTestCase(UploadsTestBase):
+    def start(self, **kwargs):
+        data = {'field': 'file', 'name': 'big.txt', 'size': 10, 'content_type': 'text/plain'}
+        data.update(kwargs)
+
+        return self.client.post('/attachment/upload', json.dumps(data), content_type='application/json')
+
+    def put_chunk(self, upload_id, offset, content):
+        return self.client.put(
+            '/attachment/upload?_upload={0}'.format(upload_id), content,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def test_resumable(self):
+        response = self.start()
+        self.assertEqual(201, response.status_code)
+        upload_id = json.loads(response.content)['upload_id']
+
+        data = json.loads(self.put_chunk(upload_id, 0, b'01234').content)
+        self.assertEqual(5, data['offset'])
+        self.assertFalse(data['complete'])
+
+        # a retried chunk is refused with the offset to resume from
+        response = self.put_chunk(upload_id, 0, b'01234')
+        self.assertEqual(409, response.status_code)
+        self.assertEqual(5, json.loads(response.content)['offset'])
+
+        data = json.loads(self.client.get('/attachment/upload', {'_upload': upload_id}).content)
+        self.assertEqual(5, data['offset'])
+
+        data = json.loads(self.put_chunk(upload_id, 5, b'56789').content)
+        self.assertTrue(data['complete'])
+
+        response = self.client.post('/attachment', json.dumps({
+            'title': 'title',
+            '_upload_file': upload_id,
+        }), content_type='application/json')
+        self.assertEqual(302, response.status_code)
+
+        attachment = Attachment.objects.get()
+        self.assertEqual(b'0123456789', attachment.file.read())
+        self.assertEqual([], os.listdir(os.path.join(self.media_root, 'resourceful-uploads')))
+
+    def test_limits(self):
+        self.assertEqual(413, self.start(size=2000).status_code)
+        self.assertEqual(415, self.start(content_type='image/png').status_code)
+
+    def test_chunk_past_size(self):
+        upload_id = json.loads(self.start().content)['upload_id']
+
+        self.assertEqual(413, self.put_chunk(upload_id, 0, b'x' * 11).status_code)
+
+    def test_prune(self):
+        upload_id = json.loads(self.start().content)['upload_id']
+        directory = os.path.join(self.media_root, 'resourceful-uploads')
+        upload = ChunkedUpload.load(directory, upload_id)
+
+        self.assertEqual(0, ChunkedUpload.prune(directory, 60))
+
+        past = time.time() - 120
+        for path in (upload.part_path, upload.meta_path):
+            os.utime(path, (past, past))
+
+        stdout = StringIO()
+        call_command('cleanup_resources', upload_expiry=60, stdout=stdout)
+
+        self.assertIn('1 abandoned uploads removed', stdout.getvalue())
+        self.assertEqual([], os.listdir(directory))
@@ -0,0 +1,108 @@
+import json
+
+from django.db.models import signals
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from resourceful import upsert
+
+from testapp.models import Note
+from testapp.views import DrawingView, NoteView
+
+
+class ScopedNoteView(NoteView):
+    def get_query_set(self):
+        return super(ScopedNoteView, self).get_query_set().filter(body='mine')
+
+
+class UpsertTestCase(TestCase):
+    def upsert(self, data, status_code=200):
+        response = self.client.post('/note/upsert', json.dumps(data), content_type='application/json')
+        self.assertEqual(status_code, response.status_code)
+
+        return json.loads(response.content)
+
+    def test_single(self):
+        created = self.upsert({'title': 'note1', 'body': 'first'})['item']
+        updated = self.upsert({'title': 'note1', 'body': 'second'})['item']
+
+        self.assertEqual(created['pk'], updated['pk'])
+        self.assertEqual('second', updated['fields']['body'])
+        self.assertEqual('second', Note.objects.get().body)
+
+    def test_batch_single_statement(self):
+        self.assertTrue(upsert.supports_upsert('default'))
+
+        existing = Note.objects.create(title='note1', body='old')
+
+        with self.assertNumQueries(2):  # INSERT ... ON CONFLICT, SELECT
+            items = self.upsert([
+                {'title': 'note2', 'body': 'new'},
+                {'title': 'note1', 'body': 'updated'},
+            ])['items']
+
+        self.assertEqual(['note2', 'note1'], [item['fields']['title'] for item in items])
+        self.assertEqual(existing.pk, items[1]['pk'])
+        self.assertEqual('updated', Note.objects.get(pk=existing.pk).body)
+        self.assertEqual(2, Note.objects.count())
+
+    def test_invalid_writes_nothing(self):
+        data = self.upsert([{'title': 'note1'}, {'body': 'untitled'}], status_code=400)
+
+        self.assertEqual(['1'], list(data['errors']))
+        self.assertFalse(Note.objects.exists())
+
+    def test_empty_list(self):
+        response = self.client.post('/note/upsert', '[]', content_type='application/json')
+
+        self.assertEqual(400, response.status_code)
+        self.assertFalse(Note.objects.exists())
+
+    def test_falls_back_to_save(self):
+        saved = []
+
+        def receiver(sender, instance, created, **kwargs):
+            saved.append((instance.title, created))
+
+        signals.post_save.connect(receiver, sender=Note)
+        self.addCleanup(signals.post_save.disconnect, receiver, sender=Note)
+
+        Note.objects.create(title='note1')
+        self.upsert([{'title': 'note1', 'body': 'updated'}, {'title': 'note2'}])
+
+        self.assertEqual([('note1', True), ('note1', False), ('note2', True)], saved)
+        self.assertEqual('updated', Note.objects.get(title='note1').body)
+
+    def test_not_configured(self):
+        view = DrawingView.as_view(url_prefix='drawing', template_dir='testapp')
+        request = RequestFactory().post('/drawing/upsert', '{}', content_type='application/json')
+
+        self.assertRaises(Http404, view, request, action='upsert')
+
+    def test_wrong_method(self):
+        response = self.client.get('/note/upsert')
+
+        self.assertEqual(405, response.status_code)
+
+    def scoped_upsert(self, data):
+        view = ScopedNoteView.as_view(url_prefix='note', template_dir='testapp')
+        request = RequestFactory().post('/note/upsert', json.dumps(data), content_type='application/json')
+
+        return view(request, action='upsert')
+
+    def test_scoped_updates_in_scope(self):
+        Note.objects.create(title='note1', body='mine')
+
+        response = self.scoped_upsert({'title': 'note1', 'body': 'mine'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, Note.objects.count())
+
+    def test_scoped_key_taken_out_of_scope(self):
+        Note.objects.create(title='note1', body='theirs')
+
+        response = self.scoped_upsert([{'title': 'note2', 'body': 'mine'}, {'title': 'note1', 'body': 'mine'}])
+
+        self.assertEqual(409, response.status_code)
+        self.assertEqual('theirs', Note.objects.get(title='note1').body)
@@ -1,6 +1,6 @@
 import os
 
-from django.test import TestCase
+from django.test import TransactionTestCase
 from django.utils.importlib import import_module
 
 
@@ -24,7 +24,7 @@ def find_test_modules(module_path):
             item = getattr(module, name)
 
             try:
-                if issubclass(item, TestCase):
+                if issubclass(item, TransactionTestCase):
                     scope[name] = item
             except TypeError:
                 pass
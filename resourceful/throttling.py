@@ -0,0 +1,247 @@
+import math
+import threading
+import time
+
+from django.core.cache import get_cache
+from django.http import HttpResponse
+from django.utils import six
+
+
+PERIODS = {
+    's': 1,
+    'm': 60,
+    'h': 60 * 60,
+    'd': 24 * 60 * 60,
+}
+
+
+def parse_rate(rate):
+    """
+    Returns the number of requests per second for a rate like '100/m'
+    """
+    if not isinstance(rate, six.string_types):
+        return float(rate)
+
+    count, _, period = rate.partition('/')
+
+    return float(count) / PERIODS[period[:1] or 's']
+
+
+class LocalBackend(object):
+    """
+    Keeps token buckets and concurrency counters in process memory.
+
+    Limits are enforced per worker process.
+    """
+    max_buckets = 10000  # buckets kept before idle ones are pruned
+    prune_every = 1000  # buckets added between two prunes, so that pruning is amortized
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+        self._buckets = {}
+        self._counters = {}
+        self._added = 0
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        """
+        Takes a token from the bucket and returns 0, or the number of seconds
+        until one is available when the bucket is empty
+        """
+        now = self.clock()
+
+        with self._lock:
+            if key in self._buckets:
+                tokens, stamp = self._buckets[key][:2]
+                tokens = min(burst, tokens + (now - stamp) * rate)
+            else:
+                tokens = burst
+                self._added += 1
+
+            # a bucket idle for this long is full again, the same as no bucket
+            idle = burst / rate
+
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now, idle)
+                wait = 0
+            else:
+                self._buckets[key] = (tokens, now, idle)
+                wait = (1 - tokens) / rate
+
+            if self._added >= self.prune_every and len(self._buckets) > self.max_buckets:
+                self._prune(now)
+
+        return wait
+
+    def acquire(self, key, limit):
+        with self._lock:
+            count = self._counters.get(key, 0)
+            if count >= limit:
+                return False
+
+            self._counters[key] = count + 1
+
+        return True
+
+    def release(self, key):
+        with self._lock:
+            count = self._counters.get(key, 0) - 1
+            if count > 0:
+                self._counters[key] = count
+            else:
+                self._counters.pop(key, None)
+
+    def _prune(self, now):
+        self._added = 0
+
+        for key, (tokens, stamp, idle) in list(self._buckets.items()):
+            if now - stamp >= idle:
+                del self._buckets[key]
+
+
+class CacheBackend(object):
+    """
+    Keeps token buckets and concurrency counters in a Django cache, so limits
+    are shared by all processes using the cache.
+
+    Bucket updates are a read followed by a write, so concurrent requests can
+    occasionally get through a nearly empty bucket.  Counters use the cache's
+    atomic incr/decr and expire after `timeout` seconds, so slots held by a
+    crashed worker are eventually freed.
+    """
+    def __init__(self, cache_alias='default', timeout=300, clock=time.time):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.clock = clock
+
+        self._cache = None
+
+    @property
+    def cache(self):
+        if self._cache is None:
+            self._cache = get_cache(self.cache_alias)
+
+        return self._cache
+
+    def consume(self, key, rate, burst):
+        now = self.clock()
+
+        tokens, stamp = self.cache.get(key) or (burst, now)
+        tokens = min(burst, tokens + (now - stamp) * rate)
+
+        wait = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+
+        self.cache.set(key, (tokens, now), int(math.ceil(burst / rate)) + 1)
+
+        return wait
+
+    def acquire(self, key, limit):
+        self.cache.add(key, 0, self.timeout)
+
+        try:
+            count = self.cache.incr(key)
+        except ValueError:  # expired between add() and incr()
+            self.cache.add(key, 1, self.timeout)
+            count = 1
+
+        if count > limit:
+            self.release(key)
+            return False
+
+        return True
+
+    def release(self, key):
+        try:
+            self.cache.decr(key)
+        except ValueError:
+            pass
+
+
+default_backend = LocalBackend()
+
+
+class Throttle(object):
+    """
+    Limits requests to a resource.
+
+    `rate` and `burst` configure a token bucket per (resource, action,
+    client), where the client is the logged in user or the remote address.
+    `concurrency` caps the number of requests in progress per (resource,
+    action) across all clients.  `actions` restricts the throttle to the
+    given action names.
+
+    Throttles are given to a view through its `throttles` attribute or the
+    patterns() keyword argument of the same name.
+    """
+    def __init__(self, rate=None, burst=None, concurrency=None, actions=None, backend=None):
+        self.rate = parse_rate(rate) if rate is not None else None
+        self.burst = float(burst or max(self.rate or 1, 1))
+        self.concurrency = concurrency
+        self.actions = frozenset(actions) if actions else None
+        self.backend = backend or default_backend
+
+    def applies_to(self, action):
+        return self.actions is None or action in self.actions
+
+    def get_ident(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated():
+            return 'user:{0}'.format(user.pk)
+
+        return 'ip:{0}'.format(request.META.get('REMOTE_ADDR', ''))
+
+    def consume(self, view):
+        """
+        Returns 0 when the request may proceed, or the seconds to wait
+        """
+        if self.rate is None:
+            return 0
+
+        key = 'resourceful.throttle:{0}:{1}:{2}'.format(
+            view.url_prefix, view.action, self.get_ident(view.request))
+
+        return self.backend.consume(key, self.rate, self.burst)
+
+    def concurrency_key(self, view):
+        return 'resourceful.concurrency:{0}:{1}'.format(view.url_prefix, view.action)
+
+    def acquire(self, view):
+        if self.concurrency is None:
+            return True
+
+        return self.backend.acquire(self.concurrency_key(view), self.concurrency)
+
+    def release(self, view):
+        if self.concurrency is not None:
+            self.backend.release(self.concurrency_key(view))
+
+
+class ReleaseOnClose(object):
+    """
+    Wraps the content of a streaming response so that the concurrency slots
+    its request holds are released when the server closes the response,
+    rather than when the view returns it
+    """
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+
+    def __iter__(self):
+        return iter(self.content)
+
+    def close(self):
+        release, self.release = self.release, None
+        if release is not None:
+            release()
+
+
+def throttled(retry_after):
+    response = HttpResponse('Too Many Requests', content_type='text/plain', status=429)
+    response['Retry-After'] = str(int(math.ceil(retry_after)))
+
+    return response
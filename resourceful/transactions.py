@@ -0,0 +1,51 @@
+from django.db import connections
+
+
+def on_commit(using, func):
+    """
+    Calls `func` once the transaction on the database commits, or right away
+    outside of transaction management.  Functions waiting on a transaction
+    that is rolled back are dropped.
+
+    Django has no commit hooks, so the thread's connection has its commit()
+    and rollback() wrapped while functions are pending, as QueryLog does with
+    cursor().
+    """
+    connection = connections[using]
+    if not connection.is_managed():
+        func()
+        return
+
+    pending = connection.__dict__.get('_resourceful_on_commit')
+    if pending is None:
+        pending = connection._resourceful_on_commit = []
+        commit, rollback = connection.commit, connection.rollback
+
+        def commit_and_run():
+            commit()
+            _flush(connection, run=True)
+
+            # and what the functions wrote, still within the managed block
+            if connection.is_dirty():
+                connection.commit()
+
+        def rollback_and_drop():
+            try:
+                rollback()
+            finally:
+                _flush(connection, run=False)
+
+        connection.commit = commit_and_run
+        connection.rollback = rollback_and_drop
+
+    pending.append(func)
+
+
+def _flush(connection, run):
+    pending = connection.__dict__.pop('_resourceful_on_commit', [])
+    del connection.commit
+    del connection.rollback
+
+    if run:
+        for func in pending:
+            func()
@@ -0,0 +1,432 @@
+import errno
+import fcntl
+import fnmatch
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db.models import FileField
+from django.db.models.fields import FieldDoesNotExist
+from django.http import HttpResponse
+from django.utils import six
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+
+from resourceful.parsers import ParseError, RequestBodyTooLarge
+
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedUpload(ParseError):
+    """
+    Raised for an upload of a content type that is not accepted
+    """
+    status_code = 415
+
+
+def check_upload(name, size, content_type, max_size=None, content_types=()):
+    """
+    Raises a ParseError when the file may not be uploaded
+    """
+    if max_size is not None and size is not None and size > max_size:
+        raise RequestBodyTooLarge(
+            'Upload {0} exceeds the {1} byte limit'.format(name, max_size))
+
+    if content_types and not any(fnmatch.fnmatch(content_type or '', x) for x in content_types):
+        raise UnsupportedUpload(
+            'Upload {0} has an unsupported content type {1}'.format(name, content_type))
+
+
+def get_file_field(model_class, name):
+    """
+    Returns the model's FileField with the name, if there is one
+    """
+    try:
+        field = model_class._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+    if not isinstance(field, FileField):
+        return None
+
+    return field
+
+
+def get_streamable_field(model_class, name):
+    """
+    Returns the model's FileField for the upload, or None when its name
+    cannot be worked out before the instance exists
+    """
+    field = get_file_field(model_class, name)
+    if field is None or callable(field.upload_to):
+        return None
+
+    return field
+
+
+class StoredUpload(UploadedFile):
+    """
+    A file the upload handler already wrote to the field's storage
+    """
+    def __init__(self, storage, stored_name, name, content_type, size, charset):
+        super(StoredUpload, self).__init__(
+            storage.open(stored_name, 'rb'), name, content_type, size, charset)
+
+        self.storage = storage
+        self.stored_name = stored_name
+        self.committed = False
+
+
+class StorageUploadHandler(FileUploadHandler):
+    """
+    Checks each uploaded file against the size and content type limits as
+    it arrives, and with `stream` writes the files of the model's
+    FileFields straight to their storage.
+
+    Files that are not streamed are passed on to the next handler, i.e.
+    Django's usual memory or temporary file buffering.  Streaming needs a
+    storage with a local path() and an upload_to that is not callable.
+    """
+    def __init__(self, request=None, model_class=None, max_size=None, content_types=(), stream=False):
+        super(StorageUploadHandler, self).__init__(request)
+
+        self.model_class = model_class
+        self.max_size = max_size
+        self.content_types = content_types
+        self.stream = stream
+
+        self.size = 0
+        self.storage = None
+        self.stored_name = None
+        self.destination = None
+        self.stored = []  # (storage, name) of every file written
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None):
+        super(StorageUploadHandler, self).new_file(
+            field_name, file_name, content_type, content_length, charset)
+
+        check_upload(file_name, content_length, content_type, self.max_size, self.content_types)
+
+        self.size = 0
+        self.destination = None
+
+        field = self.stream and get_streamable_field(self.model_class, field_name)
+        if field:
+            try:
+                self._open(field)
+            except NotImplementedError:
+                # not a local storage, leave the file to the next handler
+                self.destination = None
+
+    def _open(self, field):
+        storage = field.storage
+        name = storage.get_available_name(field.generate_filename(None, self.file_name))
+        path = storage.path(name)
+
+        try:
+            os.makedirs(os.path.dirname(path))
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+
+        self.storage = storage
+        self.stored_name = name
+        self.destination = open(path, 'wb')
+        self.stored.append((storage, name))
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+
+        if self.max_size is not None and self.size > self.max_size:
+            self._abort()
+            raise RequestBodyTooLarge(
+                'Upload {0} exceeds the {1} byte limit'.format(self.file_name, self.max_size))
+
+        if self.destination is None:
+            return raw_data
+
+        self.destination.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.destination is None:
+            return None
+
+        self.destination.close()
+        self.destination = None
+
+        return StoredUpload(
+            self.storage, self.stored_name, self.file_name, self.content_type,
+            file_size, self.charset)
+
+    def _abort(self):
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+            self.storage.delete(self.stored_name)
+
+    def delete_stored(self):
+        """
+        Removes every file the handler wrote
+        """
+        if self.destination is not None:
+            self.destination.close()
+            self.destination = None
+
+        for storage, name in self.stored:
+            if storage.exists(name):
+                storage.delete(name)
+
+        self.stored = []
+
+
+def with_upload_handler(view, **handler_kwargs):
+    """
+    Wraps the view so that a StorageUploadHandler parses its uploads
+
+    Upload handlers have to be in place before anything reads the body,
+    CsrfViewMiddleware included, so the middleware is told to skip the
+    view and the CSRF check runs here instead.  When the request fails,
+    the files the handler stored are deleted.
+    """
+    protected = csrf_protect(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        handler = StorageUploadHandler(request, **handler_kwargs)
+        request.upload_handlers.insert(0, handler)
+
+        # files are written while the body is parsed, which the CSRF check
+        # may do before the view runs, so a failed request removes them here
+        try:
+            response = protected(request, *args, **kwargs)
+        except ParseError as exc:
+            handler.delete_stored()
+            return HttpResponse(six.text_type(exc), content_type='text/plain', status=exc.status_code)
+        except Exception:
+            handler.delete_stored()
+            raise
+
+        if response.status_code >= 400:
+            handler.delete_stored()
+
+        return response
+
+    return csrf_exempt(wrapper)
+
+
+def commit_uploads(form):
+    """
+    Puts the form's uploads in their storage and points its instance at them
+
+    Files the upload handler already stored are used where they are, and
+    files on disk are handed to the storage as they are, which lets
+    FileSystemStorage move them.  Left to the model, FileField would wrap
+    them first and the storage would copy them.
+    """
+    instance = getattr(form, 'instance', None)
+
+    for name, value in list(form.cleaned_data.items()):
+        if isinstance(value, StoredUpload):
+            value.close()
+            value.committed = True
+            stored_name = value.stored_name
+        elif hasattr(value, 'temporary_file_path') and instance is not None:
+            field = get_file_field(instance.__class__, name)
+            if field is None:
+                continue
+
+            stored_name = field.storage.save(field.generate_filename(instance, value.name), value)
+        else:
+            continue
+
+        form.cleaned_data[name] = stored_name
+        if instance is not None:
+            setattr(instance, name, stored_name)
+
+
+def clean_up(files):
+    """
+    Removes what the request's uploads left behind once it is handled
+    """
+    for name, values in files.lists():
+        for value in values:
+            if isinstance(value, StoredUpload) and not value.committed:
+                value.close()
+                value.storage.delete(value.stored_name)
+            elif isinstance(value, CompletedUpload) and not os.path.exists(value.upload.part_path):
+                # the storage moved the file in place
+                value.upload.delete()
+
+
+def default_upload_dir():
+    return os.path.join(settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), 'resourceful-uploads')
+
+
+class ChunkedUpload(object):
+    """
+    A file collected over several requests, resumable from its offset.
+
+    The data goes to `<id>.part` and what the upload was started with to
+    `<id>.json`, both in the upload directory.
+    """
+    id_re = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, directory, upload_id, meta):
+        self.directory = directory
+        self.id = upload_id
+        self.meta = meta
+
+    @classmethod
+    def start(cls, directory, field, name, size, content_type, owner_id=None):
+        try:
+            os.makedirs(directory)
+        except OSError as exc:
+            if exc.errno != errno.EEXIST:
+                raise
+
+        upload = cls(directory, uuid.uuid4().hex, {
+            'field': field,
+            'name': name,
+            'size': size,
+            'content_type': content_type,
+            'owner_id': owner_id,
+        })
+
+        open(upload.part_path, 'wb').close()
+        with open(upload.meta_path, 'w') as fp:
+            json.dump(upload.meta, fp)
+
+        return upload
+
+    @classmethod
+    def prune(cls, directory, max_age):
+        """
+        Removes the uploads not written to for `max_age` seconds, returns
+        how many were removed
+        """
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return 0
+
+        removed = 0
+        deadline = time.time() - max_age
+
+        for name in names:
+            upload_id, ext = os.path.splitext(name)
+            if ext != '.json' or not cls.id_re.match(upload_id):
+                continue
+
+            upload = cls(directory, upload_id, None)
+            try:
+                modified = max(os.path.getmtime(path) for path in (upload.part_path, upload.meta_path)
+                               if os.path.exists(path))
+            except ValueError:
+                continue
+
+            if modified < deadline:
+                upload.delete()
+                removed += 1
+
+        return removed
+
+    @classmethod
+    def load(cls, directory, upload_id):
+        """
+        Returns the upload, or None when there is no such upload
+        """
+        if not upload_id or not cls.id_re.match(upload_id):
+            return None
+
+        try:
+            with open(os.path.join(directory, '{0}.json'.format(upload_id))) as fp:
+                meta = json.load(fp)
+        except IOError:
+            return None
+
+        return cls(directory, upload_id, meta)
+
+    @property
+    def part_path(self):
+        return os.path.join(self.directory, '{0}.part'.format(self.id))
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, '{0}.json'.format(self.id))
+
+    @property
+    def offset(self):
+        try:
+            return os.path.getsize(self.part_path)
+        except OSError:
+            return 0
+
+    @property
+    def complete(self):
+        return self.offset == self.meta['size']
+
+    def append(self, stream, length, offset):
+        """
+        Appends `length` bytes read from the stream, a chunk at a time
+
+        Returns False, without reading anything, when the upload is not at
+        `offset`.  The part file is locked while the chunk is written, so
+        concurrent requests cannot interleave their bytes.
+        """
+        with open(self.part_path, 'ab') as fp:
+            fcntl.flock(fp, fcntl.LOCK_EX)
+            try:
+                fp.seek(0, os.SEEK_END)
+                if fp.tell() != offset:
+                    return False
+
+                if offset + length > self.meta['size']:
+                    raise RequestBodyTooLarge('Chunk runs past the declared upload size')
+
+                while length > 0:
+                    data = stream.read(min(CHUNK_SIZE, length))
+                    if not data:
+                        break
+
+                    fp.write(data)
+                    length -= len(data)
+            finally:
+                fp.flush()
+                fcntl.flock(fp, fcntl.LOCK_UN)
+
+        return True
+
+    def as_file(self):
+        return CompletedUpload(self)
+
+    def delete(self):
+        for path in (self.part_path, self.meta_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class CompletedUpload(UploadedFile):
+    """
+    A finished chunked upload, handed to the form like any uploaded file
+
+    Having a temporary_file_path() lets FileSystemStorage move the file in
+    place rather than copy it.
+    """
+    def __init__(self, upload):
+        meta = upload.meta
+        super(CompletedUpload, self).__init__(
+            open(upload.part_path, 'rb'), meta['name'], meta['content_type'], meta['size'], None)
+
+        self.upload = upload
+
+    def temporary_file_path(self):
+        return self.upload.part_path
@@ -0,0 +1,83 @@
+import sqlite3
+
+from django.db import connections, transaction
+
+from resourceful.meta import get_model_info
+
+
+def supports_upsert(using):
+    """
+    Tells whether the database can insert-or-update in a single statement
+    """
+    connection = connections[using]
+
+    if connection.vendor == 'sqlite':
+        return sqlite3.sqlite_version_info >= (3, 24, 0)
+    elif connection.vendor == 'postgresql':
+        return connection.pg_version >= 90500
+    elif connection.vendor == 'mysql':
+        return True
+
+    return False
+
+
+def get_insert_fields(model):
+    """
+    Returns the fields an upsert writes, all but an automatic primary key
+    """
+    return [
+        field for field in get_model_info(model).local_fields
+        if not (field.primary_key and field.field.get_internal_type() == 'AutoField')
+    ]
+
+
+def upsert(instances, key_fields, update_fields, using):
+    """
+    Inserts the instances, updating `update_fields` of the rows that already
+    have the same `key_fields` instead, with one statement per chunk.
+
+    The key fields need a unique constraint on them.  Like QuerySet.update(),
+    this does not call save() or send any signals.
+    """
+    if not instances:
+        return
+
+    model = instances[0].__class__
+    info = get_model_info(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    fields = get_insert_fields(model)
+    columns = ', '.join(qn(field.column) for field in fields)
+    key_columns = [qn(info.get(name).column) for name in key_fields]
+    update_columns = [qn(info.get(name).column) for name in update_fields if name not in key_fields]
+
+    if connection.vendor == 'mysql':
+        assignments = ['{0} = VALUES({0})'.format(column) for column in update_columns or key_columns[:1]]
+        conflict = 'ON DUPLICATE KEY UPDATE {0}'.format(', '.join(assignments))
+    elif update_columns:
+        assignments = ['{0} = excluded.{0}'.format(column) for column in update_columns]
+        conflict = 'ON CONFLICT ({0}) DO UPDATE SET {1}'.format(', '.join(key_columns), ', '.join(assignments))
+    else:
+        conflict = 'ON CONFLICT ({0}) DO NOTHING'.format(', '.join(key_columns))
+
+    row = '({0})'.format(', '.join(['%s'] * len(fields)))
+
+    # stays under SQLite's default limit of 999 parameters
+    chunk_size = max(1, 999 // len(fields))
+
+    cursor = connection.cursor()
+    for start in range(0, len(instances), chunk_size):
+        chunk = instances[start:start + chunk_size]
+
+        params = []
+        for instance in chunk:
+            params.extend(
+                field.field.get_db_prep_save(field.field.pre_save(instance, True), connection=connection)
+                for field in fields
+            )
+
+        cursor.execute('INSERT INTO {0} ({1}) VALUES {2} {3}'.format(
+            qn(model._meta.db_table), columns, ', '.join([row] * len(chunk)), conflict), params)
+
+    transaction.commit_unless_managed(using=using)
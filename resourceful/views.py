@@ -1,19 +1,42 @@
+import hashlib
 import json
 import os
+import time
 import warnings
+from contextlib import contextmanager
 
+from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.conf.urls import patterns, url
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Avg, Count, Max, Min, Q, Sum, signals, sql
+from django.db.models.deletion import Collector
 from django.db.models.loading import get_model
-from django.forms import BaseModelForm
-from django.http import Http404, HttpResponse, HttpResponseRedirect, QueryDict
+from django.db.models.query import QuerySet
+from django.forms import BaseModelForm, FileField
+from django.http import Http404, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.template import loader, RequestContext
-from django.utils import six
+from django.utils import six, translation
+from django.utils.cache import patch_response_headers, patch_vary_headers
+from django.utils.datastructures import SortedDict
+from django.utils.http import is_safe_url
 from django.utils.importlib import import_module
+from django.utils.safestring import mark_safe
 from django.views.generic import View
 
 from resourceful.encoder import DjangoEncoder
 from resourceful.forms import BaseResourceForm
+from resourceful.meta import get_model_info, serialize
+from resourceful.models import ExportJob, Tombstone
+from resourceful import changes, events, exports, registry, search, uploads, upsert
+from resourceful.parsers import InvalidQuery, ParseError, RequestBody, with_body_limit
+from resourceful.queries import QueryBudgetExceeded, QueryLog, logger, query_budget_exceeded
+from resourceful.registry import Resource
+from resourceful.throttling import ReleaseOnClose, throttled
 
 
 class RenderError(Exception):
@@ -28,6 +51,43 @@ class RoutingError(Exception):
     """
 
 
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@contextmanager
+def commit_on_success_unless_managed(using):
+    """
+    Runs the block in a transaction of its own, like commit_on_success, or
+    under a savepoint of the enclosing managed transaction, e.g. a batch's
+
+    A nested commit_on_success would commit the enclosing transaction on
+    exit, so the enclosing block could no longer roll the work back.
+    """
+    if not transaction.is_managed(using=using):
+        with transaction.commit_on_success(using=using):
+            yield
+        return
+
+    sid = transaction.savepoint(using=using)
+    try:
+        yield
+    except Exception:
+        if sid:
+            transaction.savepoint_rollback(sid, using=using)
+        raise
+    else:
+        if sid:
+            transaction.savepoint_commit(sid, using=using)
+
+AGGREGATES = {
+    'count': Count,
+    'sum': Sum,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+}
+
+
 class ResourceView(View):
     model_class = None
     url_prefix = None
@@ -35,11 +95,83 @@ class ResourceView(View):
     serialize_fields = None  # When None default fields are serialized
     decorate_with = ()  # Decorators for the view
     query_map = {}
+    version_field = None  # Integer column used for optimistic concurrency
+    fast_writes = False  # Single-statement update/destroy when the model allows it
+    max_body_size = None  # Largest request body accepted, in bytes
+    resource = None  # The registry entry for views created with patterns()
+    read_db = None  # Database alias safe requests read from, e.g. a replica
+    write_db = None  # Database alias for writes; the routers decide when None
+    sticky_seconds = 0  # Read from write_db this long after a client's write
+    sticky_cookie_name = 'resourceful_write'
+    parent_field = None  # FK to the parent model, adds nested routes
+    parent_prefix = None  # URL prefix of the parent, defaults to its model name
+    check_parent = False  # Respond 404 under a parent that does not exist
+    fragment_cache = None  # A resourceful.cache.FragmentCache for serialized items
+    cache_version_field = None  # Field keying cached fragments, defaults to version_field
+    aggregate_fields = ()  # Fields the aggregate action may compute over
+    group_by_fields = ()  # Fields the aggregate action may group by
+    aggregate_cache_timeout = 0  # Seconds to cache aggregate results for
+    throttles = ()  # resourceful.throttling.Throttle instances
+    search_fields = ()  # Fields the _q parameter of index searches
+    search_backend = None  # A resourceful.search backend, picked per database when None
+    changes_field = None  # auto_now timestamp the changes action orders by
+    changes_limit = 100  # Most changes returned per request
+    changes_retention = 30 * 24 * 60 * 60  # Seconds tombstones are kept for, see cleanup_resources
+    multi_limit = 100  # Most ids the multi action loads per request
+    upsert_fields = ()  # Unique natural key the upsert action matches items on
+    upsert_limit = 100  # Most items one upsert request may carry
+    signed_next = False  # Carry `next` in a signed _next field instead of the session
+    next_allowed_hosts = ()  # Hosts besides the request's own that `next` may point to
+    form_html_cache = None  # A resourceful.cache.HTMLCache for the unbound form of new
+    events_enabled = False  # Serve the events action as a server-sent event stream
+    event_broker = None  # A resourceful.events broker, defaults to events.default_broker
+    event_heartbeat = 15  # Seconds between keep-alive comments on an idle stream
+    event_queue_size = 100  # Events buffered per stream before it overflows
+    event_stream_seconds = 300  # Streams end after this long, clients reconnect
+    stream_uploads = False  # Write uploads for file fields straight to their storage
+    upload_max_size = None  # Largest uploaded file accepted, in bytes
+    upload_content_types = ()  # Accepted upload types, e.g. 'image/*'; any when empty
+    chunked_uploads = False  # Serve the upload action for resumable uploads
+    upload_dir = None  # Where chunked uploads collect, defaults to under FILE_UPLOAD_TEMP_DIR
+    upload_expiry = 24 * 60 * 60  # Seconds an unfinished chunked upload is kept without writes
+    cors_origins = ()  # Origins allowed to make cross-site requests, '*' for any
+    cors_headers = ('Content-Type', 'X-Requested-With', 'If-Match', 'If-None-Match', 'Upload-Offset')
+    cors_max_age = 86400  # Seconds browsers may cache a preflight response for
+    profiler = None  # A resourceful.profiling.Profiler for sampled or slow requests
+    query_budgets = {}  # Most queries each action may run, e.g. {'index': 4, 'show': 2}
+    query_budget_strict = None  # Raise when a budget is exceeded, defaults to settings.DEBUG
+    computed_fields = {}  # Name -> aggregate annotated when _computed asks for it, e.g. Count('widget')
+    export_formats = ()  # Formats the export action writes, of 'jsonl', 'json' and 'csv'
+    export_queue = None  # Runs export jobs, defaults to a resourceful.exports.ProcessPoolQueue
+    export_dir = None  # Where finished exports are kept, defaults to under the temp directory
+    export_partition_size = 100000  # Rows per partition exported in parallel
+    export_expiry = 7 * 24 * 60 * 60  # Seconds finished exports are kept for, see cleanup_resources
+    export_timeout = 6 * 60 * 60  # Seconds after which unfinished exports are given up on
+
+    # (has id, method) -> action, for requests made without an action
+    routes = {
+        (False, 'GET'): 'index',
+        (False, 'HEAD'): 'head_index',
+        (False, 'POST'): 'create',
+        (True, 'GET'): 'show',
+        (True, 'HEAD'): 'head_show',
+        (True, 'PUT'): 'update',
+        (True, 'PATCH'): 'partial_update',
+        (True, 'DELETE'): 'destroy',
+    }
+
+    # (action, method) -> action, for methods sent to the new and edit URLs
+    action_routes = {
+        ('new', 'POST'): 'create',
+        ('edit', 'PUT'): 'update',
+        ('edit', 'PATCH'): 'partial_update',
+    }
 
     def __init__(self, **kwargs):
         super(ResourceView, self).__init__(**kwargs)
 
         self._templates = None
+        self.parent_id = None
 
     def dispatch(self, request, *args, **kwargs):
         """
@@ -50,15 +182,28 @@ class ResourceView(View):
         method rather than GET.
 
         GET	/photos	index	display a list of all photos
+        HEAD	/photos	head_index	count the photos
         GET	/photos/new	new	return an HTML form for creating a new photo
         POST /photos/new	create	create a new photo
         POST	/photos	create	create a new photo
         GET	/photos/:id	show	display a specific photo
+        HEAD	/photos/:id	head_show	check a specific photo exists
         GET	/photos/:id/edit	edit	return an HTML form for editing a photo
         PUT /photos/:id/edit	edit	return an HTML form for editing a photo
         PUT	/photos/:id	update	update a specific photo
+        PATCH	/photos/:id	partial_update	update only the given fields
         DELETE	/photos/:id	destroy	delete a specific photo
         """
+        if request.method == 'OPTIONS':
+            # answered from the routes alone, preflights do not carry credentials
+            return self.options(request, *args, **kwargs)
+
+        try:
+            # checks the body size before anything reads the body
+            self.request_body = RequestBody(request, max_size=self.max_body_size)
+        except ParseError as exc:
+            return self.parse_error(exc)
+
         request.method = request.REQUEST.get('_method', request.method).upper()
 
         pk = kwargs.get('id') or None
@@ -73,56 +218,506 @@ class ResourceView(View):
             self.format = 'json'
 
         if action is None:
-            if pk:
-                if request.method == 'GET':
-                    action = 'show'
-                elif request.method == 'PUT':
-                    action = 'update'
-                elif request.method == 'DELETE':
-                    action = 'destroy'
-                else:
+            action = self.routes.get((bool(pk), request.method))
+            if action is None:
+                if pk:
                     raise RoutingError(
                         'Unsupported method {0} with id {1}'.format(request.method, pk)
                     )
-            else:  # no action, no id
-                if request.method == 'GET':
-                    action = 'index'
-                elif request.method == 'POST':
-                    action = 'create'
-                else:
-                    raise RoutingError(
-                        'Unsupported method: {0}'.format(request.method)
-                    )
-        else:
-            if action == 'new' and request.method == 'POST':
-                action = 'create'
-            elif action == 'edit' and request.method == 'PUT':
-                action = 'update'
 
-        if request.method == 'PUT':
-            if is_ajax:
-                request.PUT = QueryDict(request.body)
-            else:
-                request.PUT = request.POST
+                raise RoutingError(
+                    'Unsupported method: {0}'.format(request.method)
+                )
+        else:
+            action = self.action_routes.get((action, request.method), action)
 
         kwargs.update({
             'id': pk,
             'action': action,
         })
 
+        self.parent_id = kwargs.get('parent_id') or None
+        if self.parent_id is not None and self.check_parent:
+            if not self.get_parent_query_set().filter(pk=self.parent_id).exists():
+                raise Http404
+
         handler = getattr(self, action, self.http_method_not_allowed)
 
         self.action = action
         self.request = request
 
+        acquired = []
+        for throttle in self.throttles:
+            if not throttle.applies_to(action):
+                continue
+
+            wait = throttle.consume(self)
+            if not wait and not throttle.acquire(self):
+                wait = 1
+
+            if wait:
+                for throttle in acquired:
+                    throttle.release(self)
+
+                return throttled(wait)
+
+            acquired.append(throttle)
+
+        response = None
+        try:
+            response = self._run_action(handler, request, *args, **kwargs)
+        except ParseError as exc:
+            return self.parse_error(exc)
+        finally:
+            def release():
+                for throttle in acquired:
+                    throttle.release(self)
+
+            # streamed content is produced after this returns, and holds the slots until then
+            if acquired and response is not None and response.streaming:
+                response.streaming_content = ReleaseOnClose(response.streaming_content, release)
+            else:
+                release()
+
+            if self.request_body.parsed:
+                uploads.clean_up(self.request_body.files)
+
+        if self.sticky_seconds and request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(self.sticky_cookie_name, repr(time.time()), max_age=self.sticky_seconds)
+
+        self._add_cors_headers(request, response)
+
+        return response
+
+    def _run_action(self, handler, request, *args, **kwargs):
+        # only queries run on this thread until the handler returns count: not
+        # those of a streaming response's iteration, nor BatchView's thread pool
+        budget = self.query_budgets.get(self.action)
+        if budget is None:
+            return self._call_action(handler, request, *args, **kwargs)
+
+        with QueryLog() as queries:
+            response = self._call_action(handler, request, *args, **kwargs)
+
+        if queries.count > budget:
+            self.query_budget_exceeded(budget, queries)
+
+        return response
+
+    def _call_action(self, handler, request, *args, **kwargs):
+        if self.profiler is not None:
+            return self.profiler.run(self, handler, request, *args, **kwargs)
+
         return handler(request, *args, **kwargs)
 
+    def query_budget_exceeded(self, budget, queries):
+        """
+        Reports an action that ran more queries than `query_budgets` allows
+
+        The query_budget_exceeded signal is sent, for metrics, and the
+        action fails with QueryBudgetExceeded when strict, which is in
+        development; otherwise a warning is logged.
+        """
+        query_budget_exceeded.send(
+            sender=self.__class__, view=self, action=self.action, budget=budget, queries=queries)
+
+        message = '{0}.{1} ran {2} queries, its budget is {3}'.format(
+            self.__class__.__name__, self.action, queries.count, budget)
+
+        strict = self.query_budget_strict
+        if strict is None:
+            strict = settings.DEBUG
+
+        if strict:
+            raise QueryBudgetExceeded('{0}:\n{1}'.format(
+                message, '\n'.join('{0} x {1}'.format(x['count'], x['sql']) for x in queries.summary())))
+
+        logger.warning(message, extra={'queries': queries.summary()})
+
+    def options(self, request, *args, **kwargs):
+        """
+        Responds with the methods the URL allows, and to CORS preflights
+        """
+        allowed = self.get_allowed_methods(bool(kwargs.get('id')), kwargs.get('action') or None)
+
+        response = HttpResponse()
+        response['Allow'] = ', '.join(allowed)
+        response['Content-Length'] = '0'
+
+        self._add_cors_headers(request, response, allowed)
+
+        return response
+
+    def get_allowed_methods(self, has_id, action=None):
+        if self.resource is not None:
+            methods = self.resource.allowed_methods.get((has_id, action))
+            if methods is not None:
+                return methods
+
+        return registry.get_allowed_methods(self.routes, self.action_routes, has_id, action)
+
+    def _add_cors_headers(self, request, response, allowed=None):
+        """
+        Lets the request's origin read the response when it is in `cors_origins`
+
+        Passing the allowed methods answers a preflight as well, which
+        browsers then cache for `cors_max_age` seconds.
+        """
+        origin = request.META.get('HTTP_ORIGIN')
+        if not origin or not self.cors_origins:
+            return
+
+        if '*' not in self.cors_origins and origin not in self.cors_origins:
+            return
+
+        response['Access-Control-Allow-Origin'] = origin
+        patch_vary_headers(response, ('Origin',))
+
+        if allowed is not None and 'HTTP_ACCESS_CONTROL_REQUEST_METHOD' in request.META:
+            response['Access-Control-Allow-Methods'] = ', '.join(allowed)
+            response['Access-Control-Allow-Headers'] = ', '.join(self.cors_headers)
+            response['Access-Control-Max-Age'] = str(self.cors_max_age)
+
+    def aggregate(self, *args, **kwargs):
+        """
+        Computes aggregates over the filtered items in a single query
+
+        `_agg` takes comma separated `function:field` pairs, e.g.
+        `sum:quantity,count:id`, and `_group_by` a comma separated list of
+        fields.  Both are checked against `aggregate_fields` and
+        `group_by_fields`.  Filtering works the same as for `index`.
+        """
+        if self.request.method not in SAFE_METHODS:
+            return self.http_method_not_allowed(self.request)
+
+        cache_key = None
+        if self.aggregate_cache_timeout:
+            # whatever else get_query_set() may be scoped by, e.g. the user
+            cache_key = 'resourceful.aggregate:{0}:{1}:{2}:{3}:{4}'.format(
+                self.url_prefix, self.parent_id, self._get_owner_id(), self.get_db_alias(),
+                hashlib.md5(self.request.META.get('QUERY_STRING', '').encode('utf-8')).hexdigest())
+
+            content = cache.get(cache_key)
+            if content is not None:
+                return self._aggregate_response(content)
+
+        group_by = self._get_group_by()
+        aggregates = self._get_aggregates()
+        columns = group_by + list(aggregates)
+
+        items = self._get_items(**self._get_request_id_params())
+
+        if group_by:
+            rows = items.values(*group_by).annotate(**aggregates).order_by(*group_by)
+            rows = [[row[column] for column in columns] for row in rows]
+        else:
+            row = items.aggregate(**aggregates)
+            rows = [[row[column] for column in columns]]
+
+        content = json.dumps({
+            'columns': columns,
+            'rows': rows,
+        }, cls=DjangoJSONEncoder)
+
+        if cache_key is not None:
+            cache.set(cache_key, content, self.aggregate_cache_timeout)
+
+        return self._aggregate_response(content)
+
+    def _aggregate_response(self, content):
+        response = HttpResponse(content, content_type='application/json')
+        if self.aggregate_cache_timeout:
+            patch_response_headers(response, self.aggregate_cache_timeout)
+
+        return response
+
+    def _get_aggregates(self):
+        aggregates = SortedDict()
+
+        for spec in self._get_list_param('_agg'):
+            function, _, field = spec.partition(':')
+
+            if function not in AGGREGATES:
+                raise InvalidQuery('Unknown aggregate {0}'.format(function))
+
+            if field not in self.aggregate_fields:
+                raise InvalidQuery('Cannot aggregate {0}'.format(field))
+
+            aggregates['{0}_{1}'.format(function, field)] = AGGREGATES[function](field)
+
+        if not aggregates:
+            raise InvalidQuery('No aggregates requested')
+
+        return aggregates
+
+    def _get_group_by(self):
+        group_by = self._get_list_param('_group_by')
+
+        for field in group_by:
+            if field not in self.group_by_fields:
+                raise InvalidQuery('Cannot group by {0}'.format(field))
+
+        return group_by
+
+    def _get_list_param(self, name):
+        values = []
+        for value in self.request.GET.getlist(name):
+            values.extend(x.strip() for x in value.split(',') if x.strip())
+
+        return values
+
+    def changes(self, *args, **kwargs):
+        """
+        Returns the items changed and the ids deleted since the `_cursor`
+
+        Without a cursor every item is returned, and no deletions.  Clients
+        keep requesting with the returned cursor until `more` is false,
+        and later on to pick up new changes.  Items are ordered by
+        `changes_field` and pk, deletions by the order they were recorded in.
+        A cursor older than `changes_retention` may have missed deletions
+        whose tombstones were pruned since, it answers 410 and the client
+        has to start over.
+        """
+        if not self.changes_field:
+            raise Http404
+
+        changes.watch(self.model_class)
+        label = changes.get_label(self.model_class)
+        limit = self.changes_limit
+
+        cursor = self.request.GET.get('_cursor')
+        if cursor:
+            (timestamp, pk, tombstone_id), issued_at = changes.decode_cursor(cursor)
+
+            if issued_at is not None and issued_at < time.time() - self.changes_retention:
+                return self.render_json({'message': 'cursor expired'}, status=410)
+        else:
+            timestamp, pk, tombstone_id = None, None, None
+
+        tombstones = Tombstone.objects.using(self.get_db_alias()).filter(model=label)
+
+        items = self.get_changes_query_set().order_by(self.changes_field, 'pk')
+        if timestamp is not None:
+            items = items.filter(
+                Q(**{'{0}__gt'.format(self.changes_field): timestamp}) |
+                Q(**{self.changes_field: timestamp, 'pk__gt': pk})
+            )
+        items = list(items[:limit + 1])
+
+        deleted = []
+        if tombstone_id is None:
+            # a full download has nothing to delete, only note where to start
+            tombstone_id = tombstones.aggregate(last=Max('id'))['last'] or 0
+        else:
+            if self._get_user_filter():
+                tombstones = tombstones.filter(owner_id=self.request.user.id)
+
+            deleted = list(tombstones.filter(id__gt=tombstone_id).order_by('id')[:limit + 1])
+
+        more = len(items) > limit or len(deleted) > limit
+        items, deleted = items[:limit], deleted[:limit]
+
+        if items:
+            timestamp, pk = getattr(items[-1], self.changes_field), items[-1].pk
+        if deleted:
+            tombstone_id = deleted[-1].id
+
+        return self.render_json({
+            'items': items,
+            'deleted': [tombstone.object_id for tombstone in deleted],
+            'cursor': changes.encode_cursor(timestamp, pk, tombstone_id),
+            'more': more,
+        })
+
+    def get_changes_query_set(self):
+        return self.get_query_set().filter(**self._get_user_filter())
+
+    def _get_user_filter(self):
+        """
+        Returns the ResourceManager filter limiting items to the request's user
+        """
+        manager = self.model_class._default_manager
+        user = getattr(self.request, 'user', None)
+
+        if user is None or not hasattr(manager, 'user_filter'):
+            return {}
+
+        return manager.user_filter(user)
+
+    def events(self, *args, **kwargs):
+        """
+        Streams creates, updates and deletes as server-sent events
+
+        The stream takes the same filters as index and only carries events
+        for items that match them.  A client that falls too far behind
+        gets an `overflow` event and the stream ends; it should resync
+        through the changes action before subscribing again.
+        """
+        if not self.events_enabled:
+            raise Http404
+
+        broker = self.event_broker or events.default_broker
+        events.watch(self.model_class, broker)
+
+        # subscribe now so nothing is missed before the stream is iterated
+        subscription = broker.subscribe(changes.get_label(self.model_class), self.event_queue_size)
+        filters = self._get_request_id_params()
+
+        response = StreamingHttpResponse(
+            self._event_stream(subscription, filters), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+
+        return response
+
+    def _event_stream(self, subscription, filters):
+        deadline = time.time() + self.event_stream_seconds
+
+        try:
+            yield 'retry: {0}\n\n'.format(int(self.event_heartbeat * 1000))
+
+            while time.time() < deadline:
+                event = subscription.get(timeout=self.event_heartbeat)
+
+                if subscription.overflowed:
+                    yield 'event: overflow\ndata: {}\n\n'
+                    break
+
+                if event is None:
+                    yield ': heartbeat\n\n'
+                    continue
+
+                # the events of a commit come together, check them in one query
+                batch = [event] + subscription.get_ready()
+                visible = self._get_visible_pks(batch, filters)
+
+                for event in batch:
+                    if event.kind == 'delete' and not self._deletion_visible(event, filters):
+                        continue
+
+                    if event.kind != 'delete' and event.pk not in visible:
+                        continue
+
+                    data = {'pk': event.pk}
+                    if event.kind != 'delete':
+                        data['item'] = event.instance
+
+                    yield 'event: {0}\nid: {1}\ndata: {2}\n\n'.format(
+                        event.kind, event.id, self.dump_json(data))
+        finally:
+            subscription.close()
+
+    def _get_visible_pks(self, events, filters):
+        """
+        Returns the pks of the saved items the stream's filters and user allow
+        """
+        pks = set(event.pk for event in events if event.kind != 'delete')
+        if not pks:
+            return set()
+
+        return set(self.get_changes_query_set().filter(**filters).filter(pk__in=pks).values_list('pk', flat=True))
+
+    def _deletion_visible(self, event, filters):
+        """
+        Returns whether the stream's filters and user allow the deletion
+        """
+        # the row is gone, so compare what can be compared on the instance
+        conditions = dict(filters, **self._get_user_filter())
+        for name, value in conditions.items():
+            if '__' in name:
+                continue
+
+            field = get_model_info(self.model_class).get(name)
+            if field is None:
+                continue
+
+            if six.text_type(getattr(event.instance, field.attname)) != six.text_type(value):
+                return False
+
+        return True
+
+    def upload(self, *args, **kwargs):
+        """
+        Collects a file in chunks, so that large uploads can be resumed and
+        do not hold a worker for the whole transfer
+
+        POST {"field": ..., "name": ..., "size": ..., "content_type": ...}
+        starts an upload and returns its id.  Each PUT ?_upload=<id> then
+        appends its body at the `Upload-Offset` header, and GET ?_upload=<id>
+        tells the offset to resume from.  Once complete, the upload is used
+        by passing `_upload_<field>=<id>` to create or update.
+        """
+        if not self.chunked_uploads:
+            raise Http404
+
+        request = self.request
+
+        if request.method == 'POST':
+            data = self.get_form_data()
+
+            field = uploads.get_streamable_field(self.model_class, data.get('field') or '')
+            if field is None:
+                raise ParseError('Not a file field: {0}'.format(data.get('field')))
+
+            try:
+                size = int(data.get('size'))
+            except (TypeError, ValueError):
+                raise ParseError('The upload size is required')
+
+            name, content_type = data.get('name') or field.name, data.get('content_type')
+            uploads.check_upload(name, size, content_type, self.upload_max_size, self.upload_content_types)
+
+            directory = self.upload_dir or uploads.default_upload_dir()
+            uploads.ChunkedUpload.prune(directory, self.upload_expiry)
+
+            upload = uploads.ChunkedUpload.start(
+                directory, field.name, name, size, content_type, self._get_owner_id())
+
+            return self._upload_response(upload, status=201)
+
+        upload = self._get_chunked_upload(request.GET.get('_upload'))
+
+        if request.method == 'PUT':
+            try:
+                offset = int(request.META.get('HTTP_UPLOAD_OFFSET', ''))
+            except ValueError:
+                raise ParseError('The Upload-Offset header is required')
+
+            if not upload.append(request, self.request_body.content_length, offset):
+                return self._upload_response(upload, status=409)
+        elif request.method not in SAFE_METHODS:
+            return self.http_method_not_allowed(request)
+
+        return self._upload_response(upload)
+
+    def _get_chunked_upload(self, upload_id):
+        upload = uploads.ChunkedUpload.load(self.upload_dir or uploads.default_upload_dir(), upload_id)
+        if upload is None or upload.meta['owner_id'] != self._get_owner_id():
+            raise Http404
+
+        return upload
+
+    def _get_owner_id(self):
+        user = getattr(self.request, 'user', None)
+        if user is None or not user.is_authenticated():
+            return None
+
+        return user.id
+
+    def _upload_response(self, upload, status=None):
+        return self.render_json({
+            'upload_id': upload.id,
+            'offset': upload.offset,
+            'size': upload.meta['size'],
+            'complete': upload.complete,
+        }, status=status)
+
     def create(self, *args, **kwargs):
         data = self.get_form_data()
         files = self.get_form_files()
 
         form = self.get_form(data, files)
         if form.is_valid():
+            uploads.commit_uploads(form)
             item = self._create_save(form)
             return self._create_success(item)
 
@@ -141,7 +736,14 @@ class ResourceView(View):
         return ctx
 
     def _create_save(self, form):
-        return form.save()
+        if self.write_db is None:
+            return form.save()
+
+        item = form.save(commit=False)
+        item.save(using=self.write_db)
+        form.save_m2m()
+
+        return item
 
     def _create_success(self, item):
         if self.format == 'json':
@@ -164,6 +766,11 @@ class ResourceView(View):
         return self.render(ctx, status=400)
 
     def destroy(self, *args, **kwargs):
+        if self.fast_writes:
+            queryset = self.get_query_set().filter(pk=kwargs['id'])
+            if self._can_fast_write('delete', queryset):
+                return self._fast_destroy(queryset, kwargs['id'])
+
         item = self.get_item(kwargs['id'])
 
         self.destroy_item(item)
@@ -176,6 +783,22 @@ class ResourceView(View):
     def _destroy_success(self, item):
         return HttpResponseRedirect(self._get_next_url(default=self.url_for('index')))
 
+    def _fast_destroy(self, queryset, pk):
+        """
+        Deletes the item with a single DELETE statement, without loading it
+        """
+        queryset._for_write = True
+        using = queryset.db
+
+        query = queryset.query.clone(sql.DeleteQuery)
+        cursor = query.get_compiler(using).execute_sql(None)
+        transaction.commit_unless_managed(using=using)
+
+        if not cursor.rowcount:
+            raise Http404
+
+        return self._destroy_success(self.model_class(pk=pk))
+
     def edit(self, *args, **kwargs):
         try:
             item = self.get_item(kwargs['id'])
@@ -195,29 +818,200 @@ class ResourceView(View):
 
         items = self._get_items(**filter_kwargs)
 
+        query = self.request.GET.get('_q')
+        if query and self.search_fields:
+            items = self.search(items, query)
+
         ctx = self.get_context({
             'items': items,
         })
 
         return self.render(ctx)
 
+    def head_index(self, *args, **kwargs):
+        """
+        Responds to HEAD with the number of items index would list, counted
+        in the database instead of rendered
+
+        The body a GET would have is never built, so there is no
+        Content-Length.
+        """
+        items = self._get_items(**self._get_request_id_params())
+
+        query = self.request.GET.get('_q')
+        if query and self.search_fields:
+            items = self.search(items, query)
+
+        response = self._head_response()
+        response['X-Total-Count'] = str(items.count())
+
+        return response
+
+    def head_show(self, *args, **kwargs):
+        """
+        Responds to HEAD with whether the item exists and, with a
+        `version_field`, its ETag, without loading the item
+        """
+        items = self.get_query_set().filter(pk=kwargs['id'])
+
+        if not self.version_field:
+            if not items.exists():
+                raise Http404
+
+            return self._head_response()
+
+        versions = list(items.values_list(self.version_field, flat=True)[:1])
+        if not versions:
+            raise Http404
+
+        etag = '"{0}"'.format(versions[0])
+
+        if etag in [x.strip() for x in self.request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = self._head_response(status=304)
+        else:
+            response = self._head_response()
+        response['ETag'] = etag
+
+        return response
+
+    def _head_response(self, status=None):
+        if self.format in (None, 'html'):
+            content_type = 'text/html; charset=utf-8'
+        else:
+            content_type = 'application/json'
+
+        return HttpResponse(content_type=content_type, status=status)
+
     def _get_items(self, **kwargs):
         return self.get_query_set().filter(**kwargs)
 
+    def search(self, queryset, query):
+        """
+        Returns the items matching the search query
+        """
+        search.watch(self.model_class, self.search_fields, self.url_prefix)
+
+        backend = self.search_backend
+        if backend is None:
+            backend = search.get_backend(self.model_class, self.search_fields, queryset.db)
+
+        return backend.search(queryset, self.search_fields, query)
+
     def get_query_set(self):
-        return self.model_class.objects.get_query_set()
+        queryset = self.model_class.objects.get_query_set().using(self.get_db_alias())
+
+        # a filter on the foreign key column itself, the parent is not joined
+        if self.parent_id is not None:
+            queryset = queryset.filter(**{self.parent_field: self.parent_id})
+
+        computed = self.get_computed_fields()
+        if computed:
+            queryset = queryset.annotate(**dict((name, self.computed_fields[name]) for name in computed))
+
+        return queryset
+
+    def get_computed_fields(self):
+        """
+        Returns the names of the `computed_fields` the request asks for in
+        `_computed`, which safe requests only may
+        """
+        if not self.computed_fields or self.request.method not in SAFE_METHODS:
+            return []
+
+        names = self._get_list_param('_computed')
+        for name in names:
+            if name not in self.computed_fields:
+                raise InvalidQuery('Unknown computed field {0}'.format(name))
+
+        return names
+
+    def get_parent_query_set(self):
+        parent_model = self.model_class._meta.get_field(self.parent_field).rel.to
+
+        return parent_model._default_manager.using(self.get_db_alias())
+
+    def get_db_alias(self):
+        """
+        Returns the alias of the database to run the request's queries on
+
+        Safe requests go to `read_db`, unless the client made a write within
+        the last `sticky_seconds` and should see its own changes.  Everything
+        else goes to `write_db`.
+        """
+        if self.read_db and self.request.method in SAFE_METHODS and not self._wrote_recently():
+            return self.read_db
+
+        return self.write_db
+
+    def _wrote_recently(self):
+        if not self.sticky_seconds:
+            return False
+
+        try:
+            last_write = float(self.request.COOKIES[self.sticky_cookie_name])
+        except (KeyError, ValueError):
+            return False
+
+        return time.time() - last_write < self.sticky_seconds
 
     def new(self, *args, **kwargs):
         next_page = self.request.REQUEST.get('next')
-        if next_page:
+        if next_page and not self.signed_next:
             self.request.session['next'] = next_page
 
+        form = self.get_form()
         ctx = self.get_context({
-            'form': self.get_form(),
+            'form': form,
         })
 
+        if self.form_html_cache is not None and self.format in (None, 'html'):
+            ctx['form_html'] = self._get_form_html(form)
+
         return self.render(ctx)
 
+    def _get_form_html(self, form):
+        """
+        Returns the form's rendered fields, from the cache when possible
+        """
+        cache = self.form_html_cache
+
+        info = get_model_info(self.model_class)
+        models = [self.model_class]
+        for field in info.fields + info.many_to_many:
+            if field.is_relation and field.field.rel.to not in models:
+                models.append(field.field.rel.to)
+
+        for model in models:
+            cache.watch(model)
+
+        key = cache.make_form_key(
+            self.url_prefix or six.text_type(self.model_class._meta), models, self.get_form_cache_variant())
+
+        html = cache.get(key)
+        if html is None:
+            html = form.as_table()
+            cache.set(key, html)
+
+        return mark_safe(html)
+
+    def get_form_cache_variant(self):
+        """
+        Returns what, besides the models, the unbound form's HTML depends on
+
+        Override this for forms that change with the user in other ways,
+        e.g. through BaseResourceForm.for_view().
+        """
+        user = getattr(self.request, 'user', None)
+        authenticated = user is not None and user.is_authenticated()
+
+        return (
+            authenticated,
+            authenticated and user.is_staff,
+            translation.get_language(),
+            sorted(self._get_request_id_params().items()),
+            self.parent_id,
+        )
+
     def show(self, *args, **kwargs):
         pk = kwargs['id']
 
@@ -230,11 +1024,298 @@ class ResourceView(View):
             'item': item,
         })
 
+        response = self.render(ctx)
+        if self.version_field:
+            response['ETag'] = self.get_item_etag(item)
+
+        return response
+
+    def multi(self, *args, **kwargs):
+        """
+        Returns the items with the given `ids`, in that order, loaded with a
+        single query
+
+        Ids that do not exist, or are not visible through get_query_set(),
+        are listed in `missing` rather than failing the request.
+        """
+        ids = self._get_list_param('ids')
+        if not ids:
+            raise InvalidQuery('No ids given')
+
+        if len(ids) > self.multi_limit:
+            raise InvalidQuery('At most {0} ids can be requested'.format(self.multi_limit))
+
+        pk_field = self.model_class._meta.pk
+        pks = {}
+        for pk in ids:
+            try:
+                pks[pk] = pk_field.to_python(pk)
+            except ValidationError:
+                pks[pk] = None
+
+        found = self.get_query_set().in_bulk(set(x for x in pks.values() if x is not None))
+
+        items, missing = [], []
+        for pk in ids:
+            item = found.get(pks[pk])
+            if item is None:
+                missing.append(pk)
+            else:
+                items.append(item)
+
+        ctx = self.get_context({
+            'items': items,
+            'missing': missing,
+        })
+
         return self.render(ctx)
 
+    def export(self, *args, **kwargs):
+        """
+        Exports the items index would list to a compressed file, in the
+        background
+
+        POST ?_export=<format> with the same filters as index starts a job
+        and responds 202 with its id.  GET ?_job=<id> tells the job's status,
+        and once it is done GET ?_job=<id>&_download=1 streams the file.
+        """
+        if not self.export_formats:
+            raise Http404
+
+        request = self.request
+
+        if request.method == 'POST':
+            export_format = request.GET.get('_export', self.export_formats[0])
+            if export_format not in self.export_formats:
+                raise InvalidQuery('Cannot export to {0}'.format(export_format))
+
+            # the job keeps the request rather than the query, and the
+            # workers build the items again from it
+            items = self.get_export_query_set()
+
+            job = exports.start(
+                items, self.url_prefix, exports.get_params(self), export_format,
+                self.export_dir or exports.default_export_dir(),
+                self.export_queue or exports.default_queue, self.export_partition_size,
+                owner_id=self._get_owner_id())
+
+            return self._export_response(job, status=202)
+        elif request.method not in SAFE_METHODS:
+            return self.http_method_not_allowed(request)
+
+        job = self._get_export_job(request.GET.get('_job'))
+
+        if request.GET.get('_download'):
+            if job.status != ExportJob.DONE:
+                return self._export_response(job, status=409)
+
+            path = exports.get_path(job)
+            response = StreamingHttpResponse(open(path, 'rb'), content_type='application/gzip')
+            response['Content-Length'] = os.path.getsize(path)
+            response['Content-Disposition'] = 'attachment; filename="{0}"'.format(os.path.basename(path))
+
+            return response
+
+        return self._export_response(job)
+
+    def get_export_query_set(self):
+        """
+        Returns the items to export, with the filters index takes
+        """
+        items = self._get_items(**self._get_request_id_params())
+
+        query = self.request.GET.get('_q')
+        if query and self.search_fields:
+            items = self.search(items, query)
+
+        return items.filter(**self._get_user_filter())
+
+    def _get_export_job(self, job_id):
+        try:
+            job = ExportJob.objects.using(router.db_for_write(ExportJob)).get(
+                pk=job_id, model=six.text_type(self.model_class._meta))
+        except ExportJob.DoesNotExist:
+            raise Http404
+
+        if job.owner_id != self._get_owner_id():
+            raise Http404
+
+        return job
+
+    def _export_response(self, job, status=None):
+        return self.render_json({
+            'job': job.id,
+            'status': job.status,
+            'rows': job.rows,
+            'error': job.error,
+        }, status=status)
+
+    def upsert(self, *args, **kwargs):
+        """
+        Creates the item, or updates the one with the same `upsert_fields`
+
+        A JSON list of items upserts them all, or none if any is invalid.
+        Where the database supports it, and nothing would notice save()
+        being skipped, every item is written with a single
+        INSERT ... ON CONFLICT statement; otherwise each is looked up and
+        saved in turn, within one transaction.  An item whose key is taken
+        by a row outside of get_query_set() is a conflict, nothing is
+        written and 409 is returned.
+        """
+        if not self.upsert_fields:
+            raise Http404
+
+        if self.request.method not in ('POST', 'PUT'):
+            return self.http_method_not_allowed(self.request)
+
+        data = self.request_body.data
+        many = isinstance(data, list)
+        if not many:
+            data = [self.get_form_data()]
+
+        if not data:
+            raise ParseError('Expected at least one item to upsert')
+
+        if len(data) > self.upsert_limit:
+            raise ParseError('At most {0} items can be upserted at once'.format(self.upsert_limit))
+
+        forms, errors = [], {}
+        for index, item_data in enumerate(data):
+            if not isinstance(item_data, dict):
+                raise ParseError('Expected a list of objects in the request body')
+
+            form = self.get_upsert_form(item_data)
+            if form.is_valid():
+                forms.append(form)
+            else:
+                errors[index] = form.errors
+
+        if errors:
+            return self.render_json({'errors': errors if many else errors[0]}, status=400)
+
+        # the last of several items with the same key wins, as it would one by one
+        by_key = SortedDict()
+        for form in forms:
+            by_key[self._get_upsert_key(form.cleaned_data)] = form
+
+        using = self.write_db or router.db_for_write(self.model_class)
+        queryset = self.get_query_set().using(using)
+        update_fields = [
+            name for name in forms[0].cleaned_data
+            if name not in self.upsert_fields and get_model_info(self.model_class).get(name) is not None
+        ]
+        update_fields.extend(name for name in self._get_auto_now_fields() if name not in update_fields)
+
+        try:
+            with commit_on_success_unless_managed(using):
+                # ON CONFLICT would update rows out of the view's scope, so only unscoped views use it
+                if (upsert.supports_upsert(using) and not queryset.query.where.children
+                        and self._can_fast_write('save', queryset)):
+                    upsert.upsert(
+                        [form.save(commit=False) for form in by_key.values()],
+                        self.upsert_fields, update_fields, using)
+                else:
+                    for key, form in by_key.items():
+                        self._upsert_save(form, queryset.filter(**dict(zip(self.upsert_fields, key))), update_fields)
+        except IntegrityError:
+            return self.render_json({'errors': {'__all__': ['An item with the same key exists already']}}, status=409)
+
+        # read back from the database written to, whatever the view reads from
+
+        items = self._get_upserted(queryset, list(by_key.keys()))
+        items = [items[self._get_upsert_key(form.cleaned_data)] for form in forms]
+
+        if many:
+            return self.render_json({'items': items})
+
+        return self.render_json({'item': items[0]})
+
+    def get_upsert_form(self, data):
+        """
+        Returns the form validating an item for upsert
+
+        The item may well exist already, so the natural key is left out of
+        the form's unique checks.
+        """
+        form = self.get_form(data)
+
+        def validate_unique():
+            exclude = form._get_validation_exclusions() + list(self.upsert_fields)
+            try:
+                form.instance.validate_unique(exclude=exclude)
+            except ValidationError as exc:
+                form._update_errors(exc.message_dict)
+
+        form.validate_unique = validate_unique
+
+        return form
+
+    def _get_upsert_key(self, values):
+        key = []
+        for name in self.upsert_fields:
+            value = values[name]
+            key.append(value.pk if hasattr(value, '_meta') else value)
+
+        return tuple(key)
+
+    def _get_auto_now_fields(self):
+        return [
+            field.name for field in get_model_info(self.model_class).local_fields
+            if getattr(field.field, 'auto_now', False)
+        ]
+
+    def _upsert_save(self, form, existing, update_fields):
+        item = form.save(commit=False)
+        using = existing.db
+
+        pks = list(existing.values_list('pk', flat=True)[:1])
+        if not pks:
+            sid = transaction.savepoint(using=using)
+            try:
+                item.save(using=using, force_insert=True)
+            except IntegrityError:
+                if sid:
+                    transaction.savepoint_rollback(sid, using=using)
+
+                # inserted concurrently, update it; otherwise the key is taken out of scope
+                pks = list(existing.values_list('pk', flat=True)[:1])
+                if not pks:
+                    raise
+            else:
+                if sid:
+                    transaction.savepoint_commit(sid, using=using)
+
+        if pks:
+            item.pk = pks[0]
+            item._state.adding = False
+            item.save(using=using, update_fields=update_fields)
+
+        form.save_m2m()
+
+    def _get_upserted(self, queryset, keys):
+        """
+        Returns the upserted items by their natural key, in one query
+        """
+        condition = Q()
+        for key in keys:
+            condition |= Q(**dict(zip(self.upsert_fields, key)))
+
+        info = get_model_info(self.model_class)
+        attnames = [info.get(name).attname for name in self.upsert_fields]
+
+        return dict(
+            (tuple(getattr(item, attname) for attname in attnames), item)
+            for item in queryset.filter(condition)
+        )
+
     def update(self, *args, **kwargs):
+        if self.fast_writes:
+            queryset = self.get_query_set().filter(pk=kwargs['id'])
+            if self._can_fast_write('save', queryset):
+                return self._fast_update(queryset, kwargs['id'])
+
         item = self.get_item(kwargs['id'])
-        form = self.get_form(self.request.PUT, instance=item)
+        form = self.get_form(self.get_form_data(), self.get_form_files(), instance=item)
 
         ctx = {
             'form': form,
@@ -251,6 +1332,7 @@ class ResourceView(View):
 
     def _update_handle_form(self, form):
         if form.is_valid():
+            uploads.commit_uploads(form)
             form.save()
 
     def _update_error(self, ctx):
@@ -264,6 +1346,231 @@ class ResourceView(View):
             url = reverse(url_name, kwargs={'id': item.id})
 
         return HttpResponseRedirect(url)
+
+    def _fast_update(self, queryset, pk):
+        """
+        Validates the form against a stand-in instance and writes the form's
+        columns with a single UPDATE, without loading the item first
+        """
+        item = self.model_class(pk=pk)
+        item._state.adding = False  # so unique checks exclude the item itself
+
+        form = self.get_form(self.get_form_data(), self.get_form_files(), instance=item)
+        if not form.is_valid():
+            return self._update_error({
+                'form': form,
+                'item': item,
+                'method': 'PUT',
+            })
+
+        uploads.commit_uploads(form)
+
+        values = {}
+        for field in get_model_info(self.model_class).local_fields:
+            if field.primary_key:
+                continue
+
+            if field.name in form.cleaned_data or getattr(field.field, 'auto_now', False):
+                values[field.name] = field.field.pre_save(item, False)
+
+        if not queryset.update(**values):
+            raise Http404
+
+        return self._update_success(item)
+
+    def _can_fast_write(self, method, queryset):
+        """
+        Tells whether `method` ('save' or 'delete') can be replaced by a single
+        statement on the given queryset
+
+        That is only the case when nothing would notice the difference: the
+        model does not override the method, has no parents, no receivers are
+        connected to its signals and, for deletes, nothing cascades from it.
+        """
+        model = self.model_class
+
+        overridden = six.get_unbound_function(getattr(model, method))
+        if overridden is not six.get_unbound_function(getattr(models.Model, method)):
+            return False
+
+        query = queryset.query
+        if len([t for t in query.tables if query.alias_refcount[t]]) > 1:
+            return False
+
+        if method == 'delete':
+            return Collector(using=queryset.db).can_fast_delete(queryset)
+
+        if model._meta.parents or model._meta.many_to_many:
+            return False
+
+        if signals.pre_save.has_listeners(model) or signals.post_save.has_listeners(model):
+            return False
+
+        form_class = self.form_class
+        if issubclass(form_class, BaseModelForm):
+            for field in form_class.base_fields.values():
+                if isinstance(field, FileField):
+                    return False
+
+        return True
+
+    def partial_update(self, *args, **kwargs):
+        """
+        Updates only the fields given in the request.
+
+        Only the submitted fields are validated and only the columns whose
+        values actually changed are written.  When the request carries an
+        If-Match header, or `version_field` is set, the write is refused with
+        a 412 if the item was changed by someone else in the meantime.
+        """
+        try:
+            item = self.get_item(kwargs['id'])
+        except self.model_class.DoesNotExist:
+            raise Http404
+
+        data = self.get_form_data()
+
+        if not self._check_preconditions(item, data):
+            return self._partial_update_conflict(item)
+
+        form = self.get_partial_form(data, self.get_form_files(), instance=item)
+
+        original = self._get_field_values(item)
+        if not form.is_valid():
+            return self._partial_update_error(form, item)
+
+        uploads.commit_uploads(form)
+
+        changed = [
+            name for name, value in self._get_field_values(item).items()
+            if original[name] != value
+        ]
+
+        with commit_on_success_unless_managed(item._state.db):
+            if changed and not self._claim_version(item):
+                return self._partial_update_conflict(item)
+
+            self._partial_update_save(form, item, changed)
+
+        return self._partial_update_success(item, changed)
+
+    def get_partial_form(self, data=None, files=None, instance=None):
+        """
+        Returns a form with only the fields present in the request
+        """
+        form = self.get_form(data, files, instance=instance)
+
+        files = files or {}
+        for name in list(form.fields):
+            if form.add_prefix(name) not in data and form.add_prefix(name) not in files:
+                del form.fields[name]
+
+        return form
+
+    def get_item_etag(self, item):
+        """
+        Returns the ETag for the given item
+
+        When a `version_field` is configured, the version number is used,
+        otherwise a digest of the item's field values is computed.
+        """
+        if self.version_field:
+            return '"{0}"'.format(getattr(item, self.version_field))
+
+        values = sorted(self._get_field_values(item).items())
+        return '"{0}"'.format(hashlib.md5(repr(values).encode('utf-8')).hexdigest())
+
+    def _check_preconditions(self, item, data):
+        if_match = self.request.META.get('HTTP_IF_MATCH')
+        if if_match and if_match.strip() != '*':
+            etags = [x.strip() for x in if_match.split(',')]
+            if self.get_item_etag(item) not in etags:
+                return False
+
+        if self.version_field and self.version_field in data:
+            if six.text_type(getattr(item, self.version_field)) != six.text_type(data[self.version_field]):
+                return False
+
+        return True
+
+    def _claim_version(self, item):
+        """
+        Bumps the item's version if nobody else has done so since it was read
+
+        The compare-and-set happens in a single UPDATE, so of two concurrent
+        editors holding the same version only one can win.
+        """
+        if not self.version_field:
+            return True
+
+        version = getattr(item, self.version_field)
+        claimed = self.model_class._default_manager.using(item._state.db).filter(**{
+            'pk': item.pk,
+            self.version_field: version,
+        }).update(**{self.version_field: version + 1})
+
+        if claimed:
+            setattr(item, self.version_field, version + 1)
+
+        return bool(claimed)
+
+    def _get_field_values(self, item):
+        return dict(
+            (field.name, getattr(item, field.attname))
+            for field in get_model_info(item.__class__).fields
+            if not field.primary_key
+        )
+
+    def _partial_update_save(self, form, item, changed):
+        if isinstance(form, BaseModelForm):
+            # builds form.save_m2m() without touching the database
+            form.save(commit=False)
+
+        if changed:
+            # update_fields leaves out auto_now fields unless named
+            item.save(update_fields=changed + [
+                name for name in self._get_auto_now_fields() if name not in changed])
+
+        if hasattr(form, 'save_m2m'):
+            form.save_m2m()
+
+    def _partial_update_conflict(self, item):
+        if self.format == 'json':
+            response = self.render_json({
+                'message': 'conflict',
+                'item': item,
+            }, status=412)
+        else:
+            response = HttpResponse('Precondition Failed', status=412)
+
+        response['ETag'] = self.get_item_etag(item)
+
+        return response
+
+    def _partial_update_error(self, form, item):
+        if self.format == 'json':
+            return self.render_json({
+                'errors': [(k, six.text_type(v[0])) for k, v in form.errors.items()],
+            }, status=400)
+
+        return self._update_error({
+            'form': form,
+            'item': item,
+        })
+
+    def _partial_update_success(self, item, changed):
+        if self.format == 'json':
+            response = self.render_json({
+                'message': 'success',
+                'item': item,
+                'changed': changed,
+            })
+            response['ETag'] = self.get_item_etag(item)
+
+            return response
+
+        return self._update_success(item)
+
     #
     # -- Helper methods
     #
@@ -272,7 +1579,58 @@ class ResourceView(View):
         """
         Converts the given data structure to a JSON string
         """
-        return json.dumps(json_data, cls=DjangoEncoder(fields=self.serialize_fields)),
+        computed = self.get_computed_fields()
+
+        # computed values change with other rows, cached fragments would not
+        if self.fragment_cache is not None and not computed and isinstance(json_data, dict):
+            return self._dump_json_fragments(json_data)
+
+        return json.dumps(json_data, cls=DjangoEncoder(fields=self.serialize_fields, extra=computed))
+
+    def _dump_json_fragments(self, json_data):
+        """
+        Assembles the JSON string from cached per-item fragments
+
+        Model instances and querysets at the top level of the data are
+        looked up in the fragment cache and only the misses are serialized,
+        all in one pass.
+        """
+        parts = []
+
+        for key, value in json_data.items():
+            if isinstance(value, QuerySet) or (
+                    isinstance(value, (list, tuple)) and value and all(hasattr(x, '_meta') for x in value)):
+                value = '[{0}]'.format(', '.join(self._get_fragments(list(value))))
+            elif hasattr(value, '_meta'):
+                value = self._get_fragments([value])[0]
+            else:
+                value = json.dumps(value, cls=DjangoEncoder(fields=self.serialize_fields))
+
+            parts.append('{0}: {1}'.format(json.dumps(key), value))
+
+        return '{{{0}}}'.format(', '.join(parts))
+
+    def _get_fragments(self, items):
+        cache = self.fragment_cache
+        version_field = self.cache_version_field or self.version_field
+
+        for model in set(item.__class__ for item in items):
+            cache.watch(model)
+
+        keys = [cache.make_key(item, self.serialize_fields, version_field) for item in items]
+        fragments, generations = cache.get_many(items, keys)
+
+        misses = [(key, item) for key, item in zip(keys, items) if key not in fragments]
+        if misses:
+            serialized = serialize([item for key, item in misses], fields=self.serialize_fields)
+
+            fresh = dict(
+                (key, json.dumps(data, cls=DjangoJSONEncoder))
+                for (key, item), data in zip(misses, serialized))
+            cache.set_many(fresh, generations)
+            fragments.update(fresh)
+
+        return [fragments[key] for key in keys]
 
     def get_json(self, context):
         """
@@ -285,13 +1643,16 @@ class ResourceView(View):
         context = {}
 
         if self.format != 'json':
-            context = {
-                'index_url': '{0}.index'.format(url_prefix),
-                'show_url': '{0}.show'.format(url_prefix),
-                'new_url': '{0}.new'.format(url_prefix),
-                'edit_url': '{0}.edit'.format(url_prefix),
-                'action_url': '{0}.edit'.format(url_prefix),
-            }
+            if self.resource is not None:
+                context = dict(self.resource.url_context)
+            else:
+                context = {
+                    'index_url': '{0}.index'.format(url_prefix),
+                    'show_url': '{0}.show'.format(url_prefix),
+                    'new_url': '{0}.new'.format(url_prefix),
+                    'edit_url': '{0}.edit'.format(url_prefix),
+                    'action_url': '{0}.edit'.format(url_prefix),
+                }
 
         context.update(extra)
 
@@ -307,7 +1668,13 @@ class ResourceView(View):
         This function checks the session for the variable "next" to contain a
         URL for redirection.  It will be popped out of the session and used,
         unless next is also specified in the current request.
+
+        With `signed_next` the session is left alone and only a signed `_next`
+        parameter is used.
         """
+        if self.signed_next:
+            return self._unsign_next(self.request.REQUEST.get('_next')) or default
+
         # redirect to the item page or to the specified URL
         # if there is a next URL specified in the session,
         # pop it out of the session ...
@@ -321,6 +1688,43 @@ class ResourceView(View):
 
         return url or default
 
+    def get_next_token(self):
+        """
+        Returns the signed `_next` value for forms to pass back, if any
+
+        An incoming signed value is passed on; a plain `next` parameter is
+        signed once it is checked to point to an allowed host.
+        """
+        token = self.request.REQUEST.get('_next')
+        if self._unsign_next(token):
+            return token
+
+        url = self.request.REQUEST.get('next')
+        if self._is_allowed_next(url):
+            return signing.Signer(salt='resourceful.next').sign(url)
+
+        return None
+
+    def _unsign_next(self, token):
+        if not token:
+            return None
+
+        try:
+            url = signing.Signer(salt='resourceful.next').unsign(token)
+        except signing.BadSignature:
+            return None
+
+        # checked again, in case the allowed hosts changed since signing
+        if not self._is_allowed_next(url):
+            return None
+
+        return url
+
+    def _is_allowed_next(self, url):
+        hosts = (self.request.get_host(),) + tuple(self.next_allowed_hosts)
+
+        return any(is_safe_url(url, host=host) for host in hosts)
+
     def _get_request_id_params(self):
         """
         pass any query parameter that comes in with the request ending in
@@ -343,6 +1747,9 @@ class ResourceView(View):
 
     def render(self, context, status=None):
         if self.format in (None, 'html'):
+            if self.signed_next and 'next_token' not in context:
+                context['next_token'] = self.get_next_token()
+
             content = loader.render_to_string(
                 self.templates,
                 context,
@@ -370,6 +1777,9 @@ class ResourceView(View):
 
     @property
     def form_class(self):
+        if self.resource is not None and self.resource.form_class is not None:
+            return self.resource.form_class
+
         meta = self.model_class._meta
 
         forms = import_module('{0}.forms'.format(meta.app_label))
@@ -383,6 +1793,14 @@ class ResourceView(View):
         if initial:
             new_initial.update(initial)
 
+        # items under a parent always belong to it
+        if self.parent_id is not None:
+            new_initial[self.parent_field] = self.parent_id
+
+            if data is not None:
+                data = data.copy()
+                data[self.parent_field] = self.parent_id
+
         form_kwargs = {
             'data': data,
             'files': files,
@@ -400,10 +1818,51 @@ class ResourceView(View):
         return form
 
     def get_form_data(self):
-        return self.request.REQUEST
+        """
+        Returns the parsed request body to bind forms with
+        """
+        data = self.request_body.data
+        if not isinstance(data, dict):
+            raise ParseError('Expected an object in the request body')
+
+        return data
 
     def get_form_files(self):
-        return self.request.FILES
+        files = self.request_body.files
+
+        if self.chunked_uploads:
+            files = self._add_chunked_uploads(files)
+
+        return files
+
+    def _add_chunked_uploads(self, files):
+        """
+        Adds the completed chunked uploads named by `_upload_<field>` values
+        """
+        data = self.get_form_data()
+
+        # added to the request's own files so that dispatch() cleans up after them
+        for field in get_model_info(self.model_class).fields:
+            if not field.is_file:
+                continue
+
+            upload_id = data.get('_upload_{0}'.format(field.name))
+            if not upload_id or field.name in files:
+                continue
+
+            upload = self._get_chunked_upload(upload_id)
+            if upload.meta['field'] != field.name or not upload.complete:
+                raise ParseError('Upload {0} is not complete'.format(upload_id))
+
+            files[field.name] = upload.as_file()
+
+        return files
+
+    def parse_error(self, exc):
+        """
+        Returns the response for a request body that could not be parsed
+        """
+        return HttpResponse(six.text_type(exc), content_type='text/plain', status=exc.status_code)
 
     @property
     def template_name(self):
@@ -414,6 +1873,10 @@ class ResourceView(View):
         if self._templates is not None:
             return self._templates
 
+        if self.resource is not None and self.action in self.resource.templates:
+            self._templates = self.resource.templates[self.action]
+            return self._templates
+
         self._templates = [
             self.template_name,
             'resourceful/{0}.html'.format(self.action),
@@ -422,7 +1885,11 @@ class ResourceView(View):
         return self._templates
 
     def url_for(self, action, args=None, kwargs=None):
-        url_name = '{0}.{1}'.format(self.model_class._meta.module_name, action)
+        if self.resource is not None:
+            url_name = self.resource.url_name(action)
+        else:
+            url_name = '{0}.{1}'.format(self.model_class._meta.module_name, action)
+
         return reverse(url_name, args=args, kwargs=kwargs)
 
     @classmethod
@@ -440,7 +1907,10 @@ class ResourceView(View):
 
         if isinstance(model_class, six.string_types):
             t_app_label, t_model_name = model_class.split('.', 1)
+            model_name = model_class
             model_class = get_model(t_app_label, t_model_name)
+            if model_class is None:
+                raise RoutingError('Unknown model {0}'.format(model_name))
 
         model_wrapper = None
 
@@ -462,40 +1932,85 @@ class ResourceView(View):
             raise RoutingError(
                 'Unable to create patterns without a template_dir or model_class')
 
+        parent_field = kwargs.get('parent_field', cls.parent_field)
+        parent_prefix = kwargs.get('parent_prefix', cls.parent_prefix)
+
+        if parent_field and parent_prefix is None:
+            parent_model = model_class._meta.get_field(parent_field).rel.to
+            parent_prefix = parent_model._meta.object_name.lower()
+
+        # start maintaining the search index and tombstones before anything is written
+        search_fields = kwargs.get('search_fields', cls.search_fields)
+        if search_fields:
+            search.watch(model_class, search_fields, url_prefix)
+
+        if kwargs.get('changes_field', cls.changes_field):
+            changes.watch(model_class)
+
+        resource = registry.register(Resource(
+            cls, model_class=model_class, url_prefix=url_prefix,
+            template_dir=template_dir, parent_prefix=parent_prefix, initkwargs=kwargs,
+        ))
+
         view = cls.as_view(
             model_class=model_class,
             url_prefix=url_prefix,
             template_dir=template_dir,
+            resource=resource,
             **kwargs
         )
 
+        stream_uploads = kwargs.get('stream_uploads', cls.stream_uploads)
+        upload_max_size = kwargs.get('upload_max_size', cls.upload_max_size)
+        upload_content_types = kwargs.get('upload_content_types', cls.upload_content_types)
+        if stream_uploads or upload_max_size is not None or upload_content_types:
+            view = uploads.with_upload_handler(
+                view, model_class=model_class, max_size=upload_max_size,
+                content_types=upload_content_types, stream=stream_uploads)
+
+        # around the upload handler, so that the size is checked before anything parses the body
+        max_body_size = kwargs.get('max_body_size', cls.max_body_size)
+        if max_body_size is not None:
+            view = with_body_limit(view, max_body_size)
+
         # apply all decroators to the view
         for decorator in decorate_with:
             view = decorator(view)
 
-        urlpatterns = patterns(
-            '',
+        urls = []
 
+        # the parent's action route matches /<parent>/<id>/<url_prefix> too, so
+        # these patterns have to be included before the parent's; compile()
+        # checks that they are
+        if parent_prefix:
+            nested_prefix = r'{0}/(?P<parent_id>[0-9a-fA-F-]+)/{1}'.format(parent_prefix, url_prefix)
+            urls.extend(cls._resource_urls(view, nested_prefix, resource.nested_url_name))
+
+        urls.extend(cls._resource_urls(view, url_prefix, resource.url_name))
+
+        return patterns('', *urls)
+
+    @classmethod
+    def _resource_urls(cls, view, url_prefix, url_name):
+        return [
             url(r'^{0}$'.format(url_prefix),
                 view,
-                name='{0}.index'.format(url_prefix)),
+                name=url_name('index')),
 
             url(r'^{0}/new$'.format(url_prefix),
                 view,
                 kwargs={'action': 'new'},
-                name='{0}.new'.format(url_prefix)),
+                name=url_name('new')),
 
             url(r'^{0}/(?P<id>[0-9a-fA-F-]+)$'.format(url_prefix),
                 view,
-                name='{0}.show'.format(url_prefix)),
+                name=url_name('show')),
 
             url(r'^{0}/(?P<id>[0-9a-fA-F-]+)/edit$'.format(url_prefix),
                 view, kwargs={'action': 'edit'},
-                name='{0}.edit'.format(url_prefix)),
+                name=url_name('edit')),
 
             url(r'^{0}/(?:(?P<id>[0-9a-fA-F-]+)/)?(?P<action>[^/]*)$'.format(url_prefix),
                 view,
-                name='{0}.action'.format(url_prefix)),
-        )
-
-        return urlpatterns
+                name=url_name('action')),
+        ]
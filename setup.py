@@ -8,7 +8,12 @@ setup(name='django-resourceful',
       author='Roberto Aguilar',
       author_email='roberto.c.aguilar@gmail.com',
       url='http://github.com/rca/django-resourceful',
-      packages=['resourceful'],
+      packages=[
+          'resourceful',
+          'resourceful.management',
+          'resourceful.management.commands',
+          'resourceful.templatetags',
+      ],
       package_data={'resourceful': [
           'templates/resourceful/*',
       ]},
@@ -1,6 +1,6 @@
 from django import forms
 
-from testapp.models import Drawing, Widget
+from testapp.models import Attachment, Drawing, Note, Widget
 
 
 class DrawingForm(forms.ModelForm):
@@ -11,3 +11,14 @@ class DrawingForm(forms.ModelForm):
 class WidgetForm(forms.ModelForm):
     class Meta:
         model = Widget
+        exclude = ('version',)
+
+
+class NoteForm(forms.ModelForm):
+    class Meta:
+        model = Note
+
+
+class AttachmentForm(forms.ModelForm):
+    class Meta:
+        model = Attachment
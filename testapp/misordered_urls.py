@@ -0,0 +1,9 @@
+from django.conf.urls import patterns
+
+from testapp.views import DrawingView, WidgetView
+
+
+# the parent's action route shadows the nested widget routes
+urlpatterns = patterns('')
+urlpatterns += DrawingView.patterns()
+urlpatterns += WidgetView.patterns()
@@ -4,13 +4,28 @@ from django.db import models
 class Drawing(models.Model):
     name = models.CharField(max_length=32)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
 
 class Widget(models.Model):
     name = models.CharField(max_length=32)
     drawing = models.ForeignKey(Drawing)
 
     quantity = models.PositiveIntegerField()
+    version = models.PositiveIntegerField(default=1)
 
 
 class AnotherWidget(Widget):
     another = models.CharField(max_length=32)
+
+
+class Note(models.Model):
+    title = models.CharField(max_length=64, unique=True)
+    body = models.TextField(blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class Attachment(models.Model):
+    title = models.CharField(max_length=64)
+    file = models.FileField(upload_to='attachments')
@@ -7,6 +7,10 @@ Replace this with more appropriate tests for your application.
 
 from django.test import TestCase
 
+from resourceful.testing import QueryCountMixin
+
+from testapp.models import AnotherWidget, Attachment, Drawing, Note, Widget
+
 
 class SimpleTest(TestCase):
     def test_basic_addition(self):
@@ -14,3 +18,28 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+class QueryCountTest(QueryCountMixin, TestCase):
+    query_count_sizes = (1, 10)
+
+    def setUp(self):
+        drawing = Drawing.objects.create(name='drawing1')
+        Widget.objects.create(name='widget1', drawing=drawing, quantity=1)
+        AnotherWidget.objects.create(name='another1', drawing=drawing, quantity=1, another='another1')
+        Attachment.objects.create(title='attachment1', file='attachments/a.txt')
+
+    def make_rows(self, resource, count):
+        # note titles are unique, so the latest note cannot be copied
+        if resource.model_class is Note:
+            for i in range(Note.objects.count(), count):
+                Note.objects.create(title='note{0}'.format(i))
+            return None
+
+        return super(QueryCountTest, self).make_rows(resource, count)
+
+    def test_query_counts(self):
+        report = self.assertQueryCountsConstant()
+
+        self.assertIn('note', report)
+        self.assertIn('widget', report)
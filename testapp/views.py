@@ -1,10 +1,17 @@
+from django.db.models import Count, Sum
+
 from resourceful.views import ResourceView
 
-from testapp.models import AnotherWidget, Widget, Drawing
+from testapp.models import AnotherWidget, Attachment, Widget, Drawing, Note
 
 
 class DrawingView(ResourceView):
     model_class = Drawing
+    changes_field = 'updated_at'
+    computed_fields = {
+        'widget_count': Count('widget'),
+        'total_quantity': Sum('widget__quantity'),
+    }
 
 
 class WidgetView(ResourceView):
@@ -12,7 +19,27 @@ class WidgetView(ResourceView):
     query_map = {
         'drawing': 'drawing__name',
     }
+    version_field = 'version'
+    parent_field = 'drawing'
+    aggregate_fields = ('id', 'quantity')
+    group_by_fields = ('drawing', 'drawing__name')
+    search_fields = ('name',)
+    query_budgets = {'index': 1, 'show': 1}
 
 
 class AnotherWidgetView(ResourceView):
     model_class = AnotherWidget
+
+
+class NoteView(ResourceView):
+    model_class = Note
+    fast_writes = True
+    upsert_fields = ('title',)
+
+
+class AttachmentView(ResourceView):
+    model_class = Attachment
+    stream_uploads = True
+    chunked_uploads = True
+    upload_max_size = 1024
+    upload_content_types = ('text/*',)